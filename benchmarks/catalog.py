@@ -0,0 +1,252 @@
+"""Compiled catalog of the benchmark metadata YAML files.
+
+Parsing the metadata YAML files is slow, and several tools parse and flatten them
+independently. This module compiles them into a SQLite database with one row per
+(file, benchmark, instance), indexed by (benchmark, instance), with typed
+columns for the fields that tools filter on and the remaining fields as JSON. Each
+file's parsed document is stored too.
+
+The catalog is updated incrementally: a file is only re-parsed if its size or
+modification time changed and the hash of its content differs from the last parse.
+Tools load metadata through this module:
+
+- `read_metadata(path)`: the parsed content of a metadata file, like
+  `yaml.safe_load`,
+- `load_catalog(paths)`: a DataFrame with one row per instance, like
+  `runner.utils.load_benchmark_metadata`, with categorical columns for fields
+  with few distinct values.
+
+By default, the catalog covers all `benchmarks/**/[Mm]etadata*.yaml` files; other
+files, such as the merged `results/metadata.yaml`, are added when they are loaded.
+To (re)build the catalog and print a summary:
+
+    python benchmarks/catalog.py
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+from collections.abc import Iterable
+from contextlib import closing
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+BENCHMARKS_DIR = Path(__file__).parent
+DEFAULT_CATALOG = BENCHMARKS_DIR / "catalog.sqlite"
+
+# Files matching the metadata pattern that don't describe benchmarks
+EXCLUDED_FILES = {"metadata_schema.yaml", "_template_metadata.yaml"}
+
+# The C loader of PyYAML is much faster, but is not available in every build
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Typed and indexed columns of the instances table, and their metadata fields
+TYPED_FIELDS = {
+    "problem_class": ("TEXT", "Problem class"),
+    "modelling_framework": ("TEXT", "Modelling framework"),
+    "size": ("TEXT", "Size"),
+    "realistic": ("INTEGER", "Realistic"),
+    "num_variables": ("INTEGER", "Num. variables"),
+    "num_constraints": ("INTEGER", "Num. constraints"),
+    "num_nonzeros": ("INTEGER", "Num. nonzeros"),
+    "url": ("TEXT", "URL"),
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    content TEXT
+);
+CREATE TABLE IF NOT EXISTS instances (
+    file TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    benchmark TEXT NOT NULL,
+    instance TEXT,
+    {", ".join(f"{name} {kind}" for name, (kind, _) in TYPED_FIELDS.items())},
+    benchmark_fields TEXT NOT NULL,
+    size_fields TEXT NOT NULL,
+    PRIMARY KEY (file, position)
+);
+CREATE INDEX IF NOT EXISTS instances_key ON instances (benchmark, instance);
+CREATE INDEX IF NOT EXISTS instances_class ON instances (problem_class, size);
+"""
+
+
+def metadata_files(root: Path = BENCHMARKS_DIR) -> list[Path]:
+    """The benchmark metadata files under `root`, in the order that
+    merge_metadata.py merges them."""
+    return [
+        path
+        for path in sorted(root.rglob("[Mm]etadata*.yaml"))
+        if path.name not in EXCLUDED_FILES
+    ]
+
+
+def connect(catalog: Path = DEFAULT_CATALOG) -> sqlite3.Connection:
+    connection = sqlite3.connect(catalog)
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _key(path: Path) -> str:
+    return str(Path(path).resolve())
+
+
+def _instance_rows(key: str, content) -> list[tuple]:
+    """Rows of the instances table for the parsed content of a metadata file."""
+    benchmarks = (content or {}).get("benchmarks") if isinstance(content, dict) else {}
+    rows = []
+    for benchmark, info in (benchmarks or {}).items():
+        if not isinstance(info, dict):
+            continue
+        benchmark_fields = {k: v for k, v in info.items() if k != "Sizes"}
+        for size in info.get("Sizes") or []:
+            if not isinstance(size, dict):
+                continue
+            fields = {**benchmark_fields, **size}
+            typed = [fields.get(field) for _, field in TYPED_FIELDS.values()]
+            rows.append(
+                (
+                    key,
+                    len(rows),
+                    benchmark,
+                    size.get("Name"),
+                    *typed,
+                    json.dumps(benchmark_fields, default=str),
+                    json.dumps(size, default=str),
+                )
+            )
+    return rows
+
+
+def update_catalog(
+    paths: Iterable[Path] | None = None, catalog: Path = DEFAULT_CATALOG
+) -> list[Path]:
+    """Bring the catalog up to date with `paths` (by default, all benchmark metadata
+    files), and return the files that were re-parsed. Files that no longer exist are
+    removed from the catalog."""
+    paths = metadata_files() if paths is None else [Path(p) for p in paths]
+    parsed = []
+    with closing(connect(catalog)) as connection, connection:
+        known = {
+            row[0]: row[1:]
+            for row in connection.execute(
+                "SELECT path, mtime_ns, size, sha256 FROM files"
+            )
+        }
+        for path in paths:
+            key = _key(path)
+            stat = path.stat()
+            if key in known and known[key][:2] == (stat.st_mtime_ns, stat.st_size):
+                continue
+            data = path.read_bytes()
+            sha256 = hashlib.sha256(data).hexdigest()
+            if key in known and known[key][2] == sha256:
+                connection.execute(
+                    "UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                    (stat.st_mtime_ns, stat.st_size, key),
+                )
+                continue
+            content = yaml.load(data, Loader=SafeLoader)
+            connection.execute("DELETE FROM files WHERE path = ?", (key,))
+            connection.execute(
+                "INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    stat.st_mtime_ns,
+                    stat.st_size,
+                    sha256,
+                    json.dumps(content, default=str),
+                ),
+            )
+            placeholders = ", ".join("?" * (6 + len(TYPED_FIELDS)))
+            connection.executemany(
+                f"INSERT INTO instances VALUES ({placeholders})",
+                _instance_rows(key, content),
+            )
+            parsed.append(path)
+        for key in known:
+            if not Path(key).exists():
+                connection.execute("DELETE FROM files WHERE path = ?", (key,))
+    return parsed
+
+
+def read_metadata(path: Path, catalog: Path = DEFAULT_CATALOG):
+    """The parsed content of the metadata file `path`, as `yaml.safe_load` returns
+    it, from the catalog if the file is unchanged."""
+    update_catalog([path], catalog)
+    with closing(connect(catalog)) as connection:
+        (content,) = connection.execute(
+            "SELECT content FROM files WHERE path = ?", (_key(path),)
+        ).fetchone()
+    return json.loads(content)
+
+
+def load_catalog(
+    paths: Iterable[Path] | None = None,
+    catalog: Path = DEFAULT_CATALOG,
+    ignore_keys: Iterable[str] = (),
+    categorical: bool = True,
+) -> pd.DataFrame:
+    """One row per instance of the metadata files `paths` (by default, all benchmark
+    metadata files), with the columns Benchmark and Instance, then the benchmark's
+    fields and the instance's fields, except `ignore_keys`.
+
+    With `categorical`, text columns with few distinct values (e.g. Problem class,
+    Size) are categorical, which makes them smaller and faster to filter.
+    """
+    paths = metadata_files() if paths is None else [Path(p) for p in paths]
+    update_catalog(paths, catalog)
+    ignore_keys = set(ignore_keys) | {"Name"}
+    rows = []
+    with closing(connect(catalog)) as connection:
+        for path in paths:
+            query = (
+                "SELECT benchmark, instance, benchmark_fields, size_fields "
+                "FROM instances WHERE file = ? ORDER BY position"
+            )
+            for (
+                benchmark,
+                instance,
+                benchmark_fields,
+                size_fields,
+            ) in connection.execute(query, (_key(path),)):
+                fields = {**json.loads(benchmark_fields), **json.loads(size_fields)}
+                rows.append(
+                    {
+                        "Benchmark": benchmark,
+                        "Instance": instance,
+                        **{k: v for k, v in fields.items() if k not in ignore_keys},
+                    }
+                )
+    df = pd.DataFrame(rows)
+    if categorical:
+        for column in df.columns.drop(["Benchmark", "Instance"], errors="ignore"):
+            values = df[column].dropna()
+            if (
+                len(values)
+                and values.map(type).eq(str).all()
+                and values.nunique() <= len(values) // 2
+            ):
+                df[column] = df[column].astype("category")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compile the benchmark metadata YAML files into a catalog."
+    )
+    parser.add_argument("--catalog", type=Path, default=DEFAULT_CATALOG)
+    args = parser.parse_args()
+    parsed = update_catalog(catalog=args.catalog)
+    print(f"Re-parsed {len(parsed)} changed metadata files")
+    df = load_catalog(catalog=args.catalog)
+    print(f"{len(df)} instances of {df['Benchmark'].nunique()} benchmarks")
+    print(df.groupby(["Problem class", "Size"], observed=True).size().to_string())
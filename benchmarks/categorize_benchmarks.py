@@ -3,9 +3,9 @@
 Download, analyze benchmark models, and update benchmark metadata.
 
 The script scans metadata YAML files under a benchmark folder, downloads
-benchmark models from URLs, analyzes them using HiGHS (highspy), and
-updates the corresponding YAML entries with model statistics and a size
-category.
+benchmark models from URLs, analyzes them using HiGHS (highspy) through the
+model cache in `runner/model_cache.py`, and updates the corresponding YAML
+entries with model statistics and a size category.
 
 Design goals:
 - Modular functions with single responsibilities.
@@ -16,7 +16,11 @@ Design goals:
 from __future__ import annotations
 
 import argparse
+import difflib
 import gzip
+import io
+import os
+import shutil
 import sys
 import tempfile
 from dataclasses import dataclass
@@ -24,12 +28,13 @@ from pathlib import Path
 from typing import Any, Iterable, MutableMapping, Optional
 from urllib.parse import urlparse
 
-import highspy
 import requests
 from ruamel.yaml import YAML
 
 YamlMap = MutableMapping[str, Any]
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
 
 @dataclass(frozen=True)
 class ModelStats:
@@ -122,9 +127,34 @@ def read_text_file(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
+def dump_yaml(yaml_obj: YAML, data: Any) -> str:
+    """
+    Dump YAML data to a string.
+
+    Parameters
+    ----------
+    yaml_obj : ruamel.yaml.YAML
+        YAML instance used to dump data.
+    data : Any
+        YAML-serializable object.
+
+    Returns
+    -------
+    str
+        YAML text.
+    """
+    stream = io.StringIO()
+    yaml_obj.dump(data, stream)
+    return stream.getvalue()
+
+
 def write_yaml_file(path: Path, yaml_obj: YAML, data: Any) -> None:
     """
-    Write YAML data to disk.
+    Write YAML data to disk atomically.
+
+    The data is written to a temporary file in the same directory, which then
+    replaces `path`, so that the file is never left partially written. The file
+    keeps the permissions of the file it replaces.
 
     Parameters
     ----------
@@ -135,8 +165,49 @@ def write_yaml_file(path: Path, yaml_obj: YAML, data: Any) -> None:
     data : Any
         YAML-serializable object.
     """
-    with open(path, "w", encoding="utf-8") as f:
-        yaml_obj.dump(data, f)
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            yaml_obj.dump(data, f)
+        # mkstemp creates the file with mode 0600
+        if path.exists():
+            shutil.copymode(path, tmp_name)
+        os.replace(tmp_name, path)
+    except BaseException:
+        safe_unlink(Path(tmp_name))
+        raise
+
+
+def yaml_diff(path: Path, original: str, yaml_obj: YAML, data: Any) -> str:
+    """
+    Unified diff between the original content of a YAML file and updated data.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the file, used in the diff header.
+    original : str
+        Original file contents.
+    yaml_obj : ruamel.yaml.YAML
+        YAML instance used to dump data.
+    data : Any
+        Updated YAML-serializable object.
+
+    Returns
+    -------
+    str
+        Unified diff (empty if nothing changed).
+    """
+    return "".join(
+        difflib.unified_diff(
+            original.splitlines(keepends=True),
+            dump_yaml(yaml_obj, data).splitlines(keepends=True),
+            fromfile=str(path),
+            tofile=f"{path} (updated)",
+        )
+    )
 
 
 def is_http_url(url: str) -> bool:
@@ -380,6 +451,9 @@ def analyze_model_file(file_path: Path, is_milp: bool) -> Optional[ModelStats]:
     """
     Analyze a model file using HiGHS and return statistics.
 
+    The model is read through the model cache, so re-analyzing a model that
+    was analyzed before does not parse the LP/MPS file again.
+
     Parameters
     ----------
     file_path : Path
@@ -393,28 +467,26 @@ def analyze_model_file(file_path: Path, is_milp: bool) -> Optional[ModelStats]:
         Parsed statistics, or None if analysis fails.
     """
     try:
-        highs = highspy.Highs()
-        highs.readModel(str(file_path))
+        if str(REPO_ROOT) not in sys.path:
+            sys.path.insert(0, str(REPO_ROOT))
+        from runner.model_cache import (  # pylint: disable=import-outside-toplevel
+            load_model,
+        )
+
+        model = load_model(file_path)
 
-        num_variables = highs.getNumCol()
+        num_variables = model.num_col
         if num_variables == 0:
             raise RuntimeError("Model loaded but has zero variables")
 
-        num_constraints = highs.getNumRow()
-
-        try:
-            num_nonzeros = highs.getNumNz()
-        except AttributeError:
-            num_nonzeros = highs.getNumNonzeros()
-
         size_category = determine_size_category(num_variables)
 
         # LP branch
         if not is_milp:
             stats = ModelStats(
-                num_constraints=num_constraints,
+                num_constraints=model.num_row,
                 num_variables=num_variables,
-                num_nonzeros=num_nonzeros,
+                num_nonzeros=model.num_nz,
                 size_category=size_category,
             )
 
@@ -422,15 +494,13 @@ def analyze_model_file(file_path: Path, is_milp: bool) -> Optional[ModelStats]:
             return stats
 
         # MILP branch
-        num_cont, num_int = count_variable_types(highs, num_variables)
-
         stats = ModelStats(
-            num_constraints=num_constraints,
+            num_constraints=model.num_row,
             num_variables=num_variables,
-            num_nonzeros=num_nonzeros,
+            num_nonzeros=model.num_nz,
             size_category=size_category,
-            num_continuous_variables=num_cont,
-            num_integer_variables=num_int,
+            num_continuous_variables=model.num_continuous,
+            num_integer_variables=model.num_integer,
         )
 
         print(f"Analysis complete for {file_path}. Stats:\n  {stats}")
@@ -441,32 +511,6 @@ def analyze_model_file(file_path: Path, is_milp: bool) -> Optional[ModelStats]:
         return None
 
 
-def count_variable_types(highs: highspy.Highs, num_variables: int) -> tuple[int, int]:
-    """
-    Count continuous and integer variables in a HiGHS model.
-
-    Parameters
-    ----------
-    highs : highspy.Highs
-        HiGHS instance with a model loaded.
-    num_variables : int
-        Number of columns.
-
-    Returns
-    -------
-    tuple[int, int]
-        (num_continuous, num_integer)
-    """
-    num_cont, num_int = 0, 0
-    for i in range(num_variables):
-        var_type = highs.getColIntegrality(i)[1]
-        if var_type == highspy.HighsVarType.kInteger:
-            num_int += 1
-        elif var_type == highspy.HighsVarType.kContinuous:
-            num_cont += 1
-    return num_cont, num_int
-
-
 def is_milp_problem_class(model_info: YamlMap) -> bool:
     """
     Check if model problem class indicates MILP.
@@ -669,24 +713,23 @@ def update_size_in_yaml(
 
 def process_size_entry(
     yaml_data: YamlMap,
-    file_path: Path,
     model_name: str,
     model_info: YamlMap,
     size_entry: YamlMap,
     use_cache: bool,
     cache_dir: Path,
-    yaml_obj: YAML,
     summary: ProcessingSummary,
-) -> None:
+) -> bool:
     """
-    Process a single size entry (download, analyze, update, write-back).
+    Process a single size entry (download, analyze, update in memory).
+
+    The updated YAML data is written back by `process_metadata_file`, once per
+    file.
 
     Parameters
     ----------
     yaml_data : dict
         Parsed YAML root.
-    file_path : Path
-        Source metadata YAML file.
     model_name : str
         Benchmark model key.
     model_info : dict
@@ -697,14 +740,17 @@ def process_size_entry(
         Whether to cache downloads.
     cache_dir : Path
         Cache directory for downloads.
-    yaml_obj : ruamel.yaml.YAML
-        YAML dumper used for writing back.
     summary : ProcessingSummary
         Counters updated in-place.
+
+    Returns
+    -------
+    bool
+        True if the YAML data was updated.
     """
     identity = get_size_entry_identity(size_entry)
     if identity is None:
-        return
+        return False
 
     size_name, url = identity
     summary.total_files += 1
@@ -713,7 +759,7 @@ def process_size_entry(
 
     if stats_are_complete_and_valid(size_entry, milp):
         # We skip analysis to keep runs fast when YAML is already filled.
-        return
+        return False
 
     model_path = download_benchmark_file(
         url,
@@ -722,7 +768,7 @@ def process_size_entry(
     )
     if model_path is None:
         summary.failed_tasks += 1
-        return
+        return False
 
     summary.successful_downloads += 1
 
@@ -733,18 +779,18 @@ def process_size_entry(
 
     if stats is None:
         summary.failed_tasks += 1
-        return
+        return False
 
     summary.successful_analyses += 1
 
     updated = update_size_in_yaml(yaml_data, model_name, size_name, stats)
     if not updated:
         summary.failed_tasks += 1
-        return
+        return False
 
     summary.successful_updates += 1
-    write_yaml_file(file_path, yaml_obj, yaml_data)
     print(f"Updated {model_name} with model stats")
+    return True
 
 
 def process_metadata_file(
@@ -753,10 +799,14 @@ def process_metadata_file(
     cache_dir: Path,
     yaml_obj: YAML,
     summary: ProcessingSummary,
+    dry_run: bool = False,
 ) -> None:
     """
     Process a single metadata YAML file.
 
+    Updates of all size entries are written back once, after all entries of the
+    file are processed or when processing is interrupted.
+
     Parameters
     ----------
     file_path : Path
@@ -769,6 +819,8 @@ def process_metadata_file(
         YAML loader/dumper.
     summary : ProcessingSummary
         Counters updated in-place.
+    dry_run : bool
+        If True, print the diff of the updates instead of writing them.
     """
     if file_path.stat().st_size == 0:
         return
@@ -785,30 +837,37 @@ def process_metadata_file(
     if not isinstance(benchmarks, dict):
         return
 
-    for model_name, model_info in benchmarks.items():
-        if model_info is None:
-            continue
-        if not isinstance(model_info, dict):
-            continue
-
-        for size_entry in iter_size_entries(model_info):
-            process_size_entry(
-                yaml_data=yaml_data,
-                file_path=file_path,
-                model_name=str(model_name),
-                model_info=model_info,
-                size_entry=size_entry,
-                use_cache=use_cache,
-                cache_dir=cache_dir,
-                yaml_obj=yaml_obj,
-                summary=summary,
-            )
+    updated = False
+    try:
+        for model_name, model_info in benchmarks.items():
+            if model_info is None:
+                continue
+            if not isinstance(model_info, dict):
+                continue
+
+            for size_entry in iter_size_entries(model_info):
+                updated |= process_size_entry(
+                    yaml_data=yaml_data,
+                    model_name=str(model_name),
+                    model_info=model_info,
+                    size_entry=size_entry,
+                    use_cache=use_cache,
+                    cache_dir=cache_dir,
+                    summary=summary,
+                )
+    finally:
+        # Also keep the updates made so far if interrupted, e.g. by Ctrl-C
+        if updated and dry_run:
+            print(yaml_diff(file_path, content, yaml_obj, yaml_data), end="")
+        elif updated:
+            write_yaml_file(file_path, yaml_obj, yaml_data)
 
 
 def process_metadata_files(
     benchmark_folder: str,
     output_folder: str,
     use_cache: bool,
+    dry_run: bool = False,
 ) -> ProcessingSummary:
     """
     Process all metadata YAML files under a benchmark directory.
@@ -821,6 +880,8 @@ def process_metadata_files(
         Directory used for cached downloads when cache is enabled.
     use_cache : bool
         If True, downloads are cached under `output_folder`.
+    dry_run : bool
+        If True, print the diffs of the updates instead of writing them.
 
     Returns
     -------
@@ -841,6 +902,7 @@ def process_metadata_files(
                 cache_dir=cache_dir,
                 yaml_obj=yaml_obj,
                 summary=summary,
+                dry_run=dry_run,
             )
         except Exception as exc:
             print(f"Error processing {file_path}: {exc}", file=sys.stderr)
@@ -903,6 +965,11 @@ def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
         action="store_true",
         help="Download to temporary storage instead of using cache dir",
     )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print a diff of the metadata updates instead of writing them",
+    )
     return parser.parse_args(argv)
 
 
@@ -926,6 +993,7 @@ def main(argv: Optional[list[str]] = None) -> int:
         benchmark_folder=args.folder,
         output_folder=args.output_folder,
         use_cache=not args.no_cache,
+        dry_run=args.dry_run,
     )
     print_summary(summary)
 
@@ -31,14 +31,17 @@ METADATA_FILE = REPO_ROOT / "results" / "metadata.yaml"
 INFRASTRUCTURE_DIR = REPO_ROOT / "infrastructure"
 LOCAL_BENCHMARKS_DIR = INFRASTRUCTURE_DIR / "local" / "benchmarks"
 
+# Ordered from smallest to largest
 MACHINE_PROFILES = {
     "short": {
         "machine_type": "c4-standard-2",
         "timeout_seconds": 60 * 60,
+        "memory_mb": 7 * 1024,
     },
     "long": {
         "machine_type": "c4-highmem-16",
         "timeout_seconds": 24 * 60 * 60,
+        "memory_mb": 124 * 1024,
     },
 }
 
@@ -201,6 +204,38 @@ def select_benchmarks(df: pd.DataFrame, args: argparse.Namespace) -> pd.DataFram
     return selected
 
 
+def predict_machine_profiles(
+    selected: pd.DataFrame,
+    benchmarks_df: pd.DataFrame,
+    solvers: list[str],
+) -> pd.Series:
+    """
+    Assign machine profiles from predicted runtimes and peak memory.
+
+    Parameters
+    ----------
+    selected : pandas.DataFrame
+        Selected benchmark instances.
+    benchmarks_df : pandas.DataFrame
+        Flattened metadata of all benchmarks, used to train the predictor.
+    solvers : list[str]
+        Solvers that will be benchmarked.
+
+    Returns
+    -------
+    pandas.Series
+        Machine profile per selected instance. Instances for which no
+        prediction is available fall back to the size-based policy.
+    """
+    from predict_runtime import (  # pylint: disable=import-outside-toplevel
+        predict_profiles,
+    )
+
+    predicted = predict_profiles(selected, benchmarks_df, MACHINE_PROFILES, solvers)
+    fallback = selected["Size"].map(lambda size: "long" if size == "L" else "short")
+    return predicted.fillna(fallback)
+
+
 def allocate_campaign_vms(
     selected: pd.DataFrame,
     allocate_benchmarks,
@@ -229,8 +264,9 @@ def allocate_campaign_vms(
         Metadata column used for greedy workload balancing across VMs.
     machine_profile : str | None
         Machine profile override (``short`` or ``long``). If ``None``,
-        benchmark instances are split automatically according to their
-        metadata size class.
+        benchmark instances are split according to their ``Machine profile``
+        column if present (see ``predict_machine_profiles``), and otherwise
+        automatically according to their metadata size class.
     zone : str
         GCP zone assigned to generated VM definitions.
     timeout_seconds : int | None
@@ -295,6 +331,16 @@ def allocate_campaign_vms(
 
     vm_yamls = []
 
+    if "Machine profile" in selected.columns:
+        for profile in MACHINE_PROFILES:
+            group = selected.loc[selected["Machine profile"] == profile].copy()
+            if not group.empty:
+                group_timeout_seconds = (
+                    timeout_seconds or MACHINE_PROFILES[profile]["timeout_seconds"]
+                )
+                vm_yamls.extend(allocate_group(group, profile, group_timeout_seconds))
+        return vm_yamls
+
     small_medium = selected.loc[selected["Size"].isin(["S", "M"])].copy()
     large = selected.loc[selected["Size"] == "L"].copy()
     other = selected.loc[~selected["Size"].isin(["S", "M", "L"])].copy()
@@ -341,11 +387,15 @@ def print_campaign_summary(
     print(f"Run ID:              {run_id}")
     print(f"VM prefix:           {vm_prefix}")
     print(f"Years:               {', '.join(map(str, years))}")
-    if machine_profile is None:
+    if machine_profile is None and "Machine profile" in selected.columns:
+        print("Machine policy:      predicted from historical results")
+    elif machine_profile is None:
         print("Machine policy:      S/M = short, L = long")
     else:
         print(f"Machine override:    {machine_profile}")
-    if timeout_seconds is None:
+    if timeout_seconds is None and "Machine profile" in selected.columns:
+        print("Timeout policy:      short = 1h (3600 s), long = 24h (86400 s)")
+    elif timeout_seconds is None:
         print("Timeout policy:      S/M = 1h (3600 s), L = 24h (86400 s)")
     else:
         print(
@@ -527,6 +577,17 @@ def build_parser(defaults: dict | None = None) -> argparse.ArgumentParser:
             "If omitted, S/M instances use short and L instances use long."
         ),
     )
+    allocation.add_argument(
+        "--predict-profile",
+        dest="predict_profile",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help=(
+            "Assign machine profiles (and thus timeouts) from runtimes and peak "
+            "memory predicted by benchmarks/predict_runtime.py, instead of from "
+            "the size class. Ignored if --machine-type is given."
+        ),
+    )
     allocation.add_argument(
         "--zone",
         default=argparse.SUPPRESS,
@@ -688,6 +749,7 @@ def flatten_config(config: dict) -> dict:
         "num_vms",
         "weight_col",
         "machine_type",
+        "predict_profile",
         "zone",
         "timeout_hours",
         "years",
@@ -716,6 +778,7 @@ def merge_cli_with_defaults(
         "num_vms": None,
         "weight_col": "Num. variables",
         "machine_type": None,
+        "predict_profile": False,
         "zone": "us-central1-a",
         "timeout_hours": None,
         "years": [2025],
@@ -778,29 +841,32 @@ def write_campaign_summary_csv(
 
     rows = selected.copy().reset_index(drop=True)
 
-    def effective_machine_profile(size: str) -> str:
+    def effective_machine_profile(row: pd.Series) -> str:
         if args.target == "local":
             return "not applicable"
         if machine_profile is not None:
             return machine_profile
+        if "Machine profile" in row.index:
+            return row["Machine profile"]
+        size = row["Size"]
         if size in ["S", "M"]:
             return "short"
         if size == "L":
             return "long"
         return "unknown"
 
-    def effective_machine_type(size: str) -> str:
+    def effective_machine_type(row: pd.Series) -> str:
         if args.target == "local":
             return "not applicable"
-        profile = effective_machine_profile(size)
+        profile = effective_machine_profile(row)
         if profile in MACHINE_PROFILES:
             return MACHINE_PROFILES[profile]["machine_type"]
         return "unknown"
 
-    def effective_timeout_seconds(size: str) -> int | None:
+    def effective_timeout_seconds(row: pd.Series) -> int | None:
         if timeout_seconds is not None:
             return timeout_seconds
-        profile = effective_machine_profile(size)
+        profile = effective_machine_profile(row)
         if profile in MACHINE_PROFILES:
             return MACHINE_PROFILES[profile]["timeout_seconds"]
         return None
@@ -830,10 +896,10 @@ def write_campaign_summary_csv(
                 else "not applicable"
             ),
             "Weight column": args.weight_col,
-            "Machine profile": rows["Size"].apply(effective_machine_profile),
-            "Machine type": rows["Size"].apply(effective_machine_type),
+            "Machine profile": rows.apply(effective_machine_profile, axis=1),
+            "Machine type": rows.apply(effective_machine_type, axis=1),
             "Zone": args.zone if args.target == "cloud" else "not applicable",
-            "Timeout seconds": rows["Size"].apply(effective_timeout_seconds),
+            "Timeout seconds": rows.apply(effective_timeout_seconds, axis=1),
             "Skipped instances included": args.do_not_skip,
         }
     )
@@ -1026,15 +1092,23 @@ def main() -> None:
     benchmarks_df = load_benchmark_metadata(str(METADATA_FILE))
     selected = select_benchmarks(benchmarks_df, args)
 
+    if args.predict_profile and args.machine_type is None:
+        selected["Machine profile"] = predict_machine_profiles(
+            selected, benchmarks_df, args.solver
+        )
+
     timeout_seconds = None
 
     if args.timeout_hours is not None:
         timeout_seconds = int(args.timeout_hours * 3600)
 
     if args.target == "local" and timeout_seconds is None:
-        selected_profiles = selected["Size"].map(
-            lambda size: "long" if size == "L" else "short"
-        )
+        if "Machine profile" in selected.columns:
+            selected_profiles = selected["Machine profile"]
+        else:
+            selected_profiles = selected["Size"].map(
+                lambda size: "long" if size == "L" else "short"
+            )
         timeout_seconds = max(
             MACHINE_PROFILES[profile]["timeout_seconds"]
             for profile in selected_profiles
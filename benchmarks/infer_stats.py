@@ -4,14 +4,17 @@ The inferred stats are written back to the metadata.yaml file.
 """
 
 import re
+import sys
 from collections import defaultdict
 from datetime import datetime
 from glob import glob
 from pathlib import Path
 
-import highspy
 import yaml
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from runner.model_cache import load_model  # noqa: E402
+
 metadata = yaml.safe_load(
     open("/scratch/htc/skrishna/solver-benchmark/benchmarks/pypsa/metadata.yaml")
 )
@@ -36,20 +39,19 @@ if missing_metas:
     )
 # TODO also warn if there's metadata for benchmarks that don't have files?
 
-h = highspy.Highs()
 sizes = defaultdict(list)
 
 for p, b, n, t in benchmarks:
     print(f"{datetime.now()} Analyzing {b}")
     if b not in metadata:
         continue
-    h.readModel(str(p.absolute()))
+    model = load_model(p.absolute())
     sizes[b].append(
         {
             "Temporal resolution": int(t),
             "Spatial resolution": int(n),
-            "N. of constraints": h.numConstrs,
-            "N. of variables": h.numVariables,
+            "N. of constraints": model.num_row,
+            "N. of variables": model.num_col,
         }
     )
 
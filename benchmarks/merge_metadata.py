@@ -3,6 +3,7 @@ import os
 from pathlib import Path
 
 import yaml
+from catalog import read_metadata
 
 # Parse command line arguments
 parser = argparse.ArgumentParser(
@@ -158,23 +159,33 @@ def process_yaml_file(file_path):
         return
 
     try:
-        with open(file_path, "r") as file:
-            yaml_data = yaml.safe_load(file)
-            if not yaml_data:
-                print(f"Skipping file with no content: {file_path}")
-                return
-
-            # Check if 'benchmarks' section exists
-            if "benchmarks" not in yaml_data:
-                print(f"No 'benchmarks' section found in: {file_path}")
-                return
-
-            benchmark_data = yaml_data["benchmarks"]
-
-            # Process benchmark entries with optional validation
-            for model_name, model_info in benchmark_data.items():
-                # Skip validation if requested
-                if args.skip_validation:
+        # Parsed via the catalog, which only re-parses files that changed
+        yaml_data = read_metadata(file_path)
+        if not yaml_data:
+            print(f"Skipping file with no content: {file_path}")
+            return
+
+        # Check if 'benchmarks' section exists
+        if "benchmarks" not in yaml_data:
+            print(f"No 'benchmarks' section found in: {file_path}")
+            return
+
+        benchmark_data = yaml_data["benchmarks"]
+
+        # Process benchmark entries with optional validation
+        for model_name, model_info in benchmark_data.items():
+            # Skip validation if requested
+            if args.skip_validation:
+                # Check for duplicate benchmark names
+                if model_name in unified_metadata:
+                    print(
+                        f"WARNING: Duplicate benchmark name '{model_name}' found in {file_path}. Overwriting previous entry."
+                    )
+
+                unified_metadata[model_name] = model_info
+            else:
+                # Validate entry before adding
+                if validate_benchmark_entry(model_name, model_info, file_path):
                     # Check for duplicate benchmark names
                     if model_name in unified_metadata:
                         print(
@@ -183,19 +194,7 @@ def process_yaml_file(file_path):
 
                     unified_metadata[model_name] = model_info
                 else:
-                    # Validate entry before adding
-                    if validate_benchmark_entry(model_name, model_info, file_path):
-                        # Check for duplicate benchmark names
-                        if model_name in unified_metadata:
-                            print(
-                                f"WARNING: Duplicate benchmark name '{model_name}' found in {file_path}. Overwriting previous entry."
-                            )
-
-                        unified_metadata[model_name] = model_info
-                    else:
-                        print(
-                            f"Skipping invalid benchmark '{model_name}' from {file_path}"
-                        )
+                    print(f"Skipping invalid benchmark '{model_name}' from {file_path}")
 
     except yaml.YAMLError as e:
         print(f"Error parsing YAML file {file_path}: {e}")
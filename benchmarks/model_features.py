@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+"""
+Extract structural features of benchmark models.
+
+The size category of a benchmark is decided by its number of variables alone,
+which explains little of the variation in runtime between instances. This
+script computes further structural features of each model (density, degree
+distributions, coefficient ranges, integrality, block and staircase structure)
+and stores them in a sidecar table `results/model_features.csv`, keyed by
+benchmark and size name.
+
+Models are read through the model cache in `runner/model_cache.py`, and all
+features are computed with vectorized NumPy/SciPy operations on the CSR
+constraint matrix, so that this scales to models with tens of millions of
+nonzeros.
+
+Usage:
+    python benchmarks/model_features.py [--metadata results/metadata.yaml]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import re
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+FEATURES_CSV = REPO_ROOT / "results" / "model_features.csv"
+
+# Rows whose columns span at most this fraction of all columns are "local"
+LOCAL_ROW_SPAN = 0.01
+
+# A model with a detected time index is considered to have a staircase
+# structure if at most this fraction of rows couple non-consecutive periods
+STAIRCASE_MAX_LONG_RANGE_FRACTION = 0.05
+
+# Matches the index part of names like `p[gen1,t12]` or `p(gen1,t12)`
+_INDEX_PATTERN = re.compile(r"[\[\(]([^\[\]\(\)]*)[\]\)]\s*$")
+
+FEATURE_COLUMNS = [
+    "num_rows",
+    "num_cols",
+    "num_nonzeros",
+    "density",
+    "row_nnz_mean",
+    "row_nnz_std",
+    "row_nnz_max",
+    "col_nnz_mean",
+    "col_nnz_std",
+    "col_nnz_max",
+    "coef_min_abs",
+    "coef_max_abs",
+    "coef_range_log10",
+    "obj_min_abs",
+    "obj_max_abs",
+    "obj_range_log10",
+    "rhs_min_abs",
+    "rhs_max_abs",
+    "rhs_range_log10",
+    "bound_min_abs",
+    "bound_max_abs",
+    "bound_range_log10",
+    "num_equality_rows",
+    "equality_row_fraction",
+    "num_free_cols",
+    "binary_fraction",
+    "general_integer_fraction",
+    "num_blocks",
+    "largest_block_fraction",
+    "row_span_mean",
+    "local_row_fraction",
+    "num_time_periods",
+    "intra_period_row_fraction",
+    "inter_period_row_fraction",
+    "long_range_row_fraction",
+    "staircase",
+]
+
+
+def _import_model_cache():
+    """Import `load_model` and integrality codes from `runner/model_cache.py`."""
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    from runner import model_cache  # pylint: disable=import-outside-toplevel
+
+    return model_cache
+
+
+def degree_stats(degrees: np.ndarray, prefix: str) -> dict[str, float]:
+    """
+    Summarize a degree (nonzeros per row/column) distribution.
+
+    Parameters
+    ----------
+    degrees : np.ndarray
+        Number of nonzeros of each row or column.
+    prefix : str
+        Prefix of the feature names, e.g. "row_nnz".
+
+    Returns
+    -------
+    dict[str, float]
+        Mean, standard deviation and maximum of the degrees.
+    """
+    if degrees.size == 0:
+        return {f"{prefix}_mean": 0.0, f"{prefix}_std": 0.0, f"{prefix}_max": 0}
+    return {
+        f"{prefix}_mean": float(degrees.mean()),
+        f"{prefix}_std": float(degrees.std()),
+        f"{prefix}_max": int(degrees.max()),
+    }
+
+
+def magnitude_range(values: np.ndarray, prefix: str) -> dict[str, Optional[float]]:
+    """
+    Compute the range of magnitudes of the finite nonzero entries of `values`.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Coefficients, right-hand sides or bounds.
+    prefix : str
+        Prefix of the feature names, e.g. "coef".
+
+    Returns
+    -------
+    dict[str, float or None]
+        Minimum and maximum absolute value, and log10 of their ratio. All None
+        if there are no finite nonzero entries.
+    """
+    magnitudes = np.abs(values[np.isfinite(values)])
+    magnitudes = magnitudes[magnitudes > 0]
+    if magnitudes.size == 0:
+        return {
+            f"{prefix}_min_abs": None,
+            f"{prefix}_max_abs": None,
+            f"{prefix}_range_log10": None,
+        }
+    lo, hi = float(magnitudes.min()), float(magnitudes.max())
+    return {
+        f"{prefix}_min_abs": lo,
+        f"{prefix}_max_abs": hi,
+        f"{prefix}_range_log10": float(np.log10(hi / lo)),
+    }
+
+
+def row_min_max(matrix: sp.csr_matrix, values: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    Compute the min and max of `values` over the columns of each nonempty row.
+
+    Parameters
+    ----------
+    matrix : scipy.sparse.csr_matrix
+        Constraint matrix.
+    values : np.ndarray
+        One value per column.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        (mask of nonempty rows, row minimum, row maximum) where the minimum and
+        maximum are given for the nonempty rows only.
+    """
+    nonempty = np.diff(matrix.indptr) > 0
+    starts = matrix.indptr[:-1][nonempty]
+    per_nonzero = values[matrix.indices]
+    if starts.size == 0:
+        return nonempty, per_nonzero[:0], per_nonzero[:0]
+    return (
+        nonempty,
+        np.minimum.reduceat(per_nonzero, starts),
+        np.maximum.reduceat(per_nonzero, starts),
+    )
+
+
+def block_structure(matrix: sp.csr_matrix) -> dict[str, Any]:
+    """
+    Detect independent blocks as connected components of the row-column graph.
+
+    Parameters
+    ----------
+    matrix : scipy.sparse.csr_matrix
+        Constraint matrix.
+
+    Returns
+    -------
+    dict[str, Any]
+        Number of blocks (components containing at least one row) and the
+        fraction of columns in the largest block.
+    """
+    num_rows, num_cols = matrix.shape
+    if matrix.nnz == 0:
+        return {"num_blocks": 0, "largest_block_fraction": None}
+    # Bipartite graph on rows + columns, with an edge per nonzero. Only the
+    # row -> column direction is stored; components are computed undirected.
+    indptr = np.concatenate(
+        [matrix.indptr, np.full(num_cols, matrix.nnz, dtype=matrix.indptr.dtype)]
+    )
+    graph = sp.csr_matrix(
+        (
+            np.ones(matrix.nnz, dtype=np.int8),
+            matrix.indices.astype(np.int64) + num_rows,
+            indptr,
+        ),
+        shape=(num_rows + num_cols, num_rows + num_cols),
+    )
+    _, labels = connected_components(graph, directed=False)
+    row_labels = np.unique(labels[:num_rows][np.diff(matrix.indptr) > 0])
+    col_counts = np.bincount(labels[num_rows:], minlength=labels.max() + 1)
+    return {
+        "num_blocks": int(row_labels.size),
+        "largest_block_fraction": float(col_counts[row_labels].max() / num_cols),
+    }
+
+
+def detect_time_index(names: list[str]) -> Optional[np.ndarray]:
+    """
+    Detect the time index of each column from its name.
+
+    Names like `p[gen1,12]` or `p(gen1,2013-01-01T00:00)` are split into their
+    index tuples. The time dimension is taken to be the index position with the
+    most distinct values, as time is the longest dimension in most energy
+    models. Values are ranked numerically if they are all integers, and
+    lexicographically (which orders ISO timestamps correctly) otherwise.
+
+    Parameters
+    ----------
+    names : list[str]
+        Column names.
+
+    Returns
+    -------
+    np.ndarray or None
+        The rank of the time index of each column, with -1 for columns that do
+        not have it, or None if no time index could be detected (e.g. for LP
+        files written by linopy, whose names are plain labels like `x123`).
+    """
+    indices = []
+    for name in names:
+        m = _INDEX_PATTERN.search(name)
+        indices.append(m.group(1).split(",") if m else [])
+    num_positions = max((len(i) for i in indices), default=0)
+    if num_positions == 0:
+        return None
+
+    best, best_distinct = None, 1
+    for pos in range(num_positions):
+        has = np.fromiter((len(i) > pos for i in indices), dtype=bool, count=len(names))
+        tokens = np.array([i[pos].strip() for i in indices if len(i) > pos])
+        try:
+            keys = tokens.astype(np.int64)
+        except ValueError:
+            keys = tokens
+        uniques, ranks = np.unique(keys, return_inverse=True)
+        if uniques.size > best_distinct:
+            time_index = np.full(len(names), -1, dtype=np.int64)
+            time_index[has] = ranks
+            best, best_distinct = time_index, uniques.size
+    return best
+
+
+def temporal_structure(
+    matrix: sp.csr_matrix, names: list[str]
+) -> dict[str, Optional[float]]:
+    """
+    Classify rows by the spread of the time periods of their columns.
+
+    Parameters
+    ----------
+    matrix : scipy.sparse.csr_matrix
+        Constraint matrix.
+    names : list[str]
+        Column names, used to detect the time index.
+
+    Returns
+    -------
+    dict[str, float or None]
+        Number of time periods, fractions of rows within a single period,
+        coupling consecutive periods, and coupling periods further apart, and
+        whether the model has a staircase structure. All None if no time index
+        was detected.
+    """
+    result = {
+        "num_time_periods": None,
+        "intra_period_row_fraction": None,
+        "inter_period_row_fraction": None,
+        "long_range_row_fraction": None,
+        "staircase": None,
+    }
+    time_index = detect_time_index(names)
+    if time_index is None:
+        return result
+
+    # Ignore columns without a time index when computing the spread of a row
+    sentinel = np.iinfo(np.int64).max
+    _, lo, _ = row_min_max(matrix, np.where(time_index < 0, sentinel, time_index))
+    _, _, hi = row_min_max(matrix, time_index)
+    timed = hi >= 0
+    if not timed.any():
+        return result
+    spread = hi[timed] - lo[timed]
+    num_timed = spread.size
+    long_range = float(np.count_nonzero(spread > 1) / num_timed)
+    inter = float(np.count_nonzero(spread == 1) / num_timed)
+    result.update(
+        {
+            "num_time_periods": int(time_index.max() + 1),
+            "intra_period_row_fraction": float(
+                np.count_nonzero(spread == 0) / num_timed
+            ),
+            "inter_period_row_fraction": inter,
+            "long_range_row_fraction": long_range,
+            "staircase": inter > 0 and long_range <= STAIRCASE_MAX_LONG_RANGE_FRACTION,
+        }
+    )
+    return result
+
+
+def compute_features(model: Any) -> dict[str, Any]:
+    """
+    Compute the structural features of a model.
+
+    Parameters
+    ----------
+    model : runner.model_cache.CachedModel
+        Model loaded from the model cache.
+
+    Returns
+    -------
+    dict[str, Any]
+        Mapping from each of `FEATURE_COLUMNS` to its value (None if undefined).
+    """
+    model_cache = _import_model_cache()
+    matrix = model.matrix
+    num_rows, num_cols, nnz = model.num_row, model.num_col, model.num_nz
+
+    features: dict[str, Any] = {
+        "num_rows": num_rows,
+        "num_cols": num_cols,
+        "num_nonzeros": nnz,
+        "density": nnz / (num_rows * num_cols) if num_rows and num_cols else None,
+    }
+    features.update(degree_stats(np.diff(matrix.indptr), "row_nnz"))
+    features.update(
+        degree_stats(np.bincount(matrix.indices, minlength=num_cols), "col_nnz")
+    )
+
+    features.update(magnitude_range(np.asarray(model.data), "coef"))
+    features.update(magnitude_range(np.asarray(model.col_cost), "obj"))
+    features.update(
+        magnitude_range(np.concatenate([model.row_lower, model.row_upper]), "rhs")
+    )
+    features.update(
+        magnitude_range(np.concatenate([model.col_lower, model.col_upper]), "bound")
+    )
+
+    equality = np.count_nonzero(model.row_lower == model.row_upper)
+    features["num_equality_rows"] = int(equality)
+    features["equality_row_fraction"] = equality / num_rows if num_rows else None
+    features["num_free_cols"] = int(
+        np.count_nonzero(np.isneginf(model.col_lower) & np.isposinf(model.col_upper))
+    )
+
+    integer = model.integrality == model_cache.INTEGER
+    binary = integer & (model.col_lower >= 0) & (model.col_upper <= 1)
+    features["binary_fraction"] = (
+        np.count_nonzero(binary) / num_cols if num_cols else None
+    )
+    features["general_integer_fraction"] = (
+        np.count_nonzero(integer & ~binary) / num_cols if num_cols else None
+    )
+
+    features.update(block_structure(matrix))
+
+    nonempty, lo, hi = row_min_max(matrix, np.arange(num_cols, dtype=np.int64))
+    if nonempty.any() and num_cols:
+        span = (hi - lo + 1) / num_cols
+        features["row_span_mean"] = float(span.mean())
+        features["local_row_fraction"] = float(np.mean(span <= LOCAL_ROW_SPAN))
+    else:
+        features["row_span_mean"] = features["local_row_fraction"] = None
+
+    features.update(temporal_structure(matrix, model.col_names))
+    return features
+
+
+def read_features_csv(path: Path) -> dict[tuple[str, str], dict[str, str]]:
+    """
+    Read an existing features table.
+
+    Parameters
+    ----------
+    path : Path
+        Path to the CSV file.
+
+    Returns
+    -------
+    dict[tuple[str, str], dict[str, str]]
+        Rows keyed by (benchmark, size name).
+    """
+    if not path.exists():
+        return {}
+    with open(path, newline="") as f:
+        return {(row["Benchmark"], row["Size"]): row for row in csv.DictReader(f)}
+
+
+def write_features_csv(path: Path, rows: dict[tuple[str, str], dict[str, Any]]) -> None:
+    """
+    Write the features table, sorted by benchmark and size name.
+
+    Parameters
+    ----------
+    path : Path
+        Path to the CSV file.
+    rows : dict[tuple[str, str], dict[str, Any]]
+        Rows keyed by (benchmark, size name).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".csv.tmp")
+    with open(tmp, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["Benchmark", "Size", *FEATURE_COLUMNS])
+        writer.writeheader()
+        for key in sorted(rows):
+            writer.writerow(rows[key])
+    tmp.replace(path)
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """
+    Parse CLI arguments.
+
+    Parameters
+    ----------
+    argv : list[str], optional
+        Command-line arguments. Defaults to sys.argv parsing.
+
+    Returns
+    -------
+    argparse.Namespace
+        Parsed args.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compute structural features of benchmark models.",
+    )
+    parser.add_argument(
+        "--metadata",
+        type=Path,
+        default=REPO_ROOT / "results" / "metadata.yaml",
+        help="Benchmark metadata file (default: results/metadata.yaml)",
+    )
+    parser.add_argument(
+        "--output_folder",
+        type=Path,
+        default=REPO_ROOT / "runner" / "benchmarks",
+        help="Folder for downloaded LP/MPS files (default: ./runner/benchmarks)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=FEATURES_CSV,
+        help="Output CSV file (default: results/model_features.csv)",
+    )
+    parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        default=None,
+        help="Only process these benchmarks (default: all)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Recompute features of instances that are already in the output file",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    CLI entry point.
+
+    Parameters
+    ----------
+    argv : list[str], optional
+        Command-line arguments.
+
+    Returns
+    -------
+    int
+        Exit code.
+    """
+    # Imported here as they are only needed by the CLI
+    from categorize_benchmarks import (  # pylint: disable=import-outside-toplevel
+        create_yaml,
+        download_benchmark_file,
+    )
+
+    args = parse_args(argv)
+    model_cache = _import_model_cache()
+    with open(args.metadata, "r") as f:
+        benchmarks = create_yaml().load(f)["benchmarks"]
+
+    rows = read_features_csv(args.output)
+    failed = 0
+    for benchmark_name, benchmark_info in benchmarks.items():
+        if args.benchmarks is not None and benchmark_name not in args.benchmarks:
+            continue
+        for size in benchmark_info.get("Sizes", []):
+            key = (benchmark_name, size["Name"])
+            if (key in rows and not args.force) or "URL" not in size:
+                continue
+            model_path = download_benchmark_file(
+                size["URL"], use_cache=True, cache_dir=args.output_folder
+            )
+            if model_path is None:
+                failed += 1
+                continue
+            try:
+                features = compute_features(model_cache.load_model(model_path))
+            except Exception as exc:
+                print(f"Error analyzing {model_path}: {exc}", file=sys.stderr)
+                failed += 1
+                continue
+            rows[key] = {"Benchmark": benchmark_name, "Size": size["Name"], **features}
+            # Write after every instance so that progress is kept on interruption
+            write_features_csv(args.output, rows)
+            print(f"Computed features of {benchmark_name}-{size['Name']}")
+
+    print(f"Features of {len(rows)} instances in {args.output}, {failed} failed")
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
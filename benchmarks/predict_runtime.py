@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""Predict solver runtimes and peak memory of benchmark instances.
+
+When a new benchmark is added, we do not know in advance how long each solver
+will take on it, or whether it needs the `short` or `long` machine profile.
+This module fits, per solver, a log-log linear model of runtime and of peak
+memory on instance features:
+
+- `Num. variables`, `Num. constraints`, `Num. nonzeros` from the metadata,
+- the problem class (LP or MILP) and the modelling framework,
+- optionally, structural features from `results/model_features.csv`
+  (see `model_features.py`).
+
+Historical results are taken from `results/benchmark_results.csv`. Timed out
+runs are included with their timeout as runtime, which is a lower bound on the
+true runtime. Predictions come with prediction intervals, computed from the
+residual variance of the fit under a normal approximation.
+
+The predictor is used by `create_benchmark_campaign.py --predict-profile` to
+assign machine profiles, and can also be run on its own:
+
+    python benchmarks/predict_runtime.py --benchmark pypsa-de-elec
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+RESULTS_CSV = REPO_ROOT / "results" / "benchmark_results.csv"
+METADATA_FILE = REPO_ROOT / "results" / "metadata.yaml"
+FEATURES_CSV = REPO_ROOT / "results" / "model_features.csv"
+
+SIZE_COLUMNS = ["Num. variables", "Num. constraints", "Num. nonzeros"]
+
+# Structural features (from model_features.py) used when available
+STRUCTURAL_FEATURES = [
+    "coef_range_log10",
+    "equality_row_fraction",
+    "binary_fraction",
+    "general_integer_fraction",
+    "row_nnz_mean",
+    "col_nnz_max",
+]
+
+# Ridge penalty that keeps the fit stable when few instances share a framework
+RIDGE_PENALTY = 1e-3
+
+# Runtimes and memory below these are dominated by noise and are clamped
+MIN_RUNTIME_S = 1.0
+MIN_MEMORY_MB = 1.0
+
+
+@dataclass
+class LogLinearModel:
+    """Ridge regression of log10(target) on a design matrix, with the data needed
+    to compute prediction intervals."""
+
+    coef: np.ndarray
+    cov: np.ndarray  # (X^T X + penalty I)^-1
+    sigma: float  # Residual standard deviation
+    num_samples: int
+
+    @classmethod
+    def fit(cls, X: np.ndarray, y: np.ndarray) -> LogLinearModel:
+        n, p = X.shape
+        penalty = RIDGE_PENALTY * np.eye(p)
+        penalty[0, 0] = 0  # Do not penalize the intercept
+        cov = np.linalg.pinv(X.T @ X + penalty)
+        coef = cov @ X.T @ y
+        residuals = y - X @ coef
+        dof = max(n - p, 1)
+        sigma = float(np.sqrt(residuals @ residuals / dof))
+        return cls(coef=coef, cov=cov, sigma=sigma, num_samples=n)
+
+    def predict(self, X: np.ndarray, level: float) -> tuple[np.ndarray, ...]:
+        """Return the prediction and the bounds of the `level` prediction interval,
+        all in log10 space."""
+        mean = X @ self.coef
+        z = NormalDist().inv_cdf(0.5 + level / 2)
+        leverage = np.einsum("ij,jk,ik->i", X, self.cov, X)
+        half_width = z * self.sigma * np.sqrt(1 + leverage)
+        return mean, mean - half_width, mean + half_width
+
+
+@dataclass
+class RuntimePredictor:
+    """Per-solver predictor of runtime and peak memory."""
+
+    features: list[str] = field(default_factory=list)
+    frameworks: list[str] = field(default_factory=list)
+    # Mean of each design matrix column in the training data, used for imputation
+    column_means: np.ndarray | None = None
+    runtime_models: dict[str, LogLinearModel] = field(default_factory=dict)
+    memory_models: dict[str, LogLinearModel] = field(default_factory=dict)
+
+    def design_matrix(self, instances: pd.DataFrame) -> np.ndarray:
+        def numeric(col: str) -> np.ndarray:
+            if col not in instances:
+                return np.full(len(instances), np.nan)
+            return pd.to_numeric(instances[col], errors="coerce").to_numpy(float)
+
+        columns = [np.ones(len(instances))]
+        for col in SIZE_COLUMNS:
+            columns.append(np.log10(np.clip(numeric(col), 1, None)))
+        problem_class = instances.get("Problem class")
+        columns.append(
+            (problem_class == "MILP").to_numpy(dtype=float)
+            if problem_class is not None
+            else np.zeros(len(instances))
+        )
+        framework = instances.get("Modelling framework")
+        for fw in self.frameworks:
+            columns.append(
+                (framework == fw).to_numpy(dtype=float)
+                if framework is not None
+                else np.zeros(len(instances))
+            )
+        for feature in self.features:
+            columns.append(numeric(feature))
+        X = np.column_stack(columns)
+
+        # Impute missing values (e.g. instances without structural features)
+        # with the mean of the training data
+        if self.column_means is None:
+            self.column_means = np.nan_to_num(np.nanmean(X, axis=0))
+        return np.where(np.isnan(X), self.column_means, X)
+
+    @classmethod
+    def fit(
+        cls,
+        results: pd.DataFrame,
+        metadata: pd.DataFrame,
+        features: pd.DataFrame | None = None,
+        min_samples: int = 5,
+    ) -> RuntimePredictor:
+        """
+        Fit the predictor on historical benchmark results.
+
+        Parameters
+        ----------
+        results : pandas.DataFrame
+            Benchmark results, as in `results/benchmark_results.csv`. Only the
+            most recent release year of each solver is used.
+        metadata : pandas.DataFrame
+            Flattened metadata indexed by `<benchmark>-<instance>`, as returned
+            by `runner.utils.load_benchmark_metadata`.
+        features : pandas.DataFrame, optional
+            Structural features, as in `results/model_features.csv`.
+        min_samples : int
+            Solvers with fewer training samples than this are not modelled.
+
+        Returns
+        -------
+        RuntimePredictor
+            Fitted predictor.
+        """
+        instances = join_features(metadata, features)
+        predictor = cls(
+            features=[f for f in STRUCTURAL_FEATURES if f in instances],
+            frameworks=sorted(
+                instances.get("Modelling framework", pd.Series(dtype=str))
+                .dropna()
+                .unique()
+            ),
+        )
+        data = training_data(results)[
+            ["Solver", "Runtime (s)", "Memory Usage (MB)", "Instance key"]
+        ].join(instances, on="Instance key", how="inner")
+        # Fixes the imputation means to those of the whole training data
+        predictor.design_matrix(data)
+        for solver, group in data.groupby("Solver"):
+            if len(group) < min_samples:
+                continue
+            X = predictor.design_matrix(group)
+            runtime = np.log10(group["Runtime (s)"].clip(lower=MIN_RUNTIME_S))
+            predictor.runtime_models[solver] = LogLinearModel.fit(X, runtime.to_numpy())
+            with_memory = group["Memory Usage (MB)"].notna().to_numpy()
+            if with_memory.sum() >= min_samples:
+                memory = np.log10(
+                    group.loc[with_memory, "Memory Usage (MB)"].clip(
+                        lower=MIN_MEMORY_MB
+                    )
+                )
+                predictor.memory_models[solver] = LogLinearModel.fit(
+                    X[with_memory], memory.to_numpy()
+                )
+        return predictor
+
+    def predict(
+        self,
+        instances: pd.DataFrame,
+        solvers: list[str] | None = None,
+        level: float = 0.9,
+    ) -> pd.DataFrame:
+        """
+        Predict the runtime and peak memory of each solver on each instance.
+
+        Parameters
+        ----------
+        instances : pandas.DataFrame
+            Flattened metadata of the instances (joined with structural
+            features, if the predictor was fit with them).
+        solvers : list[str], optional
+            Solvers to predict for. Defaults to all modelled solvers.
+        level : float
+            Coverage of the prediction intervals.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per instance and solver, with the predicted runtime and
+            memory and the bounds of their prediction intervals.
+        """
+        X = self.design_matrix(instances)
+        frames = []
+        for solver in solvers or sorted(self.runtime_models):
+            if solver not in self.runtime_models:
+                print(f"WARNING: no runtime model for {solver}", file=sys.stderr)
+                continue
+            frame = pd.DataFrame(index=instances.index)
+            frame["Benchmark"] = instances.get("Benchmark")
+            frame["Instance"] = instances.get("Instance")
+            frame["Solver"] = solver
+            mean, lo, hi = self.runtime_models[solver].predict(X, level)
+            frame["Runtime (s)"] = 10**mean
+            frame["Runtime lower (s)"] = 10**lo
+            frame["Runtime upper (s)"] = 10**hi
+            if solver in self.memory_models:
+                mean, lo, hi = self.memory_models[solver].predict(X, level)
+                frame["Memory (MB)"] = 10**mean
+                frame["Memory lower (MB)"] = 10**lo
+                frame["Memory upper (MB)"] = 10**hi
+            frames.append(frame)
+        return pd.concat(frames) if frames else pd.DataFrame()
+
+
+def training_data(results: pd.DataFrame) -> pd.DataFrame:
+    """Select the runs of the latest release year of each solver that either
+    solved the instance or timed out, keyed by `<benchmark>-<size>`."""
+    df = results.copy()
+    df["Runtime (s)"] = pd.to_numeric(df["Runtime (s)"], errors="coerce")
+    df["Memory Usage (MB)"] = pd.to_numeric(df["Memory Usage (MB)"], errors="coerce")
+    df["Timeout"] = pd.to_numeric(df["Timeout"], errors="coerce")
+    latest_year = df.groupby("Solver")["Solver Release Year"].transform("max")
+    df = df.loc[df["Solver Release Year"] == latest_year]
+
+    timed_out = df["Status"] == "TO"
+    df.loc[timed_out, "Runtime (s)"] = df.loc[timed_out, "Timeout"]
+    df = df.loc[(df["Status"] == "ok") | timed_out]
+    df = df.loc[df["Runtime (s)"].notna()].copy()
+    df["Instance key"] = df["Benchmark"] + "-" + df["Size"].astype(str)
+    return df
+
+
+def join_features(
+    metadata: pd.DataFrame, features: pd.DataFrame | None
+) -> pd.DataFrame:
+    """Join structural features, keyed by benchmark and size, onto the metadata."""
+    if features is None or features.empty:
+        return metadata
+    features = features.copy()
+    features.index = features["Benchmark"] + "-" + features["Size"].astype(str)
+    columns = [c for c in STRUCTURAL_FEATURES if c in features]
+    return metadata.join(features[columns], how="left")
+
+
+def recommend_profiles(
+    predictions: pd.DataFrame, profiles: dict[str, dict], safety_factor: float = 2.0
+) -> pd.Series:
+    """
+    Pick the smallest machine profile that fits each instance.
+
+    An instance fits a profile if the predicted runtime of the fastest solver,
+    times `safety_factor`, is within the profile's timeout, and the upper bound
+    of the predicted memory of every solver is within the profile's memory.
+    Running out of memory loses the result of a run, whereas a slow solver
+    timing out is expected, hence the upper bound is only used for memory.
+    Instances that fit no profile get the largest one.
+
+    Parameters
+    ----------
+    predictions : pandas.DataFrame
+        Output of `RuntimePredictor.predict`.
+    profiles : dict[str, dict]
+        Machine profiles with `timeout_seconds` and `memory_mb`, ordered from
+        smallest to largest.
+    safety_factor : float
+        Factor applied to the predicted runtime.
+
+    Returns
+    -------
+    pandas.Series
+        Profile name per instance (indexed like the predictions' instances).
+        Empty if there are no predictions, e.g. if no solver has a model.
+    """
+    if "Runtime (s)" not in predictions:
+        return pd.Series(dtype=object)
+    grouped = predictions.groupby(level=0)
+    runtime = grouped["Runtime (s)"].min() * safety_factor
+    if "Memory upper (MB)" in predictions:
+        memory = grouped["Memory upper (MB)"].max().fillna(0)
+    else:
+        memory = pd.Series(0.0, index=runtime.index)
+
+    names = list(profiles)
+    chosen = pd.Series(names[-1], index=runtime.index)
+    # Assign from largest to smallest, so that the smallest fitting one wins
+    for name in reversed(names):
+        fits = (runtime <= profiles[name]["timeout_seconds"]) & (
+            memory <= profiles[name]["memory_mb"]
+        )
+        chosen[fits] = name
+    return chosen
+
+
+def load_predictor(
+    metadata: pd.DataFrame,
+    results_csv: Path = RESULTS_CSV,
+    features_csv: Path = FEATURES_CSV,
+) -> RuntimePredictor:
+    """Fit a predictor on the results and features CSVs in the repository."""
+    results = pd.read_csv(results_csv)
+    features = pd.read_csv(features_csv) if Path(features_csv).exists() else None
+    return RuntimePredictor.fit(results, metadata, features)
+
+
+def predict_profiles(
+    instances: pd.DataFrame,
+    metadata: pd.DataFrame,
+    profiles: dict[str, dict],
+    solvers: list[str] | None = None,
+) -> pd.Series:
+    """
+    Predict the machine profile of each instance from the historical results.
+
+    Parameters
+    ----------
+    instances : pandas.DataFrame
+        Flattened metadata of the instances to assign profiles to.
+    metadata : pandas.DataFrame
+        Flattened metadata of all benchmarks, used for training.
+    profiles : dict[str, dict]
+        Machine profiles, see `recommend_profiles`.
+    solvers : list[str], optional
+        Solvers that will be run. Solvers without a model are ignored.
+
+    Returns
+    -------
+    pandas.Series
+        Profile name per instance, indexed like `instances`, and NaN for
+        instances without predictions.
+    """
+    predictor = load_predictor(metadata)
+    if solvers is not None:
+        solvers = [s for s in solvers if s in predictor.runtime_models]
+        if not solvers:
+            return pd.Series(index=instances.index, dtype=object)
+    features = pd.read_csv(FEATURES_CSV) if FEATURES_CSV.exists() else None
+    predictions = predictor.predict(join_features(instances, features), solvers)
+    return recommend_profiles(predictions, profiles).reindex(instances.index)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Predict solver runtimes and peak memory of benchmark instances."
+    )
+    parser.add_argument(
+        "--benchmark",
+        nargs="+",
+        default=None,
+        help="Benchmarks to predict for (default: all in the metadata)",
+    )
+    parser.add_argument(
+        "--solver",
+        nargs="+",
+        default=None,
+        help="Solvers to predict for (default: all with enough historical results)",
+    )
+    parser.add_argument("--metadata", type=Path, default=METADATA_FILE)
+    parser.add_argument("--results", type=Path, default=RESULTS_CSV)
+    parser.add_argument("--features", type=Path, default=FEATURES_CSV)
+    parser.add_argument(
+        "--level",
+        type=float,
+        default=0.9,
+        help="Coverage of the prediction intervals (default: 0.9)",
+    )
+    parser.add_argument("--output", type=Path, help="Write predictions to this CSV")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(REPO_ROOT))
+    from runner.utils import (  # pylint: disable=import-outside-toplevel
+        load_benchmark_metadata,
+    )
+
+    metadata = load_benchmark_metadata(str(args.metadata))
+    predictor = load_predictor(metadata, args.results, args.features)
+
+    instances = join_features(
+        metadata,
+        pd.read_csv(args.features) if args.features.exists() else None,
+    )
+    if args.benchmark:
+        instances = instances.loc[instances["Benchmark"].isin(args.benchmark)]
+    predictions = predictor.predict(instances, args.solver, args.level)
+
+    if args.output:
+        predictions.to_csv(args.output, index=False)
+        print(f"Wrote predictions to {args.output}")
+    else:
+        with pd.option_context("display.max_rows", None, "display.width", 200):
+            print(predictions.round(1).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
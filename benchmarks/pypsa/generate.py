@@ -26,9 +26,15 @@ python benchmarks/pypsa/generate.py \
 # actually generating the files.
 python benchmarks/pypsa/generate.py -n
 
+# Generate all combinations with a single Snakemake run, which shares the
+# intermediate files between them, runs independent jobs in parallel, and skips
+# problem files that were already generated by a previous (interrupted) run.
+python benchmarks/pypsa/generate.py --single_dag -c 50 100 -r 1h 3h
+
 """
 
 import argparse
+import copy
 import os
 import pathlib
 import re
@@ -39,6 +45,21 @@ from ruamel.yaml.scalarstring import DoubleQuotedScalarString
 
 DEFAULT_BENCHMARKS = ["pypsa-eur-elec", "pypsa-eur-sec"]
 
+HORIZON = "2050"
+
+# Networks solved by solve_elec_networks and solve_sector_networks for each run, as
+# in the Snakefile of the PyPSA-Eur version of the Dockerfile
+SOLVED_NETWORKS = {
+    "elec": "results/{run}/networks/base_s_{clusters}_elec_{opts}.nc",
+    "sec": (
+        "results/{run}/postnetworks/"
+        "base_s_{clusters}_{opts}_{sector_opts}_{planning_horizons}.nc"
+    ),
+}
+
+# Snakemake's progress lines, e.g. "3 of 42 steps (7%) done"
+PROGRESS_RE = re.compile(r"(\d+) of (\d+) steps \((\d+%)\) done")
+
 
 def load_yaml(path: pathlib.Path) -> dict:
     """
@@ -230,10 +251,15 @@ def parse_args() -> argparse.Namespace:
         type=validate_time_resolution,
         default=["1h", "3h", "12h", "24h"],
     )
+    p.add_argument(
+        "--single_dag",
+        action="store_true",
+        help="Generate all combinations with a single Snakemake run",
+    )
     return p.parse_args()
 
 
-def run(cmd: str) -> None:
+def run(cmd: str, on_line=None) -> None:
     """
     Execute a shell command and stream its output.
 
@@ -246,6 +272,8 @@ def run(cmd: str) -> None:
     ----------
     cmd : str
         The command string to be executed.
+    on_line : callable, optional
+        Called with each line of output, after it is printed.
 
     Raises
     ------
@@ -260,6 +288,8 @@ def run(cmd: str) -> None:
     )
     for line in proc.stdout:
         print(line, end="")
+        if on_line is not None:
+            on_line(line)
     proc.wait()
 
     if proc.returncode != 0:
@@ -300,49 +330,99 @@ def generate_benchmark(name: str, config_path: pathlib.Path, dry: bool) -> None:
         )
 
 
-if __name__ == "__main__":
-    args = parse_args()
+def fix_countries(cfg: dict) -> None:
+    """
+    Quote country codes in-place, so that Norway is not written as `NO` (False).
 
-    base_dir = pathlib.Path(__file__).parent
-    default_cfg = load_yaml(pathlib.Path(base_dir, "config", "config.default.yaml"))
-    benchmark_files = select_yaml_files(
-        args.benchmark_name, pathlib.Path(base_dir, "config")
-    )
+    Parameters
+    ----------
+    cfg : dict
+        A configuration dictionary, with or without a `countries` list.
+    """
+    if "countries" in cfg:
+        cleaned = []
+        for c in cfg["countries"]:
+            if c is False or c == "NO":
+                cleaned.append(DoubleQuotedScalarString("NO"))
+            else:
+                cleaned.append(DoubleQuotedScalarString(str(c)))
+        cfg["countries"] = cleaned
+
+
+def combination_overrides(
+    bench_cfg: dict, clusters: int, t_res: str, bench_type: str
+) -> dict:
+    """
+    Configuration of a benchmark for one combination of parameters.
 
-    bench_type = "elec" if "elec" in args.benchmark_name else "sec"
-    horizon = "2050"
+    Parameters
+    ----------
+    bench_cfg : dict
+        The benchmark-specific configuration.
+    clusters : int
+        The number of clusters.
+    t_res : str
+        The time resolution (e.g., '3H').
+    bench_type : str
+        Either 'elec' or 'sec'.
+
+    Returns
+    -------
+    dict
+        A copy of `bench_cfg` with the scenario and temporal resolution set.
+    """
+    cfg = copy.deepcopy(bench_cfg)
+
+    cfg.setdefault("scenario", {})
+    cfg["scenario"]["clusters"] = [clusters]
+    cfg["scenario"]["planning_horizons"] = [HORIZON]
+
+    cfg.setdefault("clustering", {})
+    cfg["clustering"].setdefault("temporal", {})
+    if bench_type == "elec":
+        cfg["clustering"]["temporal"]["resolution_elec"] = t_res
+    else:
+        cfg["clustering"]["temporal"]["resolution_sector"] = t_res
+
+    fix_countries(cfg)
+    return cfg
+
+
+def generate_per_combination(
+    args: argparse.Namespace,
+    default_cfg: dict,
+    benchmark_files: list[pathlib.Path],
+    bench_type: str,
+) -> None:
+    """
+    Generate each combination of benchmark files, clusters and time resolutions
+    with its own Snakemake run and configuration file.
 
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command-line arguments.
+    default_cfg : dict
+        The default PyPSA-Eur configuration.
+    benchmark_files : list[pathlib.Path]
+        The benchmark-specific configuration files.
+    bench_type : str
+        Either 'elec' or 'sec'.
+    """
     for bench_file in benchmark_files:
         bench_cfg = load_yaml(bench_file)
 
         for clusters in args.clusters:
             for t_res in args.time_resolutions:
                 # Build merged config
-                final_cfg = recursive_merge(default_cfg.copy(), bench_cfg.copy())
-
-                final_cfg.setdefault("scenario", {})
-                final_cfg["scenario"]["clusters"] = [clusters]
-                final_cfg["scenario"]["planning_horizons"] = [horizon]
-
-                final_cfg.setdefault("clustering", {})
-                final_cfg["clustering"].setdefault("temporal", {})
-                if bench_type == "elec":
-                    final_cfg["clustering"]["temporal"]["resolution_elec"] = t_res
-                else:
-                    final_cfg["clustering"]["temporal"]["resolution_sector"] = t_res
-
-                # Fix NO/False issue
-                if "countries" in final_cfg:
-                    cleaned = []
-                    for c in final_cfg["countries"]:
-                        if c is False or c == "NO":
-                            cleaned.append(DoubleQuotedScalarString("NO"))
-                        else:
-                            cleaned.append(DoubleQuotedScalarString(str(c)))
-                    final_cfg["countries"] = cleaned
+                final_cfg = recursive_merge(
+                    copy.deepcopy(default_cfg),
+                    combination_overrides(bench_cfg, clusters, t_res, bench_type),
+                )
+                fix_countries(final_cfg)
 
                 out_cfg = bench_file.with_stem(
-                    f"{bench_file.stem}_{clusters}_{t_res}_{horizon}"
+                    f"{bench_file.stem}_{clusters}_{t_res}_{HORIZON}"
                 )
                 save_yaml(out_cfg, final_cfg)
 
@@ -356,3 +436,126 @@ if __name__ == "__main__":
                 generate_benchmark(args.benchmark_name, out_cfg, args.dry_run)
 
                 out_cfg.unlink(missing_ok=True)
+
+
+def generate_single_dag(
+    args: argparse.Namespace,
+    default_cfg: dict,
+    benchmark_files: list[pathlib.Path],
+    bench_type: str,
+) -> None:
+    """
+    Generate all combinations of benchmark files, clusters and time resolutions
+    with a single Snakemake run.
+
+    Each combination is a PyPSA-Eur scenario, named like the problem file it
+    generates. All scenarios are written to one scenarios file, and Snakemake is
+    invoked once on the solved networks of all scenarios, so that resources that
+    don't depend on the scenario (e.g. the base network) are built once and
+    independent jobs run in parallel. Combinations whose problem file already
+    exists are skipped, and incomplete outputs of an interrupted run are
+    regenerated, so that the generation can be resumed by running it again.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command-line arguments.
+    default_cfg : dict
+        The default PyPSA-Eur configuration.
+    benchmark_files : list[pathlib.Path]
+        The benchmark-specific configuration files.
+    bench_type : str
+        Either 'elec' or 'sec'.
+    """
+    output_dir = pathlib.Path(args.output_dir)
+    scenarios, problem_files = {}, {}
+    for bench_file in benchmark_files:
+        bench_cfg = load_yaml(bench_file)
+        for clusters in args.clusters:
+            for t_res in args.time_resolutions:
+                name = f"{bench_file.stem}_{clusters}_{t_res}_{HORIZON}"
+                problem_file = output_dir / f"{name}{args.file_extension}"
+                if problem_file.exists():
+                    print(f"Skipping {name}: {problem_file} already exists")
+                    continue
+                scenarios[name] = combination_overrides(
+                    bench_cfg, clusters, t_res, bench_type
+                )
+                problem_files[name] = problem_file
+
+    if not scenarios:
+        print("All problem files already exist.")
+        return
+
+    config_dir = benchmark_files[0].parent
+    scenarios_path = config_dir / f"{args.benchmark_name}_scenarios.yaml"
+    save_yaml(scenarios_path, scenarios)
+
+    combined_cfg = copy.deepcopy(default_cfg)
+    fix_countries(combined_cfg)
+    combined_cfg.setdefault("run", {})
+    combined_cfg["run"]["name"] = list(scenarios)
+    combined_cfg["run"]["scenarios"] = {"enable": True, "file": str(scenarios_path)}
+    combined_cfg["run"].setdefault("shared_resources", {})
+    combined_cfg["run"]["shared_resources"]["policy"] = "base"
+    config_path = config_dir / f"{args.benchmark_name}_combined.yaml"
+    save_yaml(config_path, combined_cfg)
+
+    targets = []
+    for name, overrides in scenarios.items():
+        scenario = {**combined_cfg.get("scenario", {}), **overrides["scenario"]}
+        targets.append(
+            SOLVED_NETWORKS[bench_type].format(
+                run=name,
+                **{k: v[0] if isinstance(v, list) else v for k, v in scenario.items()},
+            )
+        )
+
+    # The patched solve_network.py fills in the run name of each scenario
+    os.environ["ONLY_GENERATE_PROBLEM_FILE"] = str(
+        output_dir / f"{{run}}{args.file_extension}"
+    )
+
+    done = set()
+
+    def report_progress(line: str) -> None:
+        m = PROGRESS_RE.search(line)
+        if m is None:
+            return
+        for name, problem_file in problem_files.items():
+            if name not in done and problem_file.exists():
+                done.add(name)
+                print(f"Generated {problem_file}")
+        print(
+            f"Progress: {m.group(3)} of jobs, "
+            f"{len(done)}/{len(problem_files)} problem files"
+        )
+
+    dry_flag = "-n" if args.dry_run else ""
+    try:
+        run(
+            f"snakemake --snakefile Snakefile {' '.join(targets)} "
+            f"--configfile {config_path} {dry_flag} --cores all "
+            "--rerun-incomplete --keep-going",
+            on_line=report_progress,
+        )
+    finally:
+        config_path.unlink(missing_ok=True)
+        scenarios_path.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    base_dir = pathlib.Path(__file__).parent
+    default_cfg = load_yaml(pathlib.Path(base_dir, "config", "config.default.yaml"))
+    benchmark_files = select_yaml_files(
+        args.benchmark_name, pathlib.Path(base_dir, "config")
+    )
+
+    bench_type = "elec" if "elec" in args.benchmark_name else "sec"
+
+    if args.single_dag:
+        generate_single_dag(args, default_cfg, benchmark_files, bench_type)
+    else:
+        generate_per_combination(args, default_cfg, benchmark_files, bench_type)
@@ -1,13 +1,12 @@
 import sys
 from pathlib import Path
 
-import pandas as pd
 import streamlit as st
 
 # local
 # Adds the parent directory to sys.path to make imports work in both GitHub Actions CI and locally.
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
-from pocs.streamlit.utils.file_utils import load_benchmark_data, load_metadata
+from pocs.streamlit.utils.file_utils import load_benchmark_data, load_metadata_df
 
 st.markdown(
     """
@@ -48,10 +47,8 @@ pages = [
     st.Page("raw-results.py", title="Full Results"),
 ]
 
-metadata = load_metadata("results/metadata.yaml")
-# Convert metadata to a DataFrame for easier filtering
-metadata_df = pd.DataFrame(metadata["benchmarks"]).T.reset_index()
-metadata_df.rename(columns={"index": "Benchmark Name"}, inplace=True)
+# Metadata as a DataFrame for easier filtering
+metadata_df = load_metadata_df()
 # Load the data from the CSV file
 data_df = load_benchmark_data()
 
@@ -5,32 +5,13 @@ from st_aggrid import AgGrid
 from st_aggrid.grid_options_builder import GridOptionsBuilder
 
 # local
-from pocs.streamlit.utils.calculations import safe_parse_version
-from pocs.streamlit.utils.file_utils import load_benchmark_data, load_metadata
+from pocs.streamlit.utils.file_utils import load_latest_benchmark_data, load_metadata
 
-df_mean_stddev = load_benchmark_data("results/benchmark_results_mean_stddev.csv")
-df_mean_stddev["Solver Version"] = df_mean_stddev["Solver Version"].apply(
-    safe_parse_version
-)
-df_mean_stddev = df_mean_stddev.sort_values(
-    by=["Solver", "Solver Version"], ascending=[True, False]
-)
-df_mean_stddev = df_mean_stddev.drop_duplicates(
-    subset=["Solver", "Benchmark", "Size"], keep="first"
-)
-
-
-df_result = load_benchmark_data()
-df_result["Solver Version"] = df_result["Solver Version"].apply(safe_parse_version)
-df_result = df_result.sort_values(
-    by=["Solver", "Solver Version"], ascending=[True, False]
-)
-df_result = df_result.drop_duplicates(
-    subset=["Solver", "Benchmark", "Size"], keep="first"
-)
+df_mean_stddev = load_latest_benchmark_data("results/benchmark_results_mean_stddev.csv")
+df_result = load_latest_benchmark_data()
 
 # Load benchmark metadata
-metadata = load_metadata("results/metadata.yaml")
+metadata = load_metadata()
 benchmark_metadata = metadata["benchmarks"]
 # Title of the Benchmarks page
 st.title("Benchmarks")
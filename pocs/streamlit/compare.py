@@ -1,4 +1,3 @@
-import pandas as pd
 import streamlit as st
 import streamlit_shadcn_ui as ui
 
@@ -7,21 +6,17 @@ from pocs.streamlit.components.filter import (
     display_filter_status,
     generate_filtered_metadata,
 )
-from pocs.streamlit.utils.calculations import safe_parse_version
-from pocs.streamlit.utils.file_utils import load_benchmark_data, load_metadata
+from pocs.streamlit.utils.file_utils import load_metadata_df, load_sorted_benchmark_data
 from pocs.streamlit.utils.filters import filter_data
 
-metadata = load_metadata("results/metadata.yaml")
-
-# Convert metadata to a DataFrame for easier filtering
-metadata_df = pd.DataFrame(metadata["benchmarks"]).T.reset_index()
-metadata_df.rename(columns={"index": "Benchmark Name"}, inplace=True)
+# Metadata as a DataFrame for easier filtering
+metadata_df = load_metadata_df()
 
 # Filter
 filtered_metadata = generate_filtered_metadata(metadata_df)
 
-# Load the data
-df = load_benchmark_data()
+# Load the data, sorted so that the latest version of each solver comes first
+df = load_sorted_benchmark_data()
 
 # Filter the benchmark data to match the filtered metadata
 if not filtered_metadata.empty:
@@ -30,11 +25,6 @@ if not filtered_metadata.empty:
 # Filter status
 display_filter_status(df, filtered_metadata)
 
-# Ensure we plot the latest version of each solver if there are multiple versions.
-if "Solver Version" in df.columns:
-    df["Solver Version"] = df["Solver Version"].apply(safe_parse_version)
-    df = df.sort_values(by=["Solver", "Solver Version"], ascending=[True, False])
-
 st.title("Compare Solvers")
 
 # Get list of unique solvers from the data
@@ -1,5 +1,7 @@
 import streamlit as st
 
+from runner.analytics import RUNTIME_BUCKETS
+
 
 def generate_filtered_metadata(metadata_df):
     # Sidebar with filters
@@ -33,8 +35,8 @@ def generate_filtered_metadata(metadata_df):
 
         selected_problem_size = st.multiselect(
             "Problem Size",
-            options=["XXS", "XS", "S", "M", "L"],
-            default=["XXS", "XS", "S", "M", "L"],
+            options=list(RUNTIME_BUCKETS),
+            default=list(RUNTIME_BUCKETS),
         )
 
     # Apply the filters
@@ -1,4 +1,3 @@
-import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
@@ -7,14 +6,12 @@ from pocs.streamlit.components.filter import (
     display_filter_status,
     generate_filtered_metadata,
 )
-from pocs.streamlit.utils.calculations import calculate_sgm
-from pocs.streamlit.utils.file_utils import load_benchmark_data, load_metadata
+from pocs.streamlit.utils.file_utils import load_benchmark_data, load_metadata_df
 from pocs.streamlit.utils.filters import filter_data
+from runner.analytics import sgm_by_group
 
-# Convert metadata to a DataFrame for easier filtering
-metadata = load_metadata("results/metadata.yaml")
-metadata_df = pd.DataFrame(metadata["benchmarks"]).T.reset_index()
-metadata_df.rename(columns={"index": "Benchmark Name"}, inplace=True)
+# Metadata as a DataFrame for easier filtering
+metadata_df = load_metadata_df()
 
 # Filter
 filtered_metadata = generate_filtered_metadata(metadata_df)
@@ -33,10 +30,8 @@ display_filter_status(data, filtered_metadata)
 data["Year"] = data["Solver Release Year"].astype(int)
 
 # Group by Solver and Year to calculate SGMs for Runtime (s)
-solver_sgm_runtime = (
-    data.groupby(["Solver", "Year"])["Runtime (s)"]
-    .apply(lambda x: calculate_sgm(x))
-    .reset_index(name="SGM_Runtime")
+solver_sgm_runtime = sgm_by_group(data, ["Solver", "Year"], "Runtime (s)").reset_index(
+    name="SGM_Runtime"
 )
 
 # Normalize the SGMs for Runtime (s)
@@ -46,11 +41,9 @@ solver_sgm_runtime["Normalized SGM_Runtime"] = (
 )
 
 # Group by Solver and Year to calculate SGMs for Memory Usage (MB)
-solver_sgm_memory = (
-    data.groupby(["Solver", "Year"])["Memory Usage (MB)"]
-    .apply(lambda x: calculate_sgm(x))
-    .reset_index(name="SGM_Memory")
-)
+solver_sgm_memory = sgm_by_group(
+    data, ["Solver", "Year"], "Memory Usage (MB)"
+).reset_index(name="SGM_Memory")
 
 # Normalize the SGMs for Memory Usage (MB)
 min_sgm_memory = solver_sgm_memory["SGM_Memory"].min()
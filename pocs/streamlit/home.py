@@ -7,15 +7,19 @@ from pocs.streamlit.components.filter import (
     generate_filtered_metadata,
 )
 from pocs.streamlit.components.home_chart import render_benchmark_scatter_plot
-from pocs.streamlit.utils.calculations import calculate_sgm, safe_parse_version
-from pocs.streamlit.utils.file_utils import load_benchmark_data, load_metadata
+from pocs.streamlit.utils.file_utils import (
+    load_benchmark_data,
+    load_latest_benchmark_data,
+    load_metadata,
+    load_metadata_df,
+)
 from pocs.streamlit.utils.filters import filter_data
+from runner.analytics import shifted_geometric_mean
 
-metadata = load_metadata("results/metadata.yaml")
+metadata = load_metadata()
 
-# Convert metadata to a DataFrame for easier filtering
-metadata_df = pd.DataFrame(metadata["benchmarks"]).T.reset_index()
-metadata_df.rename(columns={"index": "Benchmark Name"}, inplace=True)
+# Metadata as a DataFrame for easier filtering
+metadata_df = load_metadata_df()
 
 # Load the data from the CSV file
 raw_df = load_benchmark_data()
@@ -67,14 +71,8 @@ if filtered_metadata.empty:
     st.warning("No matching models found. Please adjust your filter selections.")
 
 
-# Sort the DataFrame by Benchmark and Runtime to ensure logical line connections
-df = df.sort_values(by=["Benchmark", "Runtime (s)"])
-
 # Ensure we plot the latest version of each solver if there are multiple versions.
-if "Solver Version" in df.columns:
-    df["Solver Version"] = df["Solver Version"].apply(safe_parse_version)
-    df = df.sort_values(by=["Solver", "Solver Version"], ascending=[True, False])
-    df = df.drop_duplicates(subset=["Solver", "Size", "Benchmark"], keep="first")
+df = load_latest_benchmark_data()
 
 # Filter the benchmark data to match the filtered metadata
 if not filtered_metadata.empty:
@@ -103,7 +101,7 @@ def combine_sgm_tables(df):
     for (solver, version), group in grouped:
         # Calculate SGM for Runtime
         runtime_values = group["Runtime (s)"]
-        sgm_runtime = calculate_sgm(runtime_values)
+        sgm_runtime = shifted_geometric_mean(runtime_values)
 
         # Calculate Min and Max Runtime
         min_runtime = runtime_values.min()
@@ -136,7 +134,7 @@ def combine_sgm_tables(df):
     sgm_memory_data = []
     for (solver, version), group in grouped:
         memory_values = group["Memory Usage (MB)"]
-        sgm_memory = calculate_sgm(memory_values)
+        sgm_memory = shifted_geometric_mean(memory_values)
 
         sgm_memory_data.append(
             {
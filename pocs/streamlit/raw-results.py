@@ -1,4 +1,3 @@
-import pandas as pd
 import streamlit as st
 
 # local
@@ -7,14 +6,11 @@ from pocs.streamlit.components.filter import (
     display_filter_status,
     generate_filtered_metadata,
 )
-from pocs.streamlit.utils.file_utils import load_benchmark_data, load_metadata
+from pocs.streamlit.utils.file_utils import load_benchmark_data, load_metadata_df
 from pocs.streamlit.utils.filters import filter_data
 
-metadata = load_metadata("results/metadata.yaml")
-
-# Convert metadata to a DataFrame for easier filtering
-metadata_df = pd.DataFrame(metadata["benchmarks"]).T.reset_index()
-metadata_df.rename(columns={"index": "Benchmark Name"}, inplace=True)
+# Metadata as a DataFrame for easier filtering
+metadata_df = load_metadata_df()
 
 
 # Custom CSS
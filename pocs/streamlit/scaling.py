@@ -6,8 +6,11 @@ from pocs.streamlit.components.filter import (
     display_filter_status,
     generate_filtered_metadata,
 )
-from pocs.streamlit.utils.calculations import safe_parse_version
-from pocs.streamlit.utils.file_utils import load_benchmark_data, load_metadata
+from pocs.streamlit.utils.file_utils import (
+    load_latest_benchmark_data,
+    load_metadata,
+    load_metadata_df,
+)
 from pocs.streamlit.utils.filters import filter_data
 
 
@@ -70,14 +73,9 @@ def create_subplots(data, y_metric):
 st.title("OET/BE Solver Benchmark")
 
 
-# Load benchmark results
-raw_df = load_benchmark_data()
-
-
 # Load metadata
-metadata = load_metadata("results/metadata.yaml")
-metadata_df = pd.DataFrame(metadata["benchmarks"]).T.reset_index()
-metadata_df.rename(columns={"index": "Benchmark Name"}, inplace=True)
+metadata = load_metadata()
+metadata_df = load_metadata_df()
 
 # Filter
 
@@ -86,12 +84,8 @@ filtered_metadata = generate_filtered_metadata(metadata_df)
 
 if filtered_metadata.empty:
     st.warning("No matching models found. Please adjust your filter selections.")
-df = raw_df
 # Ensure we plot the latest version of each solver if there are multiple versions.
-if "Solver Version" in df.columns:
-    df["Solver Version"] = df["Solver Version"].apply(safe_parse_version)
-    df = df.sort_values(by=["Solver", "Solver Version"], ascending=[True, False])
-    df = df.drop_duplicates(subset=["Solver", "Benchmark", "Size"], keep="first")
+df = load_latest_benchmark_data()
 
 # Aggregate data from all benchmarks
 all_enriched_data = []
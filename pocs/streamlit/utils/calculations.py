@@ -1,4 +1,4 @@
-import numpy as np
+import pandas as pd
 from packaging.version import Version
 
 
@@ -10,7 +10,8 @@ def safe_parse_version(v):
         return Version("0")
 
 
-def calculate_sgm(data_points, sh=10):
-    data_points = np.maximum(1, data_points + sh)
-    sgm = np.exp(np.mean(np.log(data_points))) - sh
-    return sgm
+def parse_versions(versions: pd.Series) -> pd.Series:
+    """Apply `safe_parse_version` to a column, parsing each distinct version once."""
+    versions = versions.astype(str)
+    parsed = {v: safe_parse_version(v) for v in versions.unique()}
+    return versions.map(parsed)
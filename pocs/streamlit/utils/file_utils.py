@@ -1,31 +1,48 @@
 from pathlib import Path
 
 import pandas as pd
-import yaml
+import streamlit as st
 
+from benchmarks.catalog import read_metadata
+from pocs.streamlit.utils.calculations import parse_versions
 
-# Load benchmark metadata
-def load_metadata(file_path):
-    with open(file_path, "r") as file:
-        return yaml.safe_load(file)
+ROOT_DIR = Path(__file__).parent.parent.parent.parent
 
+# The loaders below are cached by Streamlit across reruns and pages, keyed on the path
+# and modification time of the file, so that each version of a file is parsed once.
+# Only the latest few versions of each file are kept.
+CACHE_OPTIONS = dict(max_entries=4, show_spinner=False)
 
-def load_benchmark_data(file_path="results/benchmark_results.csv"):
-    """
-    Load benchmark data from the specified folder and file.
 
-    Parameters:
-        file_path (str): Relative or absolute path to the CSV file. Defaults to "results/benchmark_results.csv".
+def _file_version(file_path) -> tuple[Path, int]:
+    """Absolute path of `file_path` (relative to the repository root) and its
+    modification time, the key of the cached loaders."""
+    path = ROOT_DIR / file_path
+    try:
+        return path, path.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"The file {file_path} was not found. Please check the path and try again."
+        )
+
+
+@st.cache_data(**CACHE_OPTIONS)
+def _read_metadata(path: Path, mtime: int):
+    return read_metadata(path)
+
+
+@st.cache_data(**CACHE_OPTIONS)
+def _metadata_df(path: Path, mtime: int) -> pd.DataFrame:
+    metadata_df = pd.DataFrame(_read_metadata(path, mtime)["benchmarks"]).T
+    metadata_df = metadata_df.reset_index()
+    return metadata_df.rename(columns={"index": "Benchmark Name"})
 
-    Returns:
-        pd.DataFrame: Loaded data as a pandas DataFrame.
-    """
-    # Construct the absolute file path
-    absolute_file_path = Path(__file__).parent.parent.parent.parent / file_path
 
+@st.cache_data(**CACHE_OPTIONS)
+def _read_benchmark_data(file_path: Path, mtime: int) -> pd.DataFrame:
     try:
         # Load and return the data
-        data = pd.read_csv(absolute_file_path)
+        data = pd.read_csv(file_path)
 
         # TODO: Replace the hardcoded Runtime and Memory Usage values with dynamically loaded values from a configuration file.
         if "Runtime (s)" in data.columns and "Status" in data.columns:
@@ -43,11 +60,57 @@ def load_benchmark_data(file_path="results/benchmark_results.csv"):
             data.loc[data["Status"] != "ok", "Memory Usage (MB)"] = 8192
 
         return data
-    except FileNotFoundError:
-        raise FileNotFoundError(
-            f"The file {file_path} was not found. Please check the path and try again."
-        )
     except pd.errors.ParserError:
         raise ValueError(
             f"Error parsing the file {file_path}. Please check the file format and ensure it's a valid CSV."
         )
+
+
+@st.cache_data(**CACHE_OPTIONS)
+def _sorted_benchmark_data(file_path: Path, mtime: int) -> pd.DataFrame:
+    data = _read_benchmark_data(file_path, mtime)
+    data["Solver Version"] = parse_versions(data["Solver Version"])
+    return data.sort_values(by=["Solver", "Solver Version"], ascending=[True, False])
+
+
+@st.cache_data(**CACHE_OPTIONS)
+def _latest_benchmark_data(file_path: Path, mtime: int) -> pd.DataFrame:
+    return _sorted_benchmark_data(file_path, mtime).drop_duplicates(
+        subset=["Solver", "Benchmark", "Size"], keep="first"
+    )
+
+
+# Load benchmark metadata
+def load_metadata(file_path="results/metadata.yaml"):
+    return _read_metadata(*_file_version(file_path))
+
+
+def load_metadata_df(file_path="results/metadata.yaml") -> pd.DataFrame:
+    """The benchmarks of the metadata as a DataFrame with one row per benchmark, for
+    easier filtering."""
+    return _metadata_df(*_file_version(file_path))
+
+
+def load_benchmark_data(file_path="results/benchmark_results.csv"):
+    """
+    Load benchmark data from the specified folder and file.
+
+    Parameters:
+        file_path (str): Relative or absolute path to the CSV file. Defaults to "results/benchmark_results.csv".
+
+    Returns:
+        pd.DataFrame: Loaded data as a pandas DataFrame.
+    """
+    return _read_benchmark_data(*_file_version(file_path))
+
+
+def load_sorted_benchmark_data(file_path="results/benchmark_results.csv"):
+    """Benchmark data with parsed solver versions, sorted by solver and by version
+    from the latest to the oldest."""
+    return _sorted_benchmark_data(*_file_version(file_path))
+
+
+def load_latest_benchmark_data(file_path="results/benchmark_results.csv"):
+    """Benchmark data of the latest version of each solver on each benchmark and
+    size, with parsed solver versions."""
+    return _latest_benchmark_data(*_file_version(file_path))
@@ -1,65 +1,24 @@
-from pocs.streamlit.utils.calculations import safe_parse_version
+from pocs.streamlit.utils.calculations import parse_versions
+from runner.analytics import reference_runtime_buckets
 
 
 def filter_data(df, filtered_metadata):
     # Extract selected problem sizes from filtered metadata
     selected_sizes = filtered_metadata["Selected Problem Size"].iloc[0]
 
-    # Define runtime conditions for problem sizes
-    size_conditions = {
-        "XXS": lambda runtime: runtime <= 10,
-        "XS": lambda runtime: 10 < runtime <= 60,
-        "S": lambda runtime: 60 < runtime <= 600,
-        "M": lambda runtime: 600 < runtime <= 3600,
-        "L": lambda runtime: runtime > 3600,
-    }
-
-    # Filter to keep only rows for the solver "highs" first
-    highs_df = df[df["Solver"] == "highs"].copy()
-
-    # Ensure we consider the latest version of each solver
+    # Problem sizes are runtime buckets of the latest version of highs on each
+    # benchmark and size
+    highs_df = df[df["Solver"] == "highs"]
     if "Solver Version" in highs_df.columns:
-        # Ensure all values in "Solver Version" are strings
-        highs_df["Solver Version"] = highs_df["Solver Version"].astype(str)
-
-        # Parse solver versions, handling invalid or missing values
-        highs_df["Solver Version"] = highs_df["Solver Version"].apply(
-            lambda x: safe_parse_version(x) if x and x.lower() != "nan" else None
+        highs_df = highs_df.assign(
+            **{"Solver Version": parse_versions(highs_df["Solver Version"])}
         )
-
-        # Sort by Solver, Solver Version (descending), and remove duplicates
         highs_df = highs_df.sort_values(
-            by=["Solver", "Solver Version"], ascending=[True, False]
-        )
-        highs_df = highs_df.drop_duplicates(
-            subset=["Solver", "Size", "Benchmark"], keep="first"
+            by="Solver Version", ascending=False, kind="stable"
         )
+        highs_df = highs_df.drop_duplicates(subset=["Benchmark", "Size"], keep="first")
+    sizes = reference_runtime_buckets(df, highs_df)
 
-    # Create a dictionary to map the highest version of highs runtime for each ("Benchmark", "Size")
-    highs_runtime_dict = highs_df.set_index(["Benchmark", "Size"])[
-        "Runtime (s)"
-    ].to_dict()
-
-    # Add the highs_run_time column to the original df based on the dictionary
-    df["highs_run_time"] = df.apply(
-        lambda row: highs_runtime_dict.get((row["Benchmark"], row["Size"]), None),
-        axis=1,
-    )
-
-    # Combine conditions based on highs_run_time
-    runtime_condition = df["highs_run_time"].apply(
-        lambda runtime: (
-            any(size_conditions[size](runtime) for size in selected_sizes)
-            if runtime is not None
-            else False
-        )
-    )
-
-    # Filter df to include only rows meeting the runtime condition and filtered benchmarks
+    # Filter df to include only rows of the selected sizes and filtered benchmarks
     filtered_benchmarks = filtered_metadata["Benchmark Name"].unique()
-    filtered_df = df[df["Benchmark"].isin(filtered_benchmarks) & runtime_condition]
-
-    # Drop the temporary highs_run_time column
-    filtered_df = filtered_df.drop(columns=["highs_run_time"], errors="ignore")
-
-    return filtered_df
+    return df[df["Benchmark"].isin(filtered_benchmarks) & sizes.isin(selected_sizes)]
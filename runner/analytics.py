@@ -0,0 +1,248 @@
+"""Performance analytics shared by the notebooks, reports and dashboards.
+
+All front-ends should compute summary statistics with these functions, so that they
+report identical numbers:
+
+- shifted geometric means (SGM) of runtimes or memory, with a configurable shift and
+  a configurable penalty for unsolved instances,
+- Dolan-More performance profiles and solved-fraction curves,
+- bootstrap confidence intervals on the ratio of the SGMs of two solvers,
+- runtime buckets (XXS to L) of benchmark instances, by the runtime of a reference
+  solver,
+- the selection of the latest run of each instance, dropping superseded runs.
+
+The functions operate on NumPy arrays whose last axis is the instance axis, e.g. of
+shape (solvers, instances) or (buckets, solvers, instances), so that a whole history
+of results is evaluated in a few array operations. `runtime_matrix` builds such
+arrays from a results DataFrame. This module only depends on NumPy and pandas, so
+that it can be imported as `runner.analytics` or, from `runner/`, as `analytics`.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Default shift of shifted geometric means, in the unit of the values (seconds or MB)
+DEFAULT_SHIFT = 10.0
+
+# Runtime buckets of instances, with the upper bound (inclusive) of their runtimes
+RUNTIME_BUCKETS = {"XXS": 10, "XS": 60, "S": 600, "M": 3600, "L": np.inf}
+
+
+def penalized_values(values, solved, timeout, penalty=1.0) -> np.ndarray:
+    """The values of solved runs, and `penalty` times the timeout for unsolved runs
+    (penalty 1 counts unsolved runs as taking the timeout, as in our SGM tables;
+    penalty 10 gives the PAR10 score)."""
+    values = np.asarray(values, dtype=float)
+    return np.where(solved, values, penalty * np.asarray(timeout, dtype=float))
+
+
+def shifted_geometric_mean(values, shift=DEFAULT_SHIFT, axis=-1):
+    """Shifted geometric mean exp(mean(log(max(1, x + shift)))) - shift along `axis`.
+
+    Values are clipped so that x + shift >= 1, which avoids the logarithm of numbers
+    below 1 for tiny runtimes. NaN values propagate to the result, so missing runs
+    must be dropped or penalized (see `penalized_values`) by the caller.
+    """
+    values = np.asarray(values, dtype=float)
+    return np.exp(np.mean(np.log(np.maximum(1, values + shift)), axis=axis)) - shift
+
+
+def sgm_by_group(
+    df: pd.DataFrame,
+    by,
+    value="Runtime (s)",
+    shift=DEFAULT_SHIFT,
+    solved=None,
+    timeout=None,
+    penalty=1.0,
+) -> pd.Series:
+    """SGM of the column `value` of `df` per group of the columns `by`.
+
+    If `solved` (a boolean column name or array) and `timeout` (a column name) are
+    given, the values of unsolved runs are replaced by `penalty` times the timeout.
+    """
+    values = df[value].to_numpy(dtype=float)
+    if solved is not None:
+        solved = df[solved].to_numpy() if isinstance(solved, str) else solved
+        timeouts = df[timeout].to_numpy(dtype=float) if timeout else np.nan
+        values = penalized_values(values, solved, timeouts, penalty)
+    logs = pd.Series(np.log(np.maximum(1, values + shift)), index=df.index)
+    return np.exp(logs.groupby([df[c] for c in np.atleast_1d(by)]).mean()) - shift
+
+
+def runtime_matrix(
+    df: pd.DataFrame,
+    instance=("Benchmark", "Size"),
+    solver="Solver",
+    value="Runtime (s)",
+    penalty=1.0,
+):
+    """Pivot a results DataFrame into an array of shape (solvers, instances) of
+    penalized runtimes, and a boolean array of the same shape of solved runs.
+
+    Runs are solved if their Status is "ok"; unsolved runs take `penalty` times their
+    timeout, and instances that a solver was not run on are NaN. Returns the arrays
+    and the solver and instance labels.
+    """
+    instance = list(np.atleast_1d(instance))
+    solved = (df["Status"] == "ok").to_numpy()
+    values = penalized_values(
+        df[value].to_numpy(dtype=float),
+        solved,
+        df["Timeout"].to_numpy(dtype=float),
+        penalty,
+    )
+    long = df[instance + [solver]].assign(_value=values, _solved=solved)
+    wide = long.pivot_table(
+        index=solver, columns=instance, values=["_value", "_solved"], aggfunc="first"
+    )
+    times = wide["_value"]
+    solved_matrix = wide["_solved"].reindex_like(times).fillna(False).astype(bool)
+    return (
+        times.to_numpy(dtype=float),
+        solved_matrix.to_numpy(),
+        list(times.index),
+        list(times.columns),
+    )
+
+
+def performance_ratios(times, solved=None) -> np.ndarray:
+    """Dolan-More performance ratios: the runtime of each solver on each instance
+    divided by the best runtime of any solver on that instance.
+
+    `times` has shape (..., solvers, instances). Unsolved runs (where `solved` is
+    False, or the runtime is NaN) have ratio infinity, as do instances that no solver
+    solved.
+    """
+    times = np.asarray(times, dtype=float)
+    unsolved = np.isnan(times)
+    if solved is not None:
+        unsolved |= ~np.asarray(solved, dtype=bool)
+    times = np.where(unsolved, np.inf, times)
+    best = times.min(axis=-2, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratios = times / best
+    return np.where(unsolved | ~np.isfinite(best), np.inf, ratios)
+
+
+def performance_profile(times, solved=None, taus=None):
+    """Dolan-More performance profile: for each solver, the fraction of instances
+    solved within a factor tau of the best solver, for each tau in `taus`.
+
+    Returns `taus` and an array of shape (..., solvers, len(taus)). By default, `taus`
+    are the distinct finite performance ratios, so that the profile is exact.
+    """
+    ratios = performance_ratios(times, solved)
+    if taus is None:
+        taus = np.unique(ratios[np.isfinite(ratios)])
+    taus = np.asarray(taus, dtype=float)
+    sorted_ratios = np.sort(ratios, axis=-1)
+    num_instances = ratios.shape[-1]
+    counts = np.apply_along_axis(np.searchsorted, -1, sorted_ratios, taus, "right")
+    return taus, counts / num_instances
+
+
+def solved_fraction_curve(times, solved=None, time_grid=None):
+    """Fraction of instances that each solver solved within each time in
+    `time_grid`. `times` has shape (..., solvers, instances); returns `time_grid` and
+    an array of shape (..., solvers, len(time_grid))."""
+    times = np.asarray(times, dtype=float)
+    unsolved = np.isnan(times)
+    if solved is not None:
+        unsolved |= ~np.asarray(solved, dtype=bool)
+    times = np.where(unsolved, np.inf, times)
+    if time_grid is None:
+        time_grid = np.unique(times[np.isfinite(times)])
+    time_grid = np.asarray(time_grid, dtype=float)
+    counts = np.apply_along_axis(
+        np.searchsorted, -1, np.sort(times, axis=-1), time_grid, "right"
+    )
+    return time_grid, counts / times.shape[-1]
+
+
+def bootstrap_sgm_ratio(
+    times_a,
+    times_b,
+    shift=DEFAULT_SHIFT,
+    num_resamples=10_000,
+    confidence=0.95,
+    seed=0,
+):
+    """Ratio SGM(a) / SGM(b) of the runtimes of two solvers on the same instances,
+    with a percentile bootstrap confidence interval obtained by resampling instances.
+
+    `times_a` and `times_b` have shape (..., instances), paired by instance (e.g.
+    penalized runtimes from `runtime_matrix`). Returns the ratio and the lower and
+    upper bounds of the interval, each of shape (...).
+    """
+    times_a = np.asarray(times_a, dtype=float)
+    times_b = np.asarray(times_b, dtype=float)
+    logs_a = np.log(np.maximum(1, times_a + shift))
+    logs_b = np.log(np.maximum(1, times_b + shift))
+    ratio = shifted_geometric_mean(times_a, shift) / shifted_geometric_mean(
+        times_b, shift
+    )
+
+    num_instances = times_a.shape[-1]
+    rng = np.random.default_rng(seed)
+    samples = rng.integers(0, num_instances, size=(num_resamples, num_instances))
+    # Shape (..., resamples): the SGMs of each resample of the instances
+    sgm_a = np.exp(logs_a[..., samples].mean(axis=-1)) - shift
+    sgm_b = np.exp(logs_b[..., samples].mean(axis=-1)) - shift
+    alpha = (1 - confidence) / 2
+    lower, upper = np.quantile(sgm_a / sgm_b, [alpha, 1 - alpha], axis=-1)
+    return ratio, lower, upper
+
+
+def runtime_bucket(runtimes, buckets=RUNTIME_BUCKETS) -> pd.Categorical:
+    """The bucket of each runtime in `runtimes`, i.e. the first bucket whose upper
+    bound is at least the runtime (NaN for missing runtimes)."""
+    bins = [-np.inf] + list(buckets.values())
+    return pd.cut(
+        np.asarray(runtimes, dtype=float), bins=bins, labels=list(buckets), right=True
+    )
+
+
+def reference_runtime_buckets(
+    df: pd.DataFrame,
+    reference: pd.DataFrame,
+    instance=("Benchmark", "Size"),
+    value="Runtime (s)",
+    buckets=RUNTIME_BUCKETS,
+) -> pd.Series:
+    """The runtime bucket of the instance of each row of `df`, according to the
+    runtimes in `reference` (e.g. the runs of the latest HiGHS version, with one row
+    per instance). Rows of instances that are not in `reference` have bucket NaN."""
+    instance = list(np.atleast_1d(instance))
+    labels = reference[instance].assign(
+        _bucket=runtime_bucket(reference[value], buckets)
+    )
+    labels = labels.drop_duplicates(instance)
+    merged = df[instance].merge(labels, on=instance, how="left")
+    return merged["_bucket"].set_axis(df.index)
+
+
+def latest_run_mask(
+    results: pd.DataFrame, instance=("Benchmark", "Size")
+) -> np.ndarray:
+    """Boolean mask of the rows of `results` from the latest run of their instance,
+    where runs are identified by (Run ID, Hostname).
+
+    Runs are ordered by the date their Run ID begins with (YYYYMMDD-), then by Run ID
+    and Hostname, so that results of a rerun supersede those of the original run.
+    """
+    instance = list(np.atleast_1d(instance))
+    runs = results[["Run ID", "Hostname"]].drop_duplicates()
+    runs = runs.assign(
+        _date=pd.to_datetime(
+            runs["Run ID"].astype(str).str[:8], format="%Y%m%d", errors="coerce"
+        )
+    )
+    runs = runs.sort_values(["_date", "Run ID", "Hostname"], na_position="first")
+    runs["_order"] = np.arange(len(runs))
+    order = results[["Run ID", "Hostname"]].merge(
+        runs, on=["Run ID", "Hostname"], how="left"
+    )["_order"]
+    order = order.set_axis(results.index)
+    latest = order.groupby([results[c] for c in instance]).transform("max")
+    return (order == latest).to_numpy()
@@ -4,7 +4,7 @@ set -euo pipefail
 
 # Parse command line arguments
 usage() {
-    echo "Usage: $0 [-a] [-y \"<space separated years>\"] [-r <seconds>] [-u <run_id>] [-s \"<solvers>\"] <benchmarks yaml file>"
+    echo "Usage: $0 [-a] [-y \"<space separated years>\"] [-r <seconds>] [-u <run_id>] [-s \"<solvers>\"] [-b <run_id> [-f]] <benchmarks yaml file>"
     echo "Runs the solvers from the specified years (default all) on the benchmarks in the given file"
     echo "Options:"
     echo "    -a    Append to the results CSV file instead of overwriting. Default: overwrite"
@@ -12,14 +12,18 @@ usage() {
     echo "    -r    Reference benchmark interval in seconds. Default: 0 (disabled)"
     echo "    -u    Unique run ID to identify this benchmark run. Default: auto-generated"
     echo "    -s    Space separated list of solvers to run. Default: year-specific defaults"
+    echo "    -b    Run ID of a previous run in the results CSV to compare this run to, reporting significant regressions. Default: no comparison"
+    echo "    -f    With -b, exit with an error if there are significant regressions. Default: only report them"
 }
 append_results=""
 years=(2020 2021 2022 2023 2024 2025)
 reference_interval=0  # Default: disabled
 run_id=$(date +%Y%m%d_%H%M%S)_$(hostname)  # Default run_id if not provided
 solvers_override=""  # Default: use year-specific solver lists
+regression_baseline=""  # Default: no regression report
+fail_on_regression=""  # Default: only report regressions
 
-while getopts "hay:r:u:s:" flag
+while getopts "hay:r:u:s:b:f" flag
 do
     case ${flag} in
     h)  usage
@@ -39,6 +43,11 @@ do
     s)  solvers_override="$OPTARG"
         echo "Using solver override: $solvers_override"
         ;;
+    b)  regression_baseline="$OPTARG"
+        echo "Will compare the results to run: $regression_baseline"
+        ;;
+    f)  fail_on_regression="--fail-on-regression"
+        ;;
     esac
 done
 shift $(($OPTIND - 1))
@@ -52,6 +61,17 @@ BENCHMARKS_FILE="$1"
 
 echo "Starting benchmark run with ID: $run_id"
 
+# Keep the baseline results, as the results CSV is overwritten unless appending
+baseline_results=""
+if [ -n "${regression_baseline}" ]; then
+    if [ -f ./results/benchmark_results.csv ]; then
+        baseline_results=$(mktemp --suffix=.csv)
+        cp ./results/benchmark_results.csv "$baseline_results"
+    else
+        echo "WARNING: no ./results/benchmark_results.csv to take the results of run $regression_baseline from"
+    fi
+fi
+
 idx=0
 source "$(conda info --base)/etc/profile.d/conda.sh"  # Ensure conda is initialized
 
@@ -93,4 +113,13 @@ done
 
 echo "All benchmarks completed for run ID: $run_id"
 
+if [ -n "${regression_baseline}" ]; then
+    echo "Comparing run $run_id to run $regression_baseline"
+    conda activate "$env_name"
+    # Errors of the report (e.g. an unknown baseline run) fail this script, and so do
+    # regressions with -f
+    python ./runner/regression_report.py --baseline "$regression_baseline" --candidate "$run_id" --results $baseline_results ./results/benchmark_results.csv $fail_on_regression
+    conda deactivate
+fi
+
 # TODO use abs paths
@@ -0,0 +1,391 @@
+"""Convert benchmark models between file formats, and measure solver read times.
+
+Benchmarks are distributed as LP or MPS files, and some solvers parse one format much
+more slowly than the other. This module converts each model once into every format in
+`FORMATS` (with HiGHS), caching the converted files by the content hash of the
+original model, and measures how long each solver takes to read each format:
+
+    python format_cache.py measure --solvers highs scip --formats lp mps mps.gz
+
+Read times are appended to `results/format_read_times.csv`. `run_benchmarks.py
+--fastest-format` then uses these measurements to give each solver the format it
+reads fastest, so that slow parsers don't dominate the measured solve times.
+
+Converted files are stored in `runner/format_cache/<hash>/`; set the
+`FORMAT_CACHE_DIR` environment variable to use a different directory.
+"""
+
+import argparse
+import csv
+import datetime
+import gzip
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+from collections import Counter, defaultdict
+from pathlib import Path
+from socket import gethostname
+from time import perf_counter
+from traceback import format_exc
+
+from instance_store import decompress, is_compressed, uncompressed_name
+from model_cache import cache_key
+from optional_imports import highspy
+
+BENCHMARKS_DIR = Path(__file__).parent / "benchmarks"
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("FORMAT_CACHE_DIR", Path(__file__).parent / "format_cache")
+)
+
+READ_TIMES_CSV = Path(__file__).parent.parent / "results" / "format_read_times.csv"
+
+# File format -> file extension. HiGHS writes free MPS when names are too long for
+# fixed MPS, which is the case for most of our benchmarks.
+FORMATS = {
+    "lp": ".lp",
+    "mps": ".mps",
+    "lp.gz": ".lp.gz",
+    "mps.gz": ".mps.gz",
+}
+
+# Formats that may be given to run_solver.py. Solution and log file names are derived
+# from the stem of the model file, which compressed files would change.
+SOLVE_FORMATS = ["lp", "mps"]
+
+READ_TIME_COLUMNS = [
+    "Model",
+    "Content Hash",
+    "Format",
+    "File Size (MB)",
+    "Solver",
+    "Solver Version",
+    "Read Time (s)",
+    "Error",
+    "Hostname",
+    "Timestamp",
+]
+
+
+def model_format(model_file: Path) -> str | None:
+    """The format of `model_file`, as a key of FORMATS, or None if unknown."""
+    name = Path(model_file).name.lower()
+    for fmt, extension in sorted(FORMATS.items(), key=lambda kv: -len(kv[1])):
+        if name.endswith(extension):
+            return fmt
+    return None
+
+
+def model_stem(model_file: Path) -> str:
+    fmt = model_format(model_file)
+    name = Path(model_file).name
+    if fmt:
+        return name[: -len(FORMATS[fmt])]
+    if is_compressed(model_file):
+        # Stored compressed at rest, e.g. model.mps.zst
+        return model_stem(uncompressed_name(model_file))
+    return Path(model_file).stem
+
+
+def _gzip(source: Path, target: Path):
+    with open(source, "rb") as f_in, gzip.open(target, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+
+
+def convert(model_file: Path, fmt: str, cache_dir: Path = DEFAULT_CACHE_DIR) -> Path:
+    """Return a copy of `model_file` in format `fmt`, converting it if needed.
+
+    Converted files keep the stem of the original file, so that solution and log
+    files of solves on them are named as for the original. Models stored compressed
+    at rest (see instance_store.py) are decompressed first.
+    """
+    model_file = Path(model_file)
+    source_fmt = model_format(model_file)
+    if source_fmt == fmt:
+        return model_file
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt}. Known formats: {list(FORMATS)}")
+
+    cache_dir = Path(cache_dir)
+    entry_dir = cache_dir / cache_key(model_file, cache_dir)
+    target = entry_dir / f"{model_stem(model_file)}{FORMATS[fmt]}"
+    if target.exists():
+        return target
+
+    entry_dir.mkdir(parents=True, exist_ok=True)
+    base_fmt = fmt.removesuffix(".gz")
+    # Write to a temporary file first, so that concurrent processes never see a
+    # partially written file
+    with tempfile.TemporaryDirectory(dir=entry_dir) as tmp_dir:
+        tmp = Path(tmp_dir) / target.name
+        if source_fmt is None and is_compressed(model_file):
+            model_file = decompress(
+                model_file, Path(tmp_dir) / uncompressed_name(model_file)
+            )
+            source_fmt = model_format(model_file)
+        if source_fmt == fmt:
+            tmp = model_file
+        elif source_fmt is not None and source_fmt.removesuffix(".gz") == base_fmt:
+            # Only the compression differs
+            if fmt.endswith(".gz"):
+                _gzip(model_file, tmp)
+            else:
+                with gzip.open(model_file, "rb") as f_in, open(tmp, "wb") as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+        else:
+            if highspy is None:
+                raise ModuleNotFoundError("highspy is required to convert models")
+            h = highspy.Highs()
+            h.silent()
+            if h.readModel(str(model_file)) == highspy.HighsStatus.kError:
+                raise RuntimeError(f"HiGHS could not read {model_file}")
+            uncompressed = Path(tmp_dir) / f"{model_stem(model_file)}.{base_fmt}"
+            if h.writeModel(str(uncompressed)) == highspy.HighsStatus.kError:
+                raise RuntimeError(f"HiGHS could not write {uncompressed}")
+            if fmt.endswith(".gz"):
+                _gzip(uncompressed, tmp)
+            else:
+                tmp = uncompressed
+        os.replace(tmp, target)
+    return target
+
+
+def read_time(solver_name: str, model_file: Path) -> float:
+    """Time for `solver_name` to read `model_file`, measured through its Python API
+    where there is one, and otherwise as the runtime of its binary in a mode that
+    only reads the model (which includes the process startup time)."""
+    model_file = str(model_file)
+    match solver_name:
+        case "highs":
+            h = highspy.Highs()
+            h.silent()
+            start = perf_counter()
+            status = h.readModel(model_file)
+            elapsed = perf_counter() - start
+            if status == highspy.HighsStatus.kError:
+                raise RuntimeError(f"HiGHS could not read {model_file}")
+            return elapsed
+        case "gurobi":
+            import gurobipy
+
+            with gurobipy.Env(params={"OutputFlag": 0}) as env:
+                start = perf_counter()
+                gurobipy.read(model_file, env=env).dispose()
+                return perf_counter() - start
+        case "scip":
+            from pyscipopt import Model
+
+            model = Model()
+            model.hideOutput()
+            start = perf_counter()
+            model.readProblem(model_file)
+            return perf_counter() - start
+        case "cplex":
+            import cplex
+
+            c = cplex.Cplex()
+            c.set_log_stream(None)
+            c.set_results_stream(None)
+            start = perf_counter()
+            c.read(model_file)
+            return perf_counter() - start
+        case "xpress":
+            import xpress
+
+            p = xpress.problem()
+            p.setControl("outputlog", 0)
+            start = perf_counter()
+            p.read(model_file)
+            return perf_counter() - start
+        case "glpk":
+            fmt = model_format(model_file)
+            flag = "--lp" if fmt.startswith("lp") else "--freemps"
+            command = ["glpsol", "--check", flag, model_file]
+        case "cbc":
+            command = ["cbc", model_file, "quit"]
+        case _:
+            raise NotImplementedError(f"Cannot measure read times of {solver_name}")
+    start = perf_counter()
+    subprocess.run(command, capture_output=True, check=True)
+    return perf_counter() - start
+
+
+def benchmark_models(benchmarks_dir: Path = BENCHMARKS_DIR) -> list[Path]:
+    """The model files in `benchmarks_dir`, including models stored compressed at
+    rest (see instance_store.py), which `convert` decompresses."""
+    return sorted(
+        p
+        for p in Path(benchmarks_dir).iterdir()
+        if p.is_file() and model_format(uncompressed_name(p)) is not None
+    )
+
+
+def measure_read_times(
+    model_files: list[Path],
+    solvers: dict[str, str],
+    formats: list[str],
+    repeats: int = 3,
+    cache_dir: Path = DEFAULT_CACHE_DIR,
+    read_times_csv: Path = READ_TIMES_CSV,
+):
+    """Measure the read time of each model in each format with each solver (given as
+    a mapping of solver name to version), taking the minimum over `repeats` reads."""
+    hostname = gethostname()
+    new_file = not read_times_csv.exists()
+    read_times_csv.parent.mkdir(parents=True, exist_ok=True)
+    with open(read_times_csv, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=READ_TIME_COLUMNS, restval="")
+        if new_file:
+            writer.writeheader()
+        for model_file in model_files:
+            key = cache_key(model_file, cache_dir)
+            for fmt in formats:
+                try:
+                    path = convert(model_file, fmt, cache_dir)
+                except Exception:
+                    print(f"ERROR converting {model_file} to {fmt}: {format_exc()}")
+                    continue
+                size_mb = path.stat().st_size / (1024 * 1024)
+                for solver, version in solvers.items():
+                    row = {
+                        "Model": model_stem(model_file),
+                        "Content Hash": key,
+                        "Format": fmt,
+                        "File Size (MB)": size_mb,
+                        "Solver": solver,
+                        "Solver Version": version,
+                        "Hostname": hostname,
+                        "Timestamp": datetime.datetime.now().strftime(
+                            "%Y-%m-%d %H:%M:%S.%f"
+                        ),
+                    }
+                    try:
+                        row["Read Time (s)"] = min(
+                            read_time(solver, path) for _ in range(repeats)
+                        )
+                        print(
+                            f"{solver} read {path.name} in {row['Read Time (s)']:.2f}s",
+                            flush=True,
+                        )
+                    except Exception:
+                        row["Error"] = format_exc()
+                        print(f"ERROR: {solver} could not read {path.name}")
+                    writer.writerow(row)
+                    f.flush()
+
+
+def load_read_times(read_times_csv: Path = READ_TIMES_CSV) -> dict:
+    """Map (content hash, solver) to {format: fastest read time}."""
+    read_times = defaultdict(dict)
+    if not read_times_csv.exists():
+        return read_times
+    with open(read_times_csv, newline="") as f:
+        for row in csv.DictReader(f):
+            if row["Error"] or not row["Read Time (s)"]:
+                continue
+            times = read_times[(row["Content Hash"], row["Solver"])]
+            t = float(row["Read Time (s)"])
+            times[row["Format"]] = min(t, times.get(row["Format"], t))
+    return read_times
+
+
+def fastest_format(
+    read_times: dict,
+    key: str,
+    solver: str,
+    formats: list[str] = SOLVE_FORMATS,
+) -> str | None:
+    """The format among `formats` that `solver` reads fastest for the model with
+    content hash `key`. Models that were not measured get the format that was
+    fastest for most measured models. Returns None if there are no measurements."""
+    times = {f: t for f, t in read_times.get((key, solver), {}).items() if f in formats}
+    if times:
+        return min(times, key=times.get)
+
+    wins = Counter()
+    for (_, s), measured in read_times.items():
+        measured = {f: t for f, t in measured.items() if f in formats}
+        if s == solver and measured:
+            wins[min(measured, key=measured.get)] += 1
+    return wins.most_common(1)[0][0] if wins else None
+
+
+def summarize_read_times(read_times_csv: Path = READ_TIMES_CSV):
+    """Print the median read throughput (MB/s) of each solver and format."""
+    throughputs = defaultdict(list)
+    with open(read_times_csv, newline="") as f:
+        for row in csv.DictReader(f):
+            if row["Error"] or not row["Read Time (s)"]:
+                continue
+            t = float(row["Read Time (s)"])
+            if t > 0:
+                throughputs[(row["Solver"], row["Format"])].append(
+                    float(row["File Size (MB)"]) / t
+                )
+    print(f"{'Solver':10} {'Format':8} {'Models':>6}  Median MB/s")
+    for (solver, fmt), values in sorted(throughputs.items()):
+        print(f"{solver:10} {fmt:8} {len(values):>6}  {statistics.median(values):.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert models between file formats and measure solver read times."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser(
+        "convert", help="Convert models to other formats (cached)."
+    )
+    measure_parser = subparsers.add_parser(
+        "measure", help="Measure the read time of each solver and format."
+    )
+    for subparser in (convert_parser, measure_parser):
+        subparser.add_argument(
+            "models",
+            type=Path,
+            nargs="*",
+            help="Model files. Default: all models in runner/benchmarks/, including "
+            "models stored compressed at rest.",
+        )
+        subparser.add_argument(
+            "--formats",
+            type=str,
+            nargs="+",
+            choices=list(FORMATS),
+            default=list(FORMATS),
+            help="Formats to convert the models to.",
+        )
+    measure_parser.add_argument(
+        "--solvers",
+        type=str,
+        nargs="+",
+        default=["highs", "scip", "cbc", "gurobi", "glpk"],
+        help="Solvers to measure. Solvers not in the active environment are skipped.",
+    )
+    measure_parser.add_argument(
+        "--repeats",
+        type=int,
+        default=3,
+        help="Number of reads per solver and format; the fastest is recorded.",
+    )
+    subparsers.add_parser(
+        "summary", help="Print the median read throughput of each solver and format."
+    )
+    args = parser.parse_args()
+
+    if args.command == "summary":
+        summarize_read_times()
+    else:
+        models = args.models or benchmark_models()
+        if args.command == "convert":
+            for model in models:
+                for fmt in args.formats:
+                    print(convert(model, fmt))
+        else:
+            from run_benchmarks import get_conda_package_versions
+
+            versions = get_conda_package_versions(args.solvers)
+            solvers = {s: versions[s] for s in args.solvers if versions.get(s)}
+            measure_read_times(models, solvers, args.formats, args.repeats)
@@ -0,0 +1,189 @@
+"""Compressed-at-rest storage of benchmark instances, and staging into a RAM disk.
+
+Model files compress by a factor of 5-10, so keeping them compressed in
+`runner/benchmarks/` lets large instances fit on small VM disks. They are compressed
+with zstd if the `zstandard` package is installed, and with gzip otherwise.
+
+Before each solve, `staged()` decompresses (or copies) the model into a tmpfs such
+as `/dev/shm`, so that the solver reads it from memory and the variance of
+persistent disk throughput doesn't leak into the measured runtimes. The staged copy
+is removed after the solve. A model is only staged in memory if it fits in the tmpfs
+and in a fraction of the available memory; as the staged file is itself held in
+memory, it reduces the memory available to (and the memory limit of) the solver.
+"""
+
+import gzip
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import psutil
+
+try:
+    import zstandard
+except ModuleNotFoundError:
+    zstandard = None
+
+DEFAULT_STAGING_DIR = Path("/dev/shm")
+
+# Stage a model in memory only if it takes at most this fraction of available memory
+DEFAULT_MAX_MEMORY_FRACTION = 0.25
+
+COMPRESSED_SUFFIXES = [".zst", ".gz"]
+
+
+def is_compressed(path: Path) -> bool:
+    return Path(path).suffix in COMPRESSED_SUFFIXES
+
+
+def uncompressed_name(path: Path) -> str:
+    path = Path(path)
+    return path.stem if is_compressed(path) else path.name
+
+
+def find_stored(path: Path) -> Path | None:
+    """Find the stored copy of the (uncompressed) model file `path`, compressed or
+    not."""
+    path = Path(path)
+    for candidate in [path] + [
+        path.with_name(path.name + suffix) for suffix in COMPRESSED_SUFFIXES
+    ]:
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def compress(path: Path) -> Path:
+    """Compress the model file `path` in place (replacing it), returning the path of
+    the compressed file."""
+    path = Path(path)
+    if is_compressed(path):
+        return path
+    suffix = ".zst" if zstandard is not None else ".gz"
+    target = path.with_name(path.name + suffix)
+    tmp = target.with_name(target.name + ".tmp")
+    print(f"Compressing {path} to {target}...", flush=True)
+    with open(path, "rb") as f_in:
+        if zstandard is not None:
+            with open(tmp, "wb") as f_out:
+                # Passing the size stores it in the frame header, for staging
+                zstandard.ZstdCompressor(level=3, threads=-1).copy_stream(
+                    f_in, f_out, size=path.stat().st_size
+                )
+        else:
+            with gzip.open(tmp, "wb", compresslevel=6) as f_out:
+                shutil.copyfileobj(f_in, f_out)
+    os.replace(tmp, target)
+    path.unlink()
+    return target
+
+
+@contextmanager
+def open_uncompressed(path: Path):
+    """Open a possibly compressed model file for reading its uncompressed bytes."""
+    path = Path(path)
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise ModuleNotFoundError(f"zstandard is required to read {path}")
+        with open(path, "rb") as f:
+            with zstandard.ZstdDecompressor().stream_reader(f) as reader:
+                yield reader
+    elif path.suffix == ".gz":
+        with gzip.open(path, "rb") as f:
+            yield f
+    else:
+        with open(path, "rb") as f:
+            yield f
+
+
+def decompress(path: Path, target: Path) -> Path:
+    """Write the uncompressed contents of `path` to `target`."""
+    with open_uncompressed(path) as f_in, open(target, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out, length=16 * 1024 * 1024)
+    return target
+
+
+def restore(path: Path) -> Path:
+    """Decompress a stored model next to it and remove the compressed copy."""
+    path = Path(path)
+    if not is_compressed(path):
+        return path
+    target = decompress(path, path.with_name(uncompressed_name(path)))
+    path.unlink()
+    return target
+
+
+def uncompressed_size(path: Path) -> int:
+    """Size of the uncompressed contents of `path`, in bytes. For gzip files, whose
+    trailer only stores the size modulo 2^32, this is a lower bound."""
+    path = Path(path)
+    compressed_size = path.stat().st_size
+    if path.suffix == ".zst" and zstandard is not None:
+        with open(path, "rb") as f:
+            size = zstandard.frame_content_size(f.read(18))
+        if size >= 0:
+            return size
+        # Unknown content size: assume a typical compression ratio
+        return 10 * compressed_size
+    if path.suffix == ".gz":
+        with open(path, "rb") as f:
+            f.seek(-4, os.SEEK_END)
+            size = int.from_bytes(f.read(4), "little")
+        # Uncompressed files are at least as large as compressed ones
+        while size < compressed_size:
+            size += 1 << 32
+        return size
+    return compressed_size
+
+
+def fits_in_memory(
+    size: int,
+    staging_dir: Path,
+    max_memory_fraction: float = DEFAULT_MAX_MEMORY_FRACTION,
+) -> bool:
+    """Whether a file of `size` bytes can be staged in the tmpfs `staging_dir`."""
+    if not staging_dir.is_dir():
+        return False
+    return (
+        shutil.disk_usage(staging_dir).free > size
+        and size <= max_memory_fraction * psutil.virtual_memory().available
+    )
+
+
+@contextmanager
+def staged(
+    path: Path,
+    staging_dir: Path | None = DEFAULT_STAGING_DIR,
+    max_memory_fraction: float = DEFAULT_MAX_MEMORY_FRACTION,
+):
+    """Context manager that yields an uncompressed copy of the model file `path`.
+
+    The copy is placed in `staging_dir` (a RAM disk) if it fits there, and otherwise
+    next to `path` if `path` is compressed; uncompressed models that don't fit are
+    used in place. The copy keeps the name of the model, so that solution and log
+    files are named as for the original, and is removed on exit.
+    """
+    path = Path(path)
+    size = uncompressed_size(path)
+    if staging_dir is not None and fits_in_memory(
+        size, Path(staging_dir), max_memory_fraction
+    ):
+        parent = Path(staging_dir)
+    elif is_compressed(path):
+        if staging_dir is not None:
+            print(f"WARNING: {path.name} does not fit in {staging_dir}")
+        parent = path.parent
+    else:
+        if staging_dir is not None:
+            print(f"WARNING: {path.name} does not fit in {staging_dir}, not staging")
+        yield path
+        return
+
+    tmp_dir = Path(tempfile.mkdtemp(dir=parent, prefix="staged-"))
+    try:
+        target = decompress(path, tmp_dir / uncompressed_name(path))
+        yield target
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,356 @@
+"""Extract primal/dual bound trajectories of MILP solves from solver logs and
+compute anytime-performance metrics (primal integral, time-to-gap, etc.).
+
+linopy does not expose solver callbacks through `Solver.solve_problem`, and the
+runner kills timed-out solves with `timeout`, so callbacks would be lost exactly
+in the runs we care about. The trajectory is instead recovered from the solver
+log, which is flushed incrementally and survives timeouts.
+
+During a run, the primal integral is computed against the run's own best
+incumbent. To compare solvers, the primal integrals of all runs of each instance
+in a results CSV are recomputed against the best objective known for the instance,
+from the saved trajectories; `run_benchmarks.py` does this at the end of each
+campaign, and it can be rerun after merging results:
+
+    python milp_trajectory.py ../results/benchmark_results.csv
+"""
+
+import argparse
+import csv
+import math
+import os
+import re
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+from solver_variants import base_solver
+
+# Gaps (relative) at which we record the time-to-gap metrics
+GAP_THRESHOLDS = {
+    "time_to_gap_1e-2": 1e-2,
+    "time_to_gap_1e-3": 1e-3,
+    "time_to_gap_1e-4": 1e-4,
+}
+
+METRIC_KEYS = [
+    "time_to_first_feasible",
+    *GAP_THRESHOLDS,
+    "primal_integral",
+]
+
+RUNNER_DIR = Path(__file__).parent
+
+_FLOAT = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|[-+]?inf"
+
+
+def _to_float(token: str) -> float | None:
+    """Parse a bound as printed in a log; returns None for missing values."""
+    token = token.strip().rstrip("%")
+    if token in {"", "-", "--"}:
+        return None
+    try:
+        value = float(token)
+    except ValueError:
+        return None
+    return None if math.isinf(value) or math.isnan(value) else value
+
+
+# HiGHS:
+#  T       0       0         0   0.00%   0               3                100.00%        0      0      0        13     0.0s
+_HIGHS_ROW = re.compile(
+    r"^\s*[A-Za-z]?\s+\d+\s+\d+\s+\d+\s+[\d.]+%\s+"
+    rf"(?P<dual>{_FLOAT})\s+(?P<primal>{_FLOAT})\s+\S+\s+.*?"
+    r"(?P<time>\d+\.?\d*)s\s*$"
+)
+
+# Gurobi:
+# H    0     0                    1.000000e+09 1.0000e+07  99.0%     -    0s
+_GUROBI_ROW = re.compile(
+    r"^\s*[H*]?\s*\d+\s+\d+.*?\s(?P<primal>\S+)\s+(?P<dual>\S+)\s+"
+    r"(?:[\d.]+%|-)\s+\S+\s+(?P<time>\d+)s\s*$"
+)
+
+# CBC:
+# Cbc0010I After 100 nodes, 10 on tree, 1234 best solution, best possible 1200 (1.23 seconds)
+# Cbc0012I Integer solution of 1234 found by ... (0.12 seconds)
+_CBC_PROGRESS = re.compile(
+    rf"^Cbc0010I .*?, (?P<primal>{_FLOAT}) best solution, best possible "
+    rf"(?P<dual>{_FLOAT}) \((?P<time>[\d.]+) seconds\)"
+)
+_CBC_SOLUTION = re.compile(
+    rf"^Cbc00(?:04|12)I Integer solution of (?P<primal>{_FLOAT}) .*?"
+    r"\((?P<time>[\d.]+) seconds\)"
+)
+
+
+def _parse_highs(lines):
+    for line in lines:
+        m = _HIGHS_ROW.match(line)
+        if m:
+            yield float(m["time"]), _to_float(m["primal"]), _to_float(m["dual"])
+
+
+def _parse_gurobi(lines):
+    for line in lines:
+        m = _GUROBI_ROW.match(line)
+        if m:
+            yield float(m["time"]), _to_float(m["primal"]), _to_float(m["dual"])
+
+
+def _parse_scip(lines):
+    # SCIP prints a '|'-separated table whose columns vary between versions,
+    # so we locate the columns we need from the table header.
+    columns = None
+    for line in lines:
+        if "|" not in line:
+            continue
+        fields = [f.strip() for f in line.split("|")]
+        if "dualbound" in fields and "primalbound" in fields:
+            columns = (
+                fields.index("time"),
+                fields.index("primalbound"),
+                fields.index("dualbound"),
+            )
+            continue
+        if columns is None or len(fields) <= max(columns):
+            continue
+        time_field = fields[columns[0]]
+        # The time field may be prefixed with a one-letter heuristic marker
+        m = re.search(r"([\d.]+)s$", time_field)
+        if m:
+            yield (
+                float(m.group(1)),
+                _to_float(fields[columns[1]]),
+                _to_float(fields[columns[2]]),
+            )
+
+
+def _parse_cbc(lines):
+    dual = None
+    for line in lines:
+        m = _CBC_PROGRESS.match(line)
+        if m:
+            dual = _to_float(m["dual"])
+            yield float(m["time"]), _to_float(m["primal"]), dual
+            continue
+        m = _CBC_SOLUTION.match(line)
+        if m:
+            yield float(m["time"]), _to_float(m["primal"]), dual
+
+
+_PARSERS = {
+    "highs": _parse_highs,
+    "gurobi": _parse_gurobi,
+    "scip": _parse_scip,
+    "cbc": _parse_cbc,
+}
+
+
+def parse_trajectory(log_text: str, solver_name: str) -> list[tuple]:
+    """Parse a solver log into a list of (time, primal bound, dual bound) tuples.
+
+    Missing bounds are None. Returns an empty list for solvers whose logs we cannot
+    parse (e.g. GLPK and Xpress do not print timestamps on their MIP progress lines).
+    """
+    # Solver variants (highs-hipo etc.) have the log format of their base solver
+    parser = _PARSERS.get(base_solver(solver_name))
+    if parser is None:
+        return []
+    trajectory = sorted(parser(log_text.splitlines()), key=lambda p: p[0])
+    return trajectory
+
+
+def relative_gap(primal: float | None, dual: float | None) -> float:
+    """Relative duality gap |primal - dual| / |primal|, the same definition as the
+    `Duality Gap` column. Returns inf if either bound is missing."""
+    if primal is None or dual is None:
+        return math.inf
+    if primal == dual:
+        return 0.0
+    return abs(primal - dual) / abs(primal) if primal != 0 else math.inf
+
+
+def primal_gap(primal: float | None, reference: float | None) -> float:
+    """Primal gap of an incumbent w.r.t. a reference objective (Berthold 2013).
+
+    The gap is 1 if there is no incumbent or incumbent and reference have opposite
+    signs, so that the primal integral penalizes time spent without a solution.
+    """
+    if primal is None or reference is None:
+        return 1.0
+    if primal == reference:
+        return 0.0
+    if primal * reference < 0:
+        return 1.0
+    return abs(primal - reference) / max(abs(primal), abs(reference))
+
+
+def compute_trajectory_metrics(
+    trajectory: list[tuple],
+    end_time: float,
+    reference_objective: float | None = None,
+) -> dict:
+    """Compute anytime metrics from a (time, primal, dual) trajectory.
+
+    `end_time` is the time at which the run ended (runtime, or timeout for timed out
+    runs); the primal integral is computed over [0, end_time]. If no
+    `reference_objective` (e.g. the best known objective of the instance) is given,
+    the best incumbent found in this run is used instead, which makes the primal
+    integral incomparable across runs (see `recompute_primal_integrals`). Metrics
+    that were never reached are None.
+    """
+    metrics = dict.fromkeys(METRIC_KEYS)
+    if not trajectory:
+        return metrics
+
+    # Keep track of the best bounds seen so far, as solvers occasionally print
+    # lines with a missing bound (e.g. SCIP restarts).
+    best_primal, best_dual = None, None
+    points = []
+    for t, primal, dual in trajectory:
+        if primal is not None:
+            best_primal = primal
+        if dual is not None:
+            best_dual = dual
+        points.append((min(t, end_time), best_primal, best_dual))
+
+    if reference_objective is None:
+        reference_objective = best_primal
+
+    for t, primal, dual in points:
+        if metrics["time_to_first_feasible"] is None and primal is not None:
+            metrics["time_to_first_feasible"] = t
+        gap = relative_gap(primal, dual)
+        for key, threshold in GAP_THRESHOLDS.items():
+            if metrics[key] is None and gap <= threshold:
+                metrics[key] = t
+
+    # Primal integral: the primal gap is a step function that changes at each
+    # logged point and has value 1 before the first incumbent.
+    integral = 0.0
+    prev_time, prev_gap = 0.0, 1.0
+    for t, primal, _ in points:
+        integral += prev_gap * (t - prev_time)
+        prev_time, prev_gap = t, primal_gap(primal, reference_objective)
+    integral += prev_gap * max(end_time - prev_time, 0.0)
+    metrics["primal_integral"] = integral
+
+    return metrics
+
+
+def write_trajectory_csv(trajectory: list[tuple], path: Path) -> None:
+    """Write a trajectory to a CSV file with columns time, primal_bound, dual_bound."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["time", "primal_bound", "dual_bound"])
+        writer.writerows(trajectory)
+
+
+def trajectory_metrics_from_log(
+    log_file: Path,
+    solver_name: str,
+    end_time: float,
+    trajectory_file: Path | None = None,
+) -> dict:
+    """Parse `log_file`, optionally save the trajectory to `trajectory_file`, and
+    return the trajectory metrics. Returns all-None metrics if the log is missing."""
+    if not Path(log_file).exists():
+        return dict.fromkeys(METRIC_KEYS)
+    with open(log_file, "r", errors="replace") as f:
+        trajectory = parse_trajectory(f.read(), solver_name)
+    if trajectory_file is not None and trajectory:
+        write_trajectory_csv(trajectory, trajectory_file)
+    return compute_trajectory_metrics(trajectory, end_time)
+
+
+def read_trajectory_csv(path: Path) -> list[tuple]:
+    """Read a trajectory written by `write_trajectory_csv`."""
+    with open(path, "r", newline="") as f:
+        return [
+            (
+                float(row["time"]),
+                _to_float(row["primal_bound"]),
+                _to_float(row["dual_bound"]),
+            )
+            for row in csv.DictReader(f)
+        ]
+
+
+def best_known_objective(
+    trajectories: list[list[tuple]], objectives: list[float]
+) -> float | None:
+    """The best of the incumbents of `trajectories` and the `objectives` of solved
+    runs of an instance. The objective sense is inferred from the bounds: the dual
+    bound is below the primal bound when minimizing. Minimization is assumed if no
+    trajectory has distinct bounds."""
+    minimize = True
+    for trajectory in trajectories:
+        gaps = [p - d for _, p, d in trajectory if p is not None and d is not None]
+        if any(gaps):
+            minimize = next(g for g in gaps if g) > 0
+            break
+    candidates = [p for t in trajectories for _, p, _ in t if p is not None]
+    candidates += [o for o in objectives if o is not None]
+    if not candidates:
+        return None
+    return min(candidates) if minimize else max(candidates)
+
+
+def recompute_primal_integrals(results_csv: Path) -> int:
+    """Recompute the `Primal Integral` of all runs of a results CSV with a saved
+    trajectory, against the best objective known for each instance over all runs,
+    so that primal integrals are comparable across solvers. Returns the number of
+    updated runs."""
+    with open(results_csv, "r", newline="") as f:
+        reader = csv.DictReader(f)
+        fieldnames, rows = reader.fieldnames, list(reader)
+    if "Trajectory File" not in fieldnames:
+        return 0
+
+    instances = defaultdict(list)
+    for row in rows:
+        instances[(row["Benchmark"], row["Size"])].append(row)
+
+    updated = 0
+    for runs in instances.values():
+        trajectories = {}
+        for i, row in enumerate(runs):
+            path = RUNNER_DIR / row["Trajectory File"]
+            if row["Trajectory File"] and path.exists():
+                trajectories[i] = read_trajectory_csv(path)
+        if not trajectories:
+            continue
+        objectives = [
+            _to_float(r["Objective Value"]) for r in runs if r["Status"] == "ok"
+        ]
+        reference = best_known_objective(list(trajectories.values()), objectives)
+        for i, trajectory in trajectories.items():
+            end_time = _to_float(runs[i]["Runtime (s)"])
+            if end_time is None:
+                continue
+            metrics = compute_trajectory_metrics(trajectory, end_time, reference)
+            runs[i]["Primal Integral"] = metrics["primal_integral"]
+            updated += 1
+
+    # Write atomically, so that an interrupted update can't lose results
+    fd, tmp_name = tempfile.mkstemp(dir=Path(results_csv).parent, suffix=".csv")
+    with os.fdopen(fd, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.chmod(tmp_name, os.stat(results_csv).st_mode)
+    os.replace(tmp_name, results_csv)
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recompute the primal integrals of a results CSV against the "
+        "best known objective of each instance."
+    )
+    parser.add_argument("results_csv", type=Path)
+    args = parser.parse_args()
+    updated = recompute_primal_integrals(args.results_csv)
+    print(f"Recomputed the primal integral of {updated} runs in {args.results_csv}")
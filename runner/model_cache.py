@@ -0,0 +1,310 @@
+"""A cache of benchmark models in a compact binary representation.
+
+Parsing large LP/MPS files takes minutes, so tools that need the structure of a model
+(categorize_benchmarks.py, infer_stats.py, verify_solutions.py, the MILP metrics in
+run_solver.py) read it through this module instead. `run_benchmarks.py` caches each
+MILP before solving it (`ensure_cached`), so that the timed `run_solver.py` process
+only reads the existing entry (`cached_model`). The first time a model file is
+loaded it is parsed with HiGHS and converted into a directory of NumPy `.npy` arrays
+(constraint matrix in CSR format, bounds, objective, integrality) plus name tables and
+a small JSON file of scalars. Entries are keyed by the SHA-256 hash of the uncompressed
+contents of the model file, so renamed, re-downloaded, or compressed (see
+instance_store.py) copies of the same model share an entry, and are loaded
+with memory mapping so that only the parts that are used are read from disk.
+
+The cache directory defaults to `runner/model_cache/` and can be changed with the
+`MODEL_CACHE_DIR` environment variable.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+
+# This module is imported as `runner.model_cache` by the scripts in benchmarks/, and
+# as `model_cache` by the scripts in runner/
+try:
+    from runner.instance_store import open_uncompressed, staged
+    from runner.optional_imports import highspy, sp
+except ModuleNotFoundError as e:
+    if e.name != "runner":
+        raise
+    from instance_store import open_uncompressed, staged
+    from optional_imports import highspy, sp
+
+# Bump this when the layout of cache entries changes, to invalidate old entries
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("MODEL_CACHE_DIR", Path(__file__).parent / "model_cache")
+)
+
+# Integrality codes, as in highspy.HighsVarType
+CONTINUOUS = 0
+INTEGER = 1
+SEMI_CONTINUOUS = 2
+SEMI_INTEGER = 3
+
+ARRAYS = [
+    "indptr",
+    "indices",
+    "data",
+    "col_cost",
+    "col_lower",
+    "col_upper",
+    "row_lower",
+    "row_upper",
+    "integrality",
+]
+
+
+@dataclass
+class CachedModel:
+    """A model loaded from the cache. Arrays are read-only memory maps."""
+
+    path: Path
+    num_row: int
+    num_col: int
+    num_nz: int
+    offset: float
+    sense: int  # 1 for minimization, -1 for maximization
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    col_cost: np.ndarray
+    col_lower: np.ndarray
+    col_upper: np.ndarray
+    row_lower: np.ndarray
+    row_upper: np.ndarray
+    integrality: np.ndarray
+
+    @cached_property
+    def matrix(self) -> sp.csr_matrix:
+        """The constraint matrix in CSR format (shares memory with the cache)."""
+        if sp is None:
+            raise ModuleNotFoundError("scipy is required for the constraint matrix")
+        return sp.csr_matrix(
+            (self.data, self.indices, self.indptr),
+            shape=(self.num_row, self.num_col),
+            copy=False,
+        )
+
+    @cached_property
+    def col_names(self) -> list[str]:
+        return _read_names(self.path / "col_names.txt")
+
+    @cached_property
+    def row_names(self) -> list[str]:
+        return _read_names(self.path / "row_names.txt")
+
+    @property
+    def num_integer(self) -> int:
+        return int(np.count_nonzero(self.integrality == INTEGER))
+
+    @property
+    def num_continuous(self) -> int:
+        return int(np.count_nonzero(self.integrality == CONTINUOUS))
+
+    @property
+    def is_mip(self) -> bool:
+        return bool(np.any(self.integrality != CONTINUOUS))
+
+
+def _read_names(path: Path) -> list[str]:
+    with open(path, "r") as f:
+        text = f.read()
+    return text.split("\n") if text else []
+
+
+def file_hash(model_file: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 hash of the uncompressed contents of `model_file`."""
+    h = hashlib.sha256()
+    with open_uncompressed(model_file) as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _index_file(cache_dir: Path) -> Path:
+    return cache_dir / "index.json"
+
+
+def cache_key(model_file: Path, cache_dir: Path = DEFAULT_CACHE_DIR) -> str:
+    """Content hash of `model_file`.
+
+    Hashing a multi-GB file takes a few seconds, so hashes are remembered in an index
+    keyed by the file's absolute path, size and modification time.
+    """
+    model_file = Path(model_file).resolve()
+    stat = model_file.stat()
+    fingerprint = f"{model_file}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    index_file = _index_file(cache_dir)
+    index = {}
+    if index_file.exists():
+        try:
+            with open(index_file, "r") as f:
+                index = json.load(f)
+        except json.JSONDecodeError:
+            index = {}
+    if fingerprint in index:
+        return index[fingerprint]
+
+    key = file_hash(model_file)
+    index[fingerprint] = key
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Concurrent writers may lose each other's entries, which only costs a rehash
+    with tempfile.NamedTemporaryFile(
+        "w", dir=cache_dir, suffix=".json", delete=False
+    ) as f:
+        json.dump(index, f)
+    os.replace(f.name, index_file)
+    return key
+
+
+def build_cache_entry(model_file: Path, entry_dir: Path) -> None:
+    """Parse `model_file` with HiGHS and write its cache entry to `entry_dir`."""
+    if highspy is None or sp is None:
+        raise ModuleNotFoundError("highspy and scipy are required to read model files")
+    h = highspy.Highs()
+    h.silent()
+    status = h.readModel(str(model_file))
+    if status == highspy.HighsStatus.kError:
+        raise RuntimeError(f"HiGHS could not read {model_file}")
+    lp = h.getLp()
+    num_col, num_row = lp.num_col_, lp.num_row_
+
+    a = lp.a_matrix_
+    matrix_class = (
+        sp.csr_matrix if a.format_ == highspy.MatrixFormat.kRowwise else sp.csc_matrix
+    )
+    matrix = matrix_class(
+        (
+            np.asarray(a.value_, dtype=np.float64),
+            np.asarray(a.index_, dtype=np.int64),
+            np.asarray(a.start_, dtype=np.int64),
+        ),
+        shape=(num_row, num_col),
+    ).tocsr()
+    # Use 32-bit indices whenever possible, as scipy would otherwise copy the
+    # memory-mapped arrays when building the matrix
+    index_dtype = np.int32 if matrix.nnz < np.iinfo(np.int32).max else np.int64
+
+    integrality = np.zeros(num_col, dtype=np.int8)
+    if len(lp.integrality_):
+        integrality[:] = np.fromiter(
+            (int(t) for t in lp.integrality_), dtype=np.int8, count=num_col
+        )
+
+    arrays = {
+        "indptr": matrix.indptr.astype(index_dtype),
+        "indices": matrix.indices.astype(index_dtype),
+        "data": matrix.data,
+        "col_cost": np.asarray(lp.col_cost_, dtype=np.float64),
+        "col_lower": np.asarray(lp.col_lower_, dtype=np.float64),
+        "col_upper": np.asarray(lp.col_upper_, dtype=np.float64),
+        "row_lower": np.asarray(lp.row_lower_, dtype=np.float64),
+        "row_upper": np.asarray(lp.row_upper_, dtype=np.float64),
+        "integrality": integrality,
+    }
+    for name, array in arrays.items():
+        np.save(entry_dir / f"{name}.npy", array)
+
+    with open(entry_dir / "col_names.txt", "w") as f:
+        f.write("\n".join(h.getColName(i)[1] for i in range(num_col)))
+    with open(entry_dir / "row_names.txt", "w") as f:
+        f.write("\n".join(h.getRowName(i)[1] for i in range(num_row)))
+
+    meta = {
+        "format_version": CACHE_FORMAT_VERSION,
+        "source": Path(model_file).name,
+        "num_row": num_row,
+        "num_col": num_col,
+        "num_nz": int(matrix.nnz),
+        "offset": float(lp.offset_),
+        "sense": int(lp.sense_),
+    }
+    # Written last, so that its presence marks a complete entry
+    with open(entry_dir / "meta.json", "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def _read_entry(entry_dir: Path) -> CachedModel | None:
+    meta_file = entry_dir / "meta.json"
+    if not meta_file.exists():
+        return None
+    with open(meta_file, "r") as f:
+        meta = json.load(f)
+    if meta.get("format_version") != CACHE_FORMAT_VERSION:
+        return None
+    arrays = {
+        name: np.load(entry_dir / f"{name}.npy", mmap_mode="r") for name in ARRAYS
+    }
+    return CachedModel(
+        path=entry_dir,
+        num_row=meta["num_row"],
+        num_col=meta["num_col"],
+        num_nz=meta["num_nz"],
+        offset=meta["offset"],
+        sense=meta["sense"],
+        **arrays,
+    )
+
+
+def load_model(
+    model_file: Path, cache_dir: Path = DEFAULT_CACHE_DIR, key: str | None = None
+) -> CachedModel:
+    """Load `model_file` from the cache, converting and caching it if needed. Pass
+    the `key` of the model if it is known, e.g. for temporary copies of a model."""
+    cache_dir = Path(cache_dir)
+    entry_dir = cache_dir / (key or cache_key(model_file, cache_dir))
+
+    model = _read_entry(entry_dir)
+    if model is not None:
+        return model
+
+    # Build the entry in a temporary directory and move it into place, so that
+    # concurrent processes never see a partially written entry
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=cache_dir, prefix=f"{entry_dir.name}."))
+    try:
+        build_cache_entry(model_file, tmp_dir)
+        if entry_dir.exists():
+            # Stale (old format) or concurrently created entry
+            shutil.rmtree(entry_dir, ignore_errors=True)
+        try:
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            # Another process created the entry in the meantime
+            pass
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    model = _read_entry(entry_dir)
+    if model is None:
+        raise RuntimeError(f"Could not create a cache entry for {model_file}")
+    return model
+
+
+def cached_model(key: str, cache_dir: Path = DEFAULT_CACHE_DIR) -> CachedModel | None:
+    """The cache entry of the model with content hash `key`, or None if it is not
+    cached. Unlike `load_model`, this neither hashes nor parses the model file."""
+    return _read_entry(Path(cache_dir) / key)
+
+
+def ensure_cached(model_file: Path, cache_dir: Path = DEFAULT_CACHE_DIR) -> str:
+    """Cache `model_file`, which may be compressed at rest, if it is not cached yet,
+    and return its key."""
+    key = cache_key(model_file, cache_dir)
+    if cached_model(key, cache_dir) is None:
+        with staged(model_file, staging_dir=None) as path:
+            load_model(path, cache_dir, key=key)
+    return key
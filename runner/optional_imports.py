@@ -0,0 +1,18 @@
+"""Guarded imports of packages that are not installed in every solver environment.
+
+The runner scripts import these from here, and check for None before using them:
+
+    from optional_imports import highspy
+"""
+
+# HiGHS is not available in the 2020 environment that we use to run GLPK
+try:
+    import highspy
+except ModuleNotFoundError:
+    highspy = None
+
+# SciPy is only installed in the environments that build model cache entries
+try:
+    import scipy.sparse as sp
+except ModuleNotFoundError:
+    sp = None
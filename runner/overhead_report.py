@@ -0,0 +1,189 @@
+"""Attribute the gap between measured and solver-reported runtimes.
+
+`Runtime (s)` is the wall-clock time of linopy's `solve_problem` in `run_solver.py`,
+while `Reported Runtime (s)` is the solve time reported by the solver. The gap between
+them, and the time to start and stop `run_solver.py`, are overheads that solvers
+don't control. `run_solver.py` records timestamps of its process start, the end of
+its imports, the model read and solve calls of the solver's Python API, the return of
+`solve_problem` and its exit, and `run_benchmarks.py` records when it spawned and
+reaped the process. `phase_times` turns them into the following columns of the
+results:
+
+- Launch Time (s): from spawning the process to its start (systemd-run, time),
+- Startup Time (s): interpreter startup and imports (linopy, solver APIs),
+- Read Time (s): reading the model file with the solver's API,
+- Solution Parse Time (s): from the end of the solve to the return of solve_problem,
+  i.e. retrieving and parsing the solution,
+- Linopy Overhead (s): the rest of the gap between runtime and reported runtime,
+- Exit Time (s): from writing the results to the process being reaped.
+
+Read and parse times are only available for solvers whose Python APIs can be timed
+(see `PHASE_HOOKS` in `run_solver.py`); otherwise they are included in the linopy
+overhead. This script summarizes the overheads per solver and version, and flags runs
+whose overhead exceeds a threshold:
+
+    python overhead_report.py --min-overhead 5 --max-overhead-ratio 0.1
+
+The summary is written to `results/overhead_attribution.csv` and the flagged runs to
+`results/overhead_flagged.csv`.
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RESULTS_DIR = Path(__file__).parent.parent / "results"
+
+PHASE_COLUMNS = [
+    "Launch Time (s)",
+    "Startup Time (s)",
+    "Read Time (s)",
+    "Linopy Overhead (s)",
+    "Solution Parse Time (s)",
+    "Exit Time (s)",
+]
+
+
+def _elapsed(timestamps: dict, start: str, end: str) -> float | None:
+    if timestamps.get(start) is None or timestamps.get(end) is None:
+        return None
+    return max(0.0, timestamps[end] - timestamps[start])
+
+
+def phase_times(
+    timestamps: dict | None,
+    spawned: float,
+    reaped: float,
+    runtime=None,
+    reported_runtime=None,
+) -> dict:
+    """Durations of the phases of a run_solver.py process, from the timestamps it
+    printed and the times at which it was spawned and reaped (all epoch seconds)."""
+    if not timestamps:
+        return {}
+    timestamps = {**timestamps, "spawned": spawned, "reaped": reaped}
+    read = _elapsed(timestamps, "read_start", "read_end")
+    parse = _elapsed(timestamps, "solve_end", "solve_problem_end")
+    linopy_overhead = None
+    if isinstance(runtime, (int, float)) and isinstance(reported_runtime, (int, float)):
+        linopy_overhead = max(
+            0.0, runtime - reported_runtime - (read or 0.0) - (parse or 0.0)
+        )
+    return {
+        "launch_time": _elapsed(timestamps, "spawned", "process_start"),
+        "startup_time": _elapsed(timestamps, "process_start", "imports_done"),
+        "read_time": read,
+        "linopy_overhead": linopy_overhead,
+        "solution_parse_time": parse,
+        "exit_time": _elapsed(timestamps, "exit", "reaped"),
+    }
+
+
+def overhead_table(results: pd.DataFrame) -> pd.DataFrame:
+    """Successful runs with phase timings, with their total overhead: the time of the
+    run_solver.py process not spent in the solver's reported solve."""
+    df = results[(results["Status"] == "ok") & results["Startup Time (s)"].notna()]
+    df = df.copy()
+    for column in ["Runtime (s)", "Reported Runtime (s)"] + PHASE_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    df["Runtime Gap (s)"] = df["Runtime (s)"] - df["Reported Runtime (s)"]
+    df["Total Overhead (s)"] = (
+        df[["Launch Time (s)", "Startup Time (s)", "Exit Time (s)"]].sum(axis=1)
+        + df["Runtime Gap (s)"]
+    )
+    df["Overhead Ratio"] = df["Total Overhead (s)"] / df["Reported Runtime (s)"]
+    return df
+
+
+def attribution_summary(table: pd.DataFrame) -> pd.DataFrame:
+    """Median of each phase per solver and version, and the share of each phase in
+    the total overhead."""
+    columns = PHASE_COLUMNS + ["Runtime Gap (s)", "Total Overhead (s)"]
+    summary = table.groupby(["Solver", "Solver Version"])[columns].median()
+    summary.insert(0, "Runs", table.groupby(["Solver", "Solver Version"]).size())
+    totals = table.groupby(["Solver", "Solver Version"])[PHASE_COLUMNS].sum()
+    shares = totals.div(totals.sum(axis=1).replace(0, np.nan), axis=0)
+    shares.columns = [c.replace(" (s)", " Share") for c in PHASE_COLUMNS]
+    return summary.join(shares).reset_index()
+
+
+def flag_runs(
+    table: pd.DataFrame, min_overhead=5.0, max_overhead_ratio=0.1
+) -> pd.DataFrame:
+    """Runs whose total overhead is at least `min_overhead` seconds and more than
+    `max_overhead_ratio` times the reported runtime."""
+    flagged = table[
+        (table["Total Overhead (s)"] >= min_overhead)
+        & (table["Overhead Ratio"] > max_overhead_ratio)
+    ]
+    columns = [
+        "Benchmark",
+        "Size",
+        "Solver",
+        "Solver Version",
+        "Run ID",
+        "Runtime (s)",
+        "Reported Runtime (s)",
+        "Total Overhead (s)",
+        "Overhead Ratio",
+    ] + PHASE_COLUMNS
+    return flagged[columns].sort_values("Total Overhead (s)", ascending=False)
+
+
+def main(results_csv: Path, output_dir: Path, min_overhead, max_overhead_ratio):
+    results = pd.read_csv(results_csv, dtype={"Solver Version": str})
+    if "Startup Time (s)" not in results.columns:
+        raise ValueError(
+            f"No phase timings in {results_csv}. They are recorded by "
+            "run_benchmarks.py from this version on."
+        )
+    table = overhead_table(results)
+    summary = attribution_summary(table)
+    flagged = flag_runs(table, min_overhead, max_overhead_ratio)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary.to_csv(output_dir / "overhead_attribution.csv", index=False)
+    flagged.to_csv(output_dir / "overhead_flagged.csv", index=False)
+    with pd.option_context("display.width", 160, "display.max_columns", None):
+        print(summary.round(2).to_string(index=False))
+        print(
+            f"\n{len(flagged)} of {len(table)} runs have an overhead of at least "
+            f"{min_overhead}s and more than {max_overhead_ratio:.0%} of the reported "
+            "runtime"
+        )
+        if len(flagged):
+            print(flagged.head(20).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Attribute the overhead of runs to startup, read, linopy, parsing."
+    )
+    parser.add_argument(
+        "--results",
+        type=Path,
+        default=RESULTS_DIR / "benchmark_results.csv",
+        help="Results CSV with phase timings.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=RESULTS_DIR,
+        help="Directory to write the reports to.",
+    )
+    parser.add_argument(
+        "--min-overhead",
+        type=float,
+        default=5.0,
+        help="Flag runs with at least this much overhead (seconds)...",
+    )
+    parser.add_argument(
+        "--max-overhead-ratio",
+        type=float,
+        default=0.1,
+        help="...that is more than this fraction of the reported runtime.",
+    )
+    args = parser.parse_args()
+    main(args.results, args.output_dir, args.min_overhead, args.max_overhead_ratio)
@@ -0,0 +1,388 @@
+"""Race a portfolio of solvers on each benchmark instance and keep the first answer.
+
+Instead of benchmarking every solver, this launches `run_solver.py` for each solver
+of the portfolio concurrently, each pinned to its own subset of the available cores
+and limited to an equal share of the memory limit of `run_benchmarks.py` (95% of the
+available memory, without swap), and returns the first result that is optimal. The remaining solvers are then killed,
+optionally after a grace period that lets us measure by how much the winner won.
+
+Every race is recorded in `results/race_results.csv`, and the history can be
+summarized into a table of the best solver per benchmark family:
+
+    python race_solvers.py ../results/metadata.yaml 2025 --solvers gurobi highs highs-hipo highs-ipm
+    python race_solvers.py --summary
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from socket import gethostname
+
+import psutil
+import yaml
+from run_benchmarks import (
+    get_benchmark_path,
+    get_conda_package_versions,
+    memory_limit_command,
+)
+from solver_variants import get_variant
+
+RACE_RESULTS_CSV = Path(__file__).parent.parent / "results" / "race_results.csv"
+
+# How often to check on the racing solvers
+POLL_INTERVAL_S = 0.1
+
+OPTIMAL_CONDITIONS = {"optimal", "Optimal"}
+
+
+def partition_cores(num_partitions: int) -> list[set[int]]:
+    """Split the cores available to this process into `num_partitions` disjoint sets
+    of (nearly) equal size. If there are fewer cores than partitions, cores are shared
+    round-robin."""
+    cores = sorted(os.sched_getaffinity(0))
+    if len(cores) < num_partitions:
+        return [{cores[i % len(cores)]} for i in range(num_partitions)]
+    size, extra = divmod(len(cores), num_partitions)
+    partitions, start = [], 0
+    for i in range(num_partitions):
+        end = start + size + (1 if i < extra else 0)
+        partitions.append(set(cores[start:end]))
+        start = end
+    return partitions
+
+
+def parse_result(stdout_file) -> dict | None:
+    """Parse the JSON metrics printed as the last line by run_solver.py."""
+    stdout_file.seek(0)
+    lines = stdout_file.read().strip().splitlines()
+    if not lines:
+        return None
+    try:
+        return json.loads(lines[-1])
+    except json.JSONDecodeError:
+        return None
+
+
+def is_optimal(result: dict | None) -> bool:
+    return (
+        result is not None
+        and result.get("status") == "ok"
+        and result.get("condition") in OPTIMAL_CONDITIONS
+    )
+
+
+def kill(process: subprocess.Popen):
+    """Kill a racing solver and any processes it spawned (e.g. the HiGHS binary)."""
+    if process.poll() is None:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        process.wait()
+
+
+def race(
+    input_file: Path,
+    solvers: dict[str, str],
+    timeout: float,
+    grace: float = 0,
+) -> dict:
+    """Race `solvers` (a mapping of solver name to version) on `input_file`.
+
+    Returns a dict with the winner (None if no solver found an optimal solution within
+    `timeout` seconds), its result as printed by run_solver.py, its wall-clock time
+    since the start of the race, and the margin to the next solver to find an optimal
+    solution. The losers are given `grace` more seconds to finish; if none does, the
+    margin is only a lower bound.
+    """
+    run_solver = Path(__file__).parent / "run_solver.py"
+    partitions = partition_cores(len(solvers))
+    memory_limit_bytes = int(
+        psutil.virtual_memory().available * 0.95 / max(len(solvers), 1)
+    )
+    print(
+        f"Setting memory limit to {memory_limit_bytes / (1024 * 1024):.2f} MB per "
+        f"solver (95% of available memory, split between {len(solvers)} solvers)"
+    )
+
+    processes = {}
+    stdout_files = {}
+    finish_times = {}
+    results = {}
+    start = time.perf_counter()
+    for (solver, version), cores in zip(solvers.items(), partitions):
+        stdout_files[solver] = tempfile.TemporaryFile("w+")
+        processes[solver] = subprocess.Popen(
+            memory_limit_command(memory_limit_bytes)
+            + [sys.executable, str(run_solver), solver, str(input_file), version]
+            # Size the solver's thread pool to its cores, not the whole machine
+            + ["--threads", str(len(cores))],
+            stdout=stdout_files[solver],
+            stderr=subprocess.DEVNULL,
+            text=True,
+            # A separate process group lets us kill the solver with its children
+            start_new_session=True,
+            preexec_fn=lambda cores=cores: os.sched_setaffinity(0, cores),
+        )
+        print(f"Started {solver} {version} on cores {sorted(cores)}", flush=True)
+
+    winner, deadline = None, start + timeout
+    try:
+        while time.perf_counter() < deadline and len(finish_times) < len(processes):
+            for solver, process in processes.items():
+                if solver in finish_times or process.poll() is None:
+                    continue
+                finish_times[solver] = time.perf_counter() - start
+                results[solver] = parse_result(stdout_files[solver])
+                print(
+                    f"{solver} finished after {finish_times[solver]:.1f}s: "
+                    f"{(results[solver] or {}).get('condition')}",
+                    flush=True,
+                )
+                if winner is None and is_optimal(results[solver]):
+                    winner = solver
+                    deadline = min(deadline, time.perf_counter() + grace)
+                elif winner is not None and is_optimal(results[solver]):
+                    # We have the margin, no need to wait for the rest
+                    deadline = 0
+            time.sleep(POLL_INTERVAL_S)
+    finally:
+        end = time.perf_counter() - start
+        for process in processes.values():
+            kill(process)
+        for f in stdout_files.values():
+            f.close()
+
+    race_result = {
+        "winner": winner,
+        "winner_version": solvers.get(winner),
+        "winner_time": finish_times.get(winner),
+        "winner_result": results.get(winner, {}),
+        "margin": None,
+        "margin_is_lower_bound": None,
+        "num_solvers": len(solvers),
+        "cores_per_solver": min(len(c) for c in partitions),
+    }
+    if winner is not None:
+        runner_up_times = [
+            t for s, t in finish_times.items() if s != winner and is_optimal(results[s])
+        ]
+        if runner_up_times:
+            race_result["margin"] = min(runner_up_times) - finish_times[winner]
+            race_result["margin_is_lower_bound"] = False
+        elif len(solvers) > 1:
+            race_result["margin"] = end - finish_times[winner]
+            race_result["margin_is_lower_bound"] = True
+    return race_result
+
+
+def race_record(**kwargs):
+    return OrderedDict(
+        [
+            ("Benchmark", kwargs.get("benchmark_name")),
+            ("Size", kwargs.get("size")),
+            ("Solvers", kwargs.get("solvers")),
+            ("Winner", kwargs.get("winner")),
+            ("Winner Version", kwargs.get("winner_version")),
+            ("Winner Time (s)", kwargs.get("winner_time")),
+            ("Winner Runtime (s)", kwargs.get("winner_result", {}).get("runtime")),
+            ("Objective Value", kwargs.get("winner_result", {}).get("objective")),
+            ("Margin (s)", kwargs.get("margin")),
+            ("Margin Is Lower Bound", kwargs.get("margin_is_lower_bound")),
+            ("Cores per Solver", kwargs.get("cores_per_solver")),
+            ("Timeout", kwargs.get("timeout")),
+            ("Hostname", kwargs.get("hostname")),
+            ("Run ID", kwargs.get("run_id")),
+            ("Timestamp", kwargs.get("timestamp")),
+        ]
+    )
+
+
+def write_race_row(race_csv: Path, record: OrderedDict):
+    new_file = not race_csv.exists()
+    race_csv.parent.mkdir(parents=True, exist_ok=True)
+    with open(race_csv, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(record.keys())
+        writer.writerow(record.values())
+
+
+def best_solver_table(race_csv: Path = RACE_RESULTS_CSV) -> list[dict]:
+    """Summarize the race history into the best solver per benchmark family: the
+    solver that won most races, with its win share and median winning margin."""
+    wins = {}
+    with open(race_csv, newline="") as f:
+        for row in csv.DictReader(f):
+            family = wins.setdefault(row["Benchmark"], {"races": 0, "solvers": {}})
+            family["races"] += 1
+            if row["Winner"]:
+                margins = family["solvers"].setdefault(row["Winner"], [])
+                margins.append(float(row["Margin (s)"] or "nan"))
+
+    table = []
+    for benchmark, family in sorted(wins.items()):
+        if not family["solvers"]:
+            table.append({"Benchmark": benchmark, "Races": family["races"]})
+            continue
+        best, margins = max(family["solvers"].items(), key=lambda kv: len(kv[1]))
+        margins = sorted(m for m in margins if m == m)  # Drop NaNs
+        table.append(
+            {
+                "Benchmark": benchmark,
+                "Races": family["races"],
+                "Best Solver": best,
+                "Win Share": len(family["solvers"][best]) / family["races"],
+                "Median Margin (s)": margins[len(margins) // 2] if margins else None,
+            }
+        )
+    return table
+
+
+def print_best_solver_table(race_csv: Path = RACE_RESULTS_CSV):
+    table = best_solver_table(race_csv)
+    print(f"{'Benchmark':40} {'Races':>5}  {'Best solver':15} {'Wins':>5}  Margin")
+    for row in table:
+        margin = row.get("Median Margin (s)")
+        print(
+            f"{row['Benchmark']:40} {row['Races']:>5}  "
+            f"{row.get('Best Solver') or '-':15} "
+            f"{row.get('Win Share', 0):>5.0%}  "
+            f"{'-' if margin is None else f'{margin:.1f}s'}"
+        )
+
+
+def main(
+    benchmark_yaml_path, solvers, year, timeout=None, grace=0, run_id=None
+) -> None:
+    with open(benchmark_yaml_path, "r") as file:
+        yaml_content = yaml.safe_load(file)
+    benchmarks_info = yaml_content["benchmarks"]
+    timeout = timeout or yaml_content.get("timeout_seconds")
+
+    benchmarks_folder = Path(__file__).parent / "benchmarks"
+    benchmarks_folder.mkdir(parents=True, exist_ok=True)
+
+    versions = get_conda_package_versions(solvers, f"benchmark-{year}")
+    portfolio = {}
+    for solver in solvers:
+        if versions.get(solver):
+            portfolio[solver] = versions[solver]
+        else:
+            print(f"Solver {solver} is not available. Skipping.")
+    if not portfolio:
+        raise ValueError("None of the requested solvers are available.")
+
+    hostname = gethostname()
+    run_id = run_id or f"{time.strftime('%Y%m%d_%H%M%S')}_{hostname}_race"
+
+    for benchmark_name, benchmark_info in benchmarks_info.items():
+        # Restrict variants to the problem classes and years in the registry, as in
+        # run_benchmarks.py
+        problem_class = benchmark_info.get("Problem class")
+        racers = {
+            solver: version
+            for solver, version in portfolio.items()
+            if (variant := get_variant(solver)) is None
+            or variant.allows(problem_class, year)
+        }
+        if not racers:
+            print(f"No solver of {list(portfolio)} runs on {benchmark_name}. Skipping.")
+            continue
+        for instance in benchmark_info["Sizes"]:
+            path = get_benchmark_path(benchmark_name, instance, benchmarks_folder)
+            # Same defaults as run_benchmarks.py: 24h for L, 1h otherwise
+            instance_timeout = timeout or (
+                24 * 60 * 60 if instance.get("Size") == "L" else 60 * 60
+            )
+            print(f"Racing {list(racers)} on {path}...", flush=True)
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+            result = race(path, racers, instance_timeout, grace)
+            print(
+                f"Winner: {result['winner']} after {result['winner_time']}s, "
+                f"margin {result['margin']}s",
+                flush=True,
+            )
+            write_race_row(
+                RACE_RESULTS_CSV,
+                race_record(
+                    benchmark_name=benchmark_name,
+                    size=instance["Name"],
+                    solvers=" ".join(racers),
+                    timeout=instance_timeout,
+                    hostname=hostname,
+                    run_id=run_id,
+                    timestamp=timestamp,
+                    **result,
+                ),
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Race a portfolio of solvers on the benchmarks in the given file."
+    )
+    parser.add_argument(
+        "benchmark_yaml_path",
+        type=str,
+        nargs="?",
+        help="Path to the benchmarks YAML file.",
+    )
+    parser.add_argument(
+        "year", type=str, nargs="?", help="Year of the solver environment to use."
+    )
+    parser.add_argument(
+        "--solvers",
+        type=str,
+        nargs="+",
+        default=["gurobi", "highs", "highs-hipo", "highs-ipm"],
+        help="The portfolio of solvers to race.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Timeout of each race in seconds. Default: from the YAML file, or by size.",
+    )
+    parser.add_argument(
+        "--grace",
+        type=float,
+        default=0,
+        help="Seconds the other solvers may keep running after the winner finishes, "
+        "to measure the winning margin.",
+    )
+    parser.add_argument(
+        "--run_id",
+        type=str,
+        default=None,
+        help="Unique identifier for this run.",
+    )
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="Print the best solver per benchmark family from the race history.",
+    )
+    args = parser.parse_args()
+
+    if args.summary:
+        print_best_solver_table()
+    elif args.benchmark_yaml_path is None or args.year is None:
+        parser.error("benchmark_yaml_path and year are required unless --summary")
+    else:
+        main(
+            args.benchmark_yaml_path,
+            args.solvers,
+            args.year,
+            timeout=args.timeout,
+            grace=args.grace,
+            run_id=args.run_id,
+        )
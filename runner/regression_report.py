@@ -0,0 +1,414 @@
+"""Detect significant performance regressions and improvements between two runs.
+
+Compares a baseline and a candidate selected from a results CSV, either by run ID or
+by solver version (`<solver>=<version>`):
+
+    python regression_report.py --baseline 20250101-run --candidate 20250201-run
+    python regression_report.py --baseline highs=1.10.0 --candidate highs=1.11.0
+
+Runs are paired by benchmark instance and solver. Unsolved runs count as taking the
+timeout. Each runtime is normalized by the speed of its host, estimated from the
+reference benchmark runs (`run_benchmarks.py --ref_bench_interval`) of its run and
+host, relative to all reference runs in the results. The noise of each instance's
+runtime combines the following, with a floor of `--noise-floor`:
+
+- the variation of the reference runs on its host,
+- the variation between repeated runs (iterations or seeds),
+- the seed variability of the instance measured by `seed_variability.py`, if
+  `results/seed_variability.csv` exists.
+
+A change is significant if its log runtime ratio exceeds `--z` noise standard
+deviations and the ratio exceeds `--min-effect`. Changes in solved status are always
+significant. Per model family (`--family`, a field of the metadata), the ratio of
+shifted geometric means is reported with a bootstrap confidence interval, and is
+significant if the family has at least 3 instances and the interval excludes 1.
+
+The ranked reports are written to `results/regression_instances.csv` and
+`results/regression_families.csv`. With `--fail-on-regression`, the exit code is 1 if
+there is a significant regression, for use at the end of benchmark campaigns.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+from analytics import bootstrap_sgm_ratio, penalized_values
+
+RESULTS_DIR = Path(__file__).parent.parent / "results"
+
+REFERENCE_BENCHMARK = "reference-benchmark"
+
+INSTANCE_KEYS = ["Benchmark", "Size", "Solver"]
+
+# Standard deviation of log runtimes assumed when no noise can be measured (~5%)
+DEFAULT_NOISE_FLOOR = 0.05
+
+# Changes of instances that take less than this (in seconds) are timer noise
+DEFAULT_MIN_RUNTIME = 1.0
+
+# Minimum number of instances for a family's confidence interval to be meaningful
+MIN_FAMILY_INSTANCES = 3
+
+
+def select_runs(results: pd.DataFrame, spec: str) -> pd.DataFrame:
+    """Rows of `results` matching a run ID, or a solver version `<solver>=<version>`."""
+    if "=" in spec:
+        solver, _, version = spec.partition("=")
+        mask = (results["Solver"] == solver) & (
+            results["Solver Version"].astype(str) == version
+        )
+    else:
+        mask = results["Run ID"] == spec
+    selected = results[mask & (results["Benchmark"] != REFERENCE_BENCHMARK)]
+    if selected.empty:
+        raise ValueError(f"No results match {spec}")
+    return selected
+
+
+def host_noise(results: pd.DataFrame) -> pd.DataFrame:
+    """Speed factor and noise (standard deviation of log runtimes) of each run and
+    host, from its reference benchmark runs. The speed factor is the median reference
+    runtime on the host divided by the median over all hosts."""
+    reference = results[
+        (results["Benchmark"] == REFERENCE_BENCHMARK) & (results["Status"] == "ok")
+    ]
+    log_runtime = np.log(reference["Runtime (s)"].astype(float))
+    grouped = log_runtime.groupby([reference["Run ID"], reference["Hostname"]])
+    noise = pd.DataFrame(
+        {
+            "Speed Factor": np.exp(grouped.median() - log_runtime.median()),
+            "Host Noise": grouped.std().fillna(0.0),
+        }
+    )
+    return noise.reset_index()
+
+
+def normalized_runs(runs: pd.DataFrame, hosts: pd.DataFrame) -> pd.DataFrame:
+    """Penalized runtimes normalized by the speed factor of the host of each run."""
+    runs = runs.merge(hosts, on=["Run ID", "Hostname"], how="left")
+    runs["Speed Factor"] = runs["Speed Factor"].fillna(1.0)
+    runs["Host Noise"] = runs["Host Noise"].fillna(0.0)
+    runs["Solved"] = runs["Status"] == "ok"
+    runtimes = penalized_values(runs["Runtime (s)"], runs["Solved"], runs["Timeout"])
+    runs["Normalized Runtime (s)"] = runtimes / runs["Speed Factor"].to_numpy()
+    runs["Log Runtime"] = np.log(runs["Normalized Runtime (s)"])
+    runs["Host Variance"] = np.square(runs["Host Noise"])
+    return runs
+
+
+def summarize_side(runs: pd.DataFrame) -> pd.DataFrame:
+    """Per instance and solver: median normalized runtime, solved fraction, and the
+    variance of the median's logarithm from host noise and repeated runs."""
+    grouped = runs.groupby(INSTANCE_KEYS)
+    summary = grouped.agg(
+        **{
+            "Runs": ("Log Runtime", "size"),
+            "Solved": ("Solved", "mean"),
+            "Runtime (s)": ("Normalized Runtime (s)", "median"),
+            "Repeat Variance": ("Log Runtime", "var"),
+            "Host Variance": ("Host Variance", "mean"),
+        }
+    )
+    return summary
+
+
+def load_seed_noise(seed_variability_csv: Path) -> pd.Series:
+    """Standard deviation of log runtimes across seeds per instance and solver,
+    estimated from the coefficients of variation in `seed_variability.csv`."""
+    if seed_variability_csv is None or not Path(seed_variability_csv).exists():
+        return pd.Series(dtype=float)
+    table = pd.read_csv(seed_variability_csv)
+    sigma = np.sqrt(np.log1p(np.square(table["Runtime CV"].astype(float))))
+    return sigma.groupby([table[k] for k in INSTANCE_KEYS]).max()
+
+
+def compare_instances(
+    baseline: pd.DataFrame,
+    candidate: pd.DataFrame,
+    seed_noise: pd.Series,
+    z=2.0,
+    min_effect=0.1,
+    noise_floor=DEFAULT_NOISE_FLOOR,
+    min_runtime=DEFAULT_MIN_RUNTIME,
+) -> pd.DataFrame:
+    """Pair the summaries of the two sides by instance and solver, and test the
+    change of each instance for significance."""
+    df = (
+        baseline.add_suffix(" Baseline")
+        .join(candidate.add_suffix(" Candidate"), how="inner")
+        .reset_index()
+    )
+
+    seed_variance = np.square(
+        seed_noise.reindex(pd.MultiIndex.from_frame(df[INSTANCE_KEYS])).to_numpy()
+    )
+    floor_variance = np.fmax(np.nan_to_num(seed_variance), noise_floor**2)
+    variance = np.zeros(len(df))
+    for side in ["Baseline", "Candidate"]:
+        # Repeated runs measure the noise directly; otherwise use the seed
+        # variability or the floor
+        repeat_variance = np.fmax(
+            df[f"Repeat Variance {side}"].fillna(0.0).to_numpy(), floor_variance
+        )
+        variance += (
+            df[f"Host Variance {side}"].to_numpy()
+            + repeat_variance / df[f"Runs {side}"].to_numpy()
+        )
+    noise = np.sqrt(variance)
+
+    log_ratio = np.log(df["Runtime (s) Candidate"] / df["Runtime (s) Baseline"])
+    df["Ratio"] = np.exp(log_ratio)
+    df["Noise"] = noise
+    df["Z"] = log_ratio / noise
+
+    solved_base = df["Solved Baseline"] >= 0.5
+    solved_cand = df["Solved Candidate"] >= 0.5
+    df["Status Change"] = np.select(
+        [solved_base & ~solved_cand, ~solved_base & solved_cand],
+        ["no longer solved", "newly solved"],
+        default="",
+    )
+    # Runtimes of unsolved instances are the timeout, and tiny runtimes are noisy
+    longest = np.fmax(df["Runtime (s) Baseline"], df["Runtime (s) Candidate"])
+    measurable = (solved_base | solved_cand) & (longest >= min_runtime)
+    significant = (np.abs(df["Z"]) >= z) & (np.abs(log_ratio) >= np.log1p(min_effect))
+    significant = (significant & measurable) | (df["Status Change"] != "")
+    df["Significant"] = significant
+    df["Change"] = np.select(
+        [
+            df["Status Change"] == "no longer solved",
+            df["Status Change"] == "newly solved",
+            significant & (log_ratio > 0),
+            significant & (log_ratio < 0),
+        ],
+        ["regression", "improvement", "regression", "improvement"],
+        default="",
+    )
+    # Rank status changes first, then by the size of the change relative to noise
+    df["Rank Key"] = np.where(df["Status Change"] != "", np.inf, np.abs(df["Z"]))
+    df = df.sort_values(["Significant", "Rank Key"], ascending=False)
+    return df.drop(columns="Rank Key").reset_index(drop=True)
+
+
+def compare_families(
+    baseline_runs: pd.DataFrame,
+    candidate_runs: pd.DataFrame,
+    families: dict,
+    num_resamples=2000,
+    confidence=0.95,
+    min_effect=0.1,
+    min_instances=MIN_FAMILY_INSTANCES,
+) -> pd.DataFrame:
+    """Ratio of the SGMs of the candidate and baseline runtimes per family and solver,
+    with a bootstrap confidence interval over the instances of the family."""
+    medians = []
+    for runs in [baseline_runs, candidate_runs]:
+        medians.append(runs.groupby(INSTANCE_KEYS)["Normalized Runtime (s)"].median())
+    paired = pd.concat(medians, axis=1, keys=["Baseline", "Candidate"]).dropna()
+    paired = paired.reset_index()
+    paired["Family"] = paired["Benchmark"].map(families).fillna("unknown")
+
+    rows = []
+    for (family, solver), group in paired.groupby(["Family", "Solver"]):
+        ratio, lower, upper = bootstrap_sgm_ratio(
+            group["Candidate"].to_numpy(),
+            group["Baseline"].to_numpy(),
+            num_resamples=num_resamples,
+            confidence=confidence,
+        )
+        significant = (
+            len(group) >= min_instances
+            and (lower > 1 or upper < 1)
+            and abs(np.log(ratio)) >= np.log1p(min_effect)
+        )
+        rows.append(
+            {
+                "Family": family,
+                "Solver": solver,
+                "Instances": len(group),
+                "SGM Ratio": ratio,
+                "CI Lower": lower,
+                "CI Upper": upper,
+                "Significant": significant,
+                "Change": ("regression" if ratio > 1 else "improvement")
+                if significant
+                else "",
+            }
+        )
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    df["Rank Key"] = np.abs(np.log(df["SGM Ratio"]))
+    df = df.sort_values(["Significant", "Rank Key"], ascending=False)
+    return df.drop(columns="Rank Key").reset_index(drop=True)
+
+
+def load_families(metadata_yaml: Path, field: str) -> dict[str, str]:
+    with open(metadata_yaml, "r") as f:
+        benchmarks = yaml.safe_load(f)["benchmarks"]
+    return {name: info.get(field) for name, info in benchmarks.items()}
+
+
+def main(
+    results_csvs: list[Path],
+    baseline_spec: str,
+    candidate_spec: str,
+    metadata_yaml: Path,
+    family_field="Modelling framework",
+    seed_variability_csv=None,
+    z=2.0,
+    min_effect=0.1,
+    noise_floor=DEFAULT_NOISE_FLOOR,
+    min_runtime=DEFAULT_MIN_RUNTIME,
+    output_dir=RESULTS_DIR,
+    top=20,
+) -> bool:
+    """Write and print the reports, returning whether there is a significant
+    regression."""
+    # The same runs may appear in several files, e.g. in a snapshot of the results
+    # taken before a campaign and in the results after appending to them
+    results = pd.concat(
+        [pd.read_csv(f) for f in results_csvs], ignore_index=True
+    ).drop_duplicates()
+    hosts = host_noise(results)
+    baseline_runs = normalized_runs(select_runs(results, baseline_spec), hosts)
+    candidate_runs = normalized_runs(select_runs(results, candidate_spec), hosts)
+
+    instances = compare_instances(
+        summarize_side(baseline_runs),
+        summarize_side(candidate_runs),
+        load_seed_noise(seed_variability_csv),
+        z=z,
+        min_effect=min_effect,
+        noise_floor=noise_floor,
+        min_runtime=min_runtime,
+    )
+    families = compare_families(
+        baseline_runs,
+        candidate_runs,
+        load_families(metadata_yaml, family_field),
+        min_effect=min_effect,
+    )
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    instances.to_csv(output_dir / "regression_instances.csv", index=False)
+    families.to_csv(output_dir / "regression_families.csv", index=False)
+
+    print(f"Compared {len(instances)} instances of {candidate_spec} to {baseline_spec}")
+    columns = INSTANCE_KEYS + [
+        "Runtime (s) Baseline",
+        "Runtime (s) Candidate",
+        "Ratio",
+        "Z",
+        "Change",
+    ]
+    significant = instances[instances["Significant"]]
+    with pd.option_context("display.width", 160, "display.max_rows", None):
+        print(f"\n{len(significant)} significant changes per instance:")
+        print(significant[columns].head(top).round(2).to_string(index=False))
+        if not families.empty:
+            print("\nPer family:")
+            print(families.head(top).round(3).to_string(index=False))
+
+    return bool(
+        (instances["Change"] == "regression").any()
+        or (not families.empty and (families["Change"] == "regression").any())
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report significant runtime changes between two runs or versions."
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        required=True,
+        help="Run ID, or <solver>=<version>, of the baseline.",
+    )
+    parser.add_argument(
+        "--candidate",
+        type=str,
+        required=True,
+        help="Run ID, or <solver>=<version>, to compare to the baseline.",
+    )
+    parser.add_argument(
+        "--results",
+        type=Path,
+        nargs="+",
+        default=[RESULTS_DIR / "benchmark_results.csv"],
+        help="Results CSV files containing both runs.",
+    )
+    parser.add_argument(
+        "--metadata",
+        type=Path,
+        default=RESULTS_DIR / "metadata.yaml",
+        help="Benchmark metadata, for the family of each benchmark.",
+    )
+    parser.add_argument(
+        "--family",
+        type=str,
+        default="Modelling framework",
+        help="Metadata field that groups benchmarks into families.",
+    )
+    parser.add_argument(
+        "--seed-variability",
+        type=Path,
+        default=RESULTS_DIR / "seed_variability.csv",
+        help="Seed variability table from seed_variability.py, if it exists.",
+    )
+    parser.add_argument(
+        "--z",
+        type=float,
+        default=2.0,
+        help="Number of noise standard deviations for a change to be significant.",
+    )
+    parser.add_argument(
+        "--min-effect",
+        type=float,
+        default=0.1,
+        help="Minimum relative runtime change to report (0.1 = 10%%).",
+    )
+    parser.add_argument(
+        "--noise-floor",
+        type=float,
+        default=DEFAULT_NOISE_FLOOR,
+        help="Minimum standard deviation of log runtimes of an instance.",
+    )
+    parser.add_argument(
+        "--min-runtime",
+        type=float,
+        default=DEFAULT_MIN_RUNTIME,
+        help="Ignore runtime changes of instances solved in less than this (seconds).",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=RESULTS_DIR,
+        help="Directory to write the reports to.",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with code 1 if there is a significant regression.",
+    )
+    args = parser.parse_args()
+
+    regression = main(
+        args.results,
+        args.baseline,
+        args.candidate,
+        args.metadata,
+        family_field=args.family,
+        seed_variability_csv=args.seed_variability,
+        z=args.z,
+        min_effect=args.min_effect,
+        noise_floor=args.noise_floor,
+        min_runtime=args.min_runtime,
+        output_dir=args.output_dir,
+    )
+    if args.fail_on_regression and regression:
+        sys.exit(1)
@@ -0,0 +1,357 @@
+"""Local read-only HTTP/JSON API over the benchmark results.
+
+Serves the results CSVs and `metadata.yaml` of `results/` to notebooks, dashboards
+and CI, so that they don't each reimplement loading and aggregating them:
+
+    python results_api.py --port 8050
+    curl 'localhost:8050/sgm?by=Solver,Solver Version&problem_class=LP'
+
+Endpoints (all GET, all returning JSON):
+
+- `/results`: raw results, filtered by the query parameters `benchmark`, `size`,
+  `solver`, `version`, `status`, `run_id`, `problem_class` and `size_category`
+  (comma-separated lists), with an optional `limit`.
+- `/sgm`: shifted geometric means of `value` (`runtime` or `memory`) per group of
+  the columns `by` (default `Solver,Solver Version`), over the results filtered as
+  above. As on the website, unsolved runs count as `penalty` times their timeout
+  for runtimes, and as the memory limit of their size category for memory.
+- `/compare`: per-instance comparison of a `baseline` and a `candidate` run ID or
+  solver version (`<solver>=<version>`), as in `regression_report.py`.
+- `/scaling`: log-log fit of the runtime of each solver version against the number
+  of variables (or `x`, a numeric metadata field) of solved instances.
+- `/version`: the version of the data, which changes when any of the files change.
+
+Responses are cached in an LRU cache keyed on the path, the query and the version of
+the data, and carry an ETag, so that clients that send `If-None-Match` get an empty
+304 response while the data is unchanged. The server only uses the standard library
+and the analytics of this repository.
+
+Invalid queries are answered with 400 Bad Request, and other errors (e.g. missing
+results files) with 500 Internal Server Error, both with a JSON body `{"error": ...}`.
+"""
+
+import argparse
+import hashlib
+import json
+from functools import lru_cache
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+import yaml
+from analytics import DEFAULT_SHIFT, sgm_by_group
+from regression_report import (
+    compare_instances,
+    host_noise,
+    load_seed_noise,
+    normalized_runs,
+    select_runs,
+    summarize_side,
+)
+
+RESULTS_DIR = Path(__file__).parent.parent / "results"
+
+# Files served by default: the results of the website and the metadata
+DEFAULT_RESULTS = [RESULTS_DIR / "benchmark_results.csv"]
+DEFAULT_METADATA = RESULTS_DIR / "metadata.yaml"
+
+# Query parameters of /results and the columns they filter
+FILTERS = {
+    "benchmark": "Benchmark",
+    "size": "Size",
+    "solver": "Solver",
+    "version": "Solver Version",
+    "status": "Status",
+    "run_id": "Run ID",
+    "problem_class": "Problem class",
+    "size_category": "Size category",
+}
+
+VALUES = {"runtime": "Runtime (s)", "memory": "Memory Usage (MB)"}
+
+# Memory limits of the benchmark VMs per size category, used as the memory of
+# unsolved runs (as MAX_MEMORY_MB in website/scripts/export_results.py)
+MAX_MEMORY_MB = {"L": 62 * 1024}
+DEFAULT_MAX_MEMORY_MB = 7 * 1024
+
+
+class QueryError(ValueError):
+    """An invalid query, answered with 400 Bad Request."""
+
+
+def data_version(files) -> str:
+    """A short hash of the paths, sizes and modification times of `files`."""
+    stats = [(str(f), f.stat().st_size, f.stat().st_mtime_ns) for f in files]
+    return hashlib.sha1(repr(stats).encode()).hexdigest()[:16]
+
+
+@lru_cache(maxsize=2)
+def load_data(results_csvs: tuple, metadata_yaml: Path, version: str):
+    """The results, with the metadata of their instances, and the metadata of each
+    instance. `version` is only used as the cache key."""
+    with open(metadata_yaml, "r") as f:
+        metadata = yaml.safe_load(f)
+    rows = []
+    for benchmark, info in metadata["benchmarks"].items():
+        for size in info.get("Sizes", []):
+            rows.append(
+                {
+                    "Benchmark": benchmark,
+                    "Size": size.get("Name"),
+                    "Problem class": info.get("Problem class"),
+                    "Modelling framework": info.get("Modelling framework"),
+                    "Size category": size.get("Size"),
+                    "Realistic": size.get("Realistic"),
+                    **{k: v for k, v in size.items() if k.startswith("Num. ")},
+                }
+            )
+    instances = pd.DataFrame(rows)
+    results = pd.concat(
+        [pd.read_csv(f, dtype={"Solver Version": str}) for f in results_csvs],
+        ignore_index=True,
+    ).drop_duplicates()
+    results = results.merge(
+        instances[["Benchmark", "Size", "Problem class", "Size category"]],
+        on=["Benchmark", "Size"],
+        how="left",
+    )
+    return results, instances
+
+
+def filtered(results: pd.DataFrame, query: dict) -> pd.DataFrame:
+    mask = np.ones(len(results), dtype=bool)
+    for parameter, column in FILTERS.items():
+        if parameter in query:
+            mask &= results[column].astype(str).isin(query[parameter].split(","))
+    return results[mask]
+
+
+def records(df: pd.DataFrame) -> list[dict]:
+    """Rows of `df` as JSON-serializable records, with NaN as null."""
+    return json.loads(df.to_json(orient="records"))
+
+
+def _float(query: dict, name: str, default: float) -> float:
+    try:
+        return float(query.get(name, default))
+    except ValueError:
+        raise QueryError(f"{name} must be a number")
+
+
+def _int(query: dict, name: str, default: int) -> int:
+    try:
+        return int(query.get(name, default))
+    except ValueError:
+        raise QueryError(f"{name} must be an integer")
+
+
+def results_endpoint(results, instances, query):
+    df = filtered(results, query)
+    if "limit" in query:
+        df = df.head(_int(query, "limit", 0))
+    return {"count": len(df), "results": records(df)}
+
+
+def sgm_endpoint(results, instances, query):
+    df = filtered(results, query)
+    df = df[df["Benchmark"] != "reference-benchmark"]
+    by = query.get("by", "Solver,Solver Version").split(",")
+    value = VALUES.get(query.get("value", "runtime"))
+    if value is None or any(c not in df.columns for c in by):
+        raise QueryError(
+            f"value must be one of {list(VALUES)} and by columns of the results"
+        )
+    df = df.assign(
+        Solved=df["Status"] == "ok",
+        **{
+            "Max Memory (MB)": df["Size category"]
+            .map(MAX_MEMORY_MB)
+            .fillna(DEFAULT_MAX_MEMORY_MB)
+        },
+    )
+    runtime = value == "Runtime (s)"
+    sgm = sgm_by_group(
+        df,
+        by,
+        value=value,
+        shift=_float(query, "shift", DEFAULT_SHIFT),
+        solved="Solved",
+        timeout="Timeout" if runtime else "Max Memory (MB)",
+        penalty=_float(query, "penalty", 1.0) if runtime else 1.0,
+    )
+    grouped = df.groupby(by)
+    table = pd.DataFrame(
+        {
+            "SGM": sgm,
+            "Instances": grouped.size(),
+            "Solved": grouped["Solved"].sum(),
+        }
+    )
+    return {"value": value, "sgm": records(table.reset_index())}
+
+
+def compare_endpoint(results, instances, query):
+    if "baseline" not in query or "candidate" not in query:
+        raise QueryError("compare needs baseline and candidate")
+    hosts = host_noise(results)
+    try:
+        sides = [
+            summarize_side(normalized_runs(select_runs(results, query[side]), hosts))
+            for side in ["baseline", "candidate"]
+        ]
+    except ValueError as e:
+        raise QueryError(str(e))
+    seed_noise = load_seed_noise(RESULTS_DIR / "seed_variability.csv")
+    comparison = compare_instances(
+        *sides,
+        seed_noise,
+        z=_float(query, "z", 2.0),
+        min_effect=_float(query, "min_effect", 0.1),
+    )
+    return {"comparison": records(comparison)}
+
+
+def scaling_endpoint(results, instances, query):
+    x = query.get("x", "Num. variables")
+    if x not in instances.columns:
+        raise QueryError(f"x must be one of {[c for c in instances if 'Num.' in c]}")
+    df = filtered(results, query)
+    df = df[df["Status"] == "ok"].merge(
+        instances[["Benchmark", "Size", x]], on=["Benchmark", "Size"]
+    )
+    df = df[(pd.to_numeric(df[x], errors="coerce") > 0) & (df["Runtime (s)"] > 0)]
+    fits = []
+    for (solver, version), group in df.groupby(["Solver", "Solver Version"]):
+        if group[x].nunique() < 2:
+            continue
+        log_x = np.log10(group[x].astype(float))
+        log_y = np.log10(group["Runtime (s)"].astype(float))
+        slope, intercept = np.polyfit(log_x, log_y, 1)
+        residuals = log_y - (slope * log_x + intercept)
+        total = np.square(log_y - log_y.mean()).sum()
+        fits.append(
+            {
+                "Solver": solver,
+                "Solver Version": version,
+                "Instances": len(group),
+                "Exponent": slope,
+                "Intercept": intercept,
+                "R2": 1 - np.square(residuals).sum() / total if total else None,
+            }
+        )
+    return {"x": x, "fits": fits}
+
+
+ENDPOINTS = {
+    "/results": results_endpoint,
+    "/sgm": sgm_endpoint,
+    "/compare": compare_endpoint,
+    "/scaling": scaling_endpoint,
+}
+
+
+class ResultsAPI:
+    def __init__(self, results_csvs, metadata_yaml, cache_size=256):
+        self.results_csvs = tuple(Path(f) for f in results_csvs)
+        self.metadata_yaml = Path(metadata_yaml)
+        self.respond = lru_cache(maxsize=cache_size)(self._respond)
+
+    def version(self) -> str:
+        return data_version(self.results_csvs + (self.metadata_yaml,))
+
+    def _respond(self, path: str, query: tuple, version: str) -> tuple[int, bytes]:
+        """Status and JSON body of the response to a query on a version of the
+        data. Cached on all three arguments."""
+        if path == "/version":
+            body = {"version": version}
+        elif path in ENDPOINTS:
+            results, instances = load_data(
+                self.results_csvs, self.metadata_yaml, version
+            )
+            try:
+                body = ENDPOINTS[path](results, instances, dict(query))
+            except (ValueError, OverflowError, KeyError) as e:
+                # QueryError, and the errors of pandas and numpy on values or
+                # columns of the query that the endpoints don't check
+                error = str(e) if isinstance(e, QueryError) else repr(e)
+                return HTTPStatus.BAD_REQUEST, json.dumps({"error": error}).encode()
+        else:
+            body = {"error": f"Unknown endpoint {path}", "endpoints": list(ENDPOINTS)}
+            return HTTPStatus.NOT_FOUND, json.dumps(body).encode()
+        return HTTPStatus.OK, json.dumps(body, default=str).encode()
+
+
+def make_handler(api: ResultsAPI):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = tuple(sorted(parse_qsl(url.query)))
+            try:
+                version = api.version()
+                status, body = api.respond(url.path.rstrip("/") or "/", query, version)
+            except Exception as e:
+                # Not cached, so that the query is retried once the data is fixed
+                self.log_error("Error answering %s: %r", self.path, e)
+                self.send_json_error(HTTPStatus.INTERNAL_SERVER_ERROR, repr(e))
+                return
+            etag = '"{}"'.format(
+                hashlib.sha1(repr((url.path, query, version)).encode()).hexdigest()
+            )
+            if status == HTTPStatus.OK and self.headers.get("If-None-Match") == etag:
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_json_error(self, status: int, error: str):
+            body = json.dumps({"error": error}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def main(results_csvs, metadata_yaml, host, port, cache_size):
+    api = ResultsAPI(results_csvs, metadata_yaml, cache_size)
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    print(f"Serving {', '.join(map(str, api.results_csvs))} on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve aggregated benchmark results over a local HTTP/JSON API."
+    )
+    parser.add_argument(
+        "--results",
+        type=Path,
+        nargs="+",
+        default=DEFAULT_RESULTS,
+        help="Results CSVs to serve.",
+    )
+    parser.add_argument("--metadata", type=Path, default=DEFAULT_METADATA)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="Number of responses to keep in the LRU cache.",
+    )
+    args = parser.parse_args()
+    main(args.results, args.metadata, args.host, args.port, args.cache_size)
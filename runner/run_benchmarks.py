@@ -2,12 +2,14 @@ import argparse
 import csv
 import datetime
 import gzip
+import itertools
 import json
 import os
 import re
 import shutil
 import statistics
 import subprocess
+import tempfile
 import time
 from collections import OrderedDict
 from pathlib import Path
@@ -16,7 +18,15 @@ from socket import gethostname
 import psutil
 import requests
 import yaml
-from run_solver import HighsVariant
+from format_cache import DEFAULT_CACHE_DIR as FORMAT_CACHE_DIR
+from format_cache import convert, fastest_format, load_read_times, model_format
+from instance_store import compress, find_stored, restore, staged, uncompressed_name
+from milp_trajectory import recompute_primal_integrals, trajectory_metrics_from_log
+from model_cache import cache_key, ensure_cached
+from optional_imports import highspy
+from overhead_report import phase_times
+from seed_variability import permuted_benchmark
+from solver_variants import THREADS_OPTIONS, base_solver, get_variant
 
 
 def get_conda_package_versions(solvers, env_name=None):
@@ -45,13 +55,12 @@ def get_conda_package_versions(solvers, env_name=None):
         name_to_pkg = {"highs": "highspy", "cbc": "coin-or-cbc"}
         solver_versions = {}
         for solver in solvers:
-            # Handle highs-hipo variants as special cases - not conda packages
-            if solver in [
-                variant.value for variant in HighsVariant
-            ]:  # For py3.10 compatibility
+            # Variants that run the HiGHS-HiPO binary are not conda packages
+            variant = get_variant(solver)
+            if variant is not None and variant.interface == "binary":
                 solver_versions[solver] = get_highs_hipo_version()
             else:
-                package = name_to_pkg.get(solver, solver)
+                package = name_to_pkg.get(base_solver(solver), base_solver(solver))
                 solver_versions[solver] = installed_packages.get(package, None)
 
         return solver_versions
@@ -75,8 +84,10 @@ def download_benchmark_file(url, dest_path: Path):
     else:
         uncompressed_dest_path = dest_path
 
-    if os.path.exists(uncompressed_dest_path):
-        print(f"File already exists at {uncompressed_dest_path}. Skipping download.")
+    # The file may be stored compressed, see instance_store.py
+    stored_path = find_stored(uncompressed_dest_path)
+    if stored_path is not None:
+        print(f"File already exists at {stored_path}. Skipping download.")
         return
 
     if url.startswith("gs://"):
@@ -105,6 +116,61 @@ def download_benchmark_file(url, dest_path: Path):
         print(f"Unzipped to {uncompressed_file_path}.")
 
 
+def get_benchmark_path(
+    benchmark_name, instance, benchmarks_folder: Path, compress_at_rest=False
+) -> Path:
+    """Return the local path of a benchmark instance (a size entry of the benchmark
+    YAML file), downloading it to `benchmarks_folder` if it is given by a URL.
+
+    With `compress_at_rest`, downloaded files are stored compressed and the path of
+    the compressed file is returned; use `instance_store.staged` to solve it.
+    """
+    if "Path" in instance:
+        benchmark_path = Path(instance["Path"])
+        if not benchmark_path.exists():
+            raise FileNotFoundError(
+                f"File specified in 'Path' does not exist: {benchmark_path}"
+            )
+    elif "URL" in instance:
+        # TODO share this code with validate_urls.py
+        gz = instance["URL"].endswith(".gz")
+        base = instance["URL"][:-3] if gz else instance["URL"]
+        ext = base[base.rfind(".") :]
+        # If no dot was found, ext will be the full string; make it empty instead
+        if "." not in ext:
+            ext = ""
+        ext += ".gz" if gz else ""
+        benchmark_path = benchmarks_folder / f"{benchmark_name}-{instance['Name']}{ext}"
+        download_benchmark_file(instance["URL"], benchmark_path)
+
+        # Gzip files are unzipped by the above function, so update path accordingly
+        if benchmark_path.suffix == ".gz":
+            benchmark_path = benchmark_path.with_suffix("")
+        stored_path = find_stored(benchmark_path)
+        benchmark_path = (
+            compress(stored_path) if compress_at_rest else restore(stored_path)
+        )
+    else:
+        raise ValueError("No valid 'Path' or 'URL' found for benchmark entry.")
+    return benchmark_path
+
+
+def get_fastest_format_path(benchmark_path: Path, solver, read_times) -> Path:
+    """Return a copy of the benchmark in the format that `solver` reads fastest,
+    according to the read times measured by format_cache.py, or the benchmark itself
+    if there are no measurements, it is already in that format (possibly compressed
+    at rest), or it cannot be converted."""
+    try:
+        key = cache_key(benchmark_path, FORMAT_CACHE_DIR)
+        fmt = fastest_format(read_times, key, solver)
+        if fmt is None or fmt == model_format(uncompressed_name(benchmark_path)):
+            return benchmark_path
+        return convert(benchmark_path, fmt)
+    except Exception as e:
+        print(f"WARNING: could not convert {benchmark_path} for {solver}: {e}")
+        return benchmark_path
+
+
 def parse_memory(output):
     line = output.splitlines()[-1]
     if "MaxResidentSetSizeKB=" in line:
@@ -137,6 +203,22 @@ def csv_record(check=False, **kwargs):
             ("VM Instance Type", kwargs.get("vm_instance_type")),
             ("VM Zone", kwargs.get("vm_zone")),
             ("Solver benchmark version", kwargs.get("solver_benchmark_version")),
+            ("Time to First Feasible (s)", kwargs.get("time_to_first_feasible")),
+            ("Time to 1% Gap (s)", kwargs.get("time_to_gap_1e-2")),
+            ("Time to 0.1% Gap (s)", kwargs.get("time_to_gap_1e-3")),
+            ("Time to 0.01% Gap (s)", kwargs.get("time_to_gap_1e-4")),
+            ("Primal Integral", kwargs.get("primal_integral")),
+            ("Input Format", kwargs.get("input_format")),
+            ("Threads", kwargs.get("threads")),
+            ("Seed", kwargs.get("seed")),
+            ("Permutation", kwargs.get("permutation")),
+            ("Launch Time (s)", kwargs.get("launch_time")),
+            ("Startup Time (s)", kwargs.get("startup_time")),
+            ("Read Time (s)", kwargs.get("read_time")),
+            ("Linopy Overhead (s)", kwargs.get("linopy_overhead")),
+            ("Solution Parse Time (s)", kwargs.get("solution_parse_time")),
+            ("Exit Time (s)", kwargs.get("exit_time")),
+            ("Trajectory File", kwargs.get("trajectory_file")),
         ]
     )
 
@@ -148,6 +230,27 @@ def csv_record(check=False, **kwargs):
     return record
 
 
+MEAN_STDDEV_COLUMNS = [
+    "Benchmark",
+    "Size",
+    "Solver",
+    "Solver Version",
+    "Solver Release Year",
+    "Status",
+    "Termination Condition",
+    "Runtime Mean (s)",
+    "Runtime StdDev (s)",
+    "Memory Mean (MB)",
+    "Memory StdDev (MB)",
+    "Objective Value",
+    "Run ID",
+    "Timestamp",
+    "Threads",
+    "Seed",
+    "Permutation",
+]
+
+
 def write_csv_headers(
     results_csv, mean_stddev_csv, headers=csv_record(check=False).keys()
 ):
@@ -158,24 +261,35 @@ def write_csv_headers(
 
     with open(mean_stddev_csv, mode="w", newline="") as file:
         writer = csv.writer(file)
-        writer.writerow(
-            [
-                "Benchmark",
-                "Size",
-                "Solver",
-                "Solver Version",
-                "Solver Release Year",
-                "Status",
-                "Termination Condition",
-                "Runtime Mean (s)",
-                "Runtime StdDev (s)",
-                "Memory Mean (MB)",
-                "Memory StdDev (MB)",
-                "Objective Value",
-                "Run ID",
-                "Timestamp",
-            ]
-        )
+        writer.writerow(MEAN_STDDEV_COLUMNS)
+
+
+def upgrade_csv_header(csv_file: Path, columns: list[str]) -> bool:
+    """Rewrite `csv_file` with the header `columns`, followed by any other columns
+    of its current header, if its header doesn't start with `columns`.
+
+    Rows are appended positionally in the order of `columns`, so without this, rows
+    appended to a file written by an older version with fewer columns would not
+    line up with its header. Returns whether the file was rewritten."""
+    with open(csv_file, "r", newline="") as f:
+        reader = csv.DictReader(f)
+        header = reader.fieldnames or []
+        if header[: len(columns)] == columns:
+            return False
+        rows = list(reader)
+
+    fieldnames = columns + [c for c in header if c not in columns]
+    print(f"Upgrading the header of {csv_file} to {len(fieldnames)} columns")
+    # Write atomically, so that an interrupted upgrade can't lose results
+    fd, tmp_name = tempfile.mkstemp(dir=Path(csv_file).parent, suffix=".csv")
+    with os.fdopen(fd, "w", newline="") as f:
+        # Values beyond the old header (key None) can't be attributed to a column
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    os.chmod(tmp_name, os.stat(csv_file).st_mode)
+    os.replace(tmp_name, csv_file)
+    return True
 
 
 def write_csv_row(
@@ -227,16 +341,27 @@ def write_csv_summary_row(mean_stddev_csv, benchmark_name, metrics, run_id, time
                 metrics["objective"],
                 run_id,
                 timestamp,
+                metrics.get("threads"),
+                metrics.get("seed"),
+                metrics.get("permutation"),
             ]
         )
 
 
-def benchmark_solver(input_file, solver_name, timeout, solver_version):
-    available_memory_bytes = psutil.virtual_memory().available
-    memory_limit_bytes = int(available_memory_bytes * 0.95)
-    memory_limit_mb = memory_limit_bytes / (1024 * 1024)
-    print(f"Setting memory limit to {memory_limit_mb:.2f} MB (95% of available memory)")
+def run_tag(threads: int | None, seed: int | None) -> str | None:
+    """Tag of the solution, log and trajectory files of a run, so that runs with
+    different numbers of threads or seeds don't overwrite each other's files."""
+    parts = []
+    if threads is not None:
+        parts.append(f"t{threads}")
+    if seed is not None:
+        parts.append(f"seed{seed}")
+    return "-".join(parts) or None
+
 
+def memory_limit_command(memory_limit_bytes: int) -> list[str]:
+    """Command prefix that runs a process in a systemd scope limited to
+    `memory_limit_bytes` of physical memory."""
     command = ["systemd-run"]
 
     if os.geteuid() != 0:
@@ -247,20 +372,64 @@ def benchmark_solver(input_file, solver_name, timeout, solver_version):
             "--scope",
             f"--property=MemoryMax={memory_limit_bytes}",  # Set resident memory limit
             "--property=MemorySwapMax=0",  # Disable swap to ensure only physical RAM is used
+        ]
+    )
+    return command
+
+
+def pin_cpus_command(threads: int | None) -> list[str]:
+    """Command prefix that restricts a process to the first `threads` CPUs available
+    to this process, so that solvers can't use more cores than threads."""
+    if threads is None:
+        return []
+    cpus = sorted(os.sched_getaffinity(0))
+    if threads > len(cpus):
+        raise ValueError(f"Cannot pin {threads} threads to {len(cpus)} CPUs")
+    return ["taskset", "--cpu-list", ",".join(str(c) for c in cpus[:threads])]
+
+
+def benchmark_solver(
+    input_file,
+    solver_name,
+    timeout,
+    solver_version,
+    problem_class=None,
+    solver_args=(),
+    output_tag=None,
+    threads=None,
+    seed=None,
+):
+    available_memory_bytes = psutil.virtual_memory().available
+    memory_limit_bytes = int(available_memory_bytes * 0.95)
+    memory_limit_mb = memory_limit_bytes / (1024 * 1024)
+    print(f"Setting memory limit to {memory_limit_mb:.2f} MB (95% of available memory)")
+
+    command = memory_limit_command(memory_limit_bytes)
+    command.extend(
+        [
             "/usr/bin/time",
             "--format",
             "MaxResidentSetSizeKB=%M",
             "timeout",
             f"{timeout}s",
+            *pin_cpus_command(threads),
             "python",
             f"{Path(__file__).parent / 'run_solver.py'}",
             solver_name,
             input_file,
             solver_version,
+            *solver_args,
         ]
     )
+    if output_tag:
+        command.extend(["--output-tag", output_tag])
+    if threads is not None:
+        command.extend(["--threads", str(threads)])
+    if seed is not None:
+        command.extend(["--seed", str(seed)])
 
     # Run the command and capture the output
+    spawned = time.time()
     result = subprocess.run(
         command,
         capture_output=True,
@@ -268,13 +437,14 @@ def benchmark_solver(input_file, solver_name, timeout, solver_version):
         check=False,
         encoding="utf-8",
     )
+    reaped = time.time()
+
+    output_filename = f"{Path(input_file).stem}-{solver_name}-{solver_version}"
+    if output_tag:
+        output_filename += f"-{output_tag}"
 
     # Append the stderr to the log file
-    log_file = (
-        Path(__file__).parent
-        / "logs"
-        / f"{Path(input_file).stem}-{solver_name}-{solver_version}.log"
-    )
+    log_file = Path(__file__).parent / "logs" / f"{output_filename}.log"
     if log_file.exists:
         with open(log_file, "a") as f:
             f.write("\nSTDERR:\n")
@@ -332,12 +502,41 @@ def benchmark_solver(input_file, solver_name, timeout, solver_version):
         }
     else:
         metrics = json.loads(result.stdout.splitlines()[-1])
+        metrics.update(
+            phase_times(
+                metrics.pop("timestamps", None),
+                spawned,
+                reaped,
+                metrics.get("runtime"),
+                metrics.get("reported_runtime"),
+            )
+        )
 
     if metrics["status"] not in {"ok", "TO", "ER", "OOM"}:
         print(f"WARNING: unknown solver status: {metrics['status']}")
 
     metrics["memory"] = memory
     metrics["timeout"] = timeout
+    metrics["threads"] = threads
+    metrics["seed"] = seed
+
+    # Recover the incumbent/bound trajectory from the solver log. This also works
+    # for timed out runs, which is where anytime metrics are most informative.
+    if problem_class == "MILP" and isinstance(metrics["runtime"], (int, float)):
+        trajectory_file = Path("trajectories") / f"{output_filename}.csv"
+        # Don't record the trajectory of a previous run with the same file name
+        (Path(__file__).parent / trajectory_file).unlink(missing_ok=True)
+        metrics.update(
+            trajectory_metrics_from_log(
+                log_file,
+                solver_name,
+                end_time=metrics["runtime"],
+                trajectory_file=Path(__file__).parent / trajectory_file,
+            )
+        )
+        if (Path(__file__).parent / trajectory_file).exists():
+            # Relative to runner/, for recompute_primal_integrals
+            metrics["trajectory_file"] = str(trajectory_file)
 
     return metrics
 
@@ -454,7 +653,19 @@ def main(
     reference_interval=0,  # Default: disabled
     append=False,
     run_id=None,
+    use_fastest_format=False,
+    compress_at_rest=False,
+    staging_dir=None,
+    thread_counts=None,
+    num_seeds=None,
+    permute=False,
 ):
+    # Fail before any benchmark runs rather than at the first permuted model
+    if permute and highspy is None:
+        raise ModuleNotFoundError(
+            "--permute needs highspy, which is not installed in this environment"
+        )
+
     # If no run_id is provided, generate one
     hostname = gethostname()
 
@@ -521,6 +732,10 @@ def main(
     # Write headers if overriding or file doesn't exist
     if not append or not results_csv.exists() or not mean_stddev_csv.exists():
         write_csv_headers(results_csv, mean_stddev_csv)
+    else:
+        # The files may have been written by a version with fewer columns
+        upgrade_csv_header(results_csv, list(csv_record().keys()))
+        upgrade_csv_header(mean_stddev_csv, MEAN_STDDEV_COLUMNS)
     # TODO put the benchmarks in a better place; for now storing in `runner/benchmarks/``
     benchmarks_folder = Path(__file__).parent / "benchmarks/"
     os.makedirs(benchmarks_folder, exist_ok=True)
@@ -535,32 +750,9 @@ def main(
             if size_categories is not None and instance["Size"] not in size_categories:
                 continue
 
-            # Determine the file path to use for the benchmark
-            if "Path" in instance:
-                benchmark_path = Path(instance["Path"])
-                if not benchmark_path.exists():
-                    raise FileNotFoundError(
-                        f"File specified in 'Path' does not exist: {benchmark_path}"
-                    )
-            elif "URL" in instance:
-                # TODO share this code with validate_urls.py
-                gz = instance["URL"].endswith(".gz")
-                base = instance["URL"][:-3] if gz else instance["URL"]
-                ext = base[base.rfind(".") :]
-                # If no dot was found, ext will be the full string; make it empty instead
-                if "." not in ext:
-                    ext = ""
-                ext += ".gz" if gz else ""
-                benchmark_path = (
-                    benchmarks_folder / f"{benchmark_name}-{instance['Name']}{ext}"
-                )
-                download_benchmark_file(instance["URL"], benchmark_path)
-
-                # Gzip files are unzipped by the above function, so update path accordingly
-                if benchmark_path.suffix == ".gz":
-                    benchmark_path = benchmark_path.with_suffix("")
-            else:
-                raise ValueError("No valid 'Path' or 'URL' found for benchmark entry.")
+            benchmark_path = get_benchmark_path(
+                benchmark_name, instance, benchmarks_folder, compress_at_rest
+            )
             processed_benchmarks.append(
                 {
                     "name": benchmark_name,
@@ -577,17 +769,44 @@ def main(
         + ("" if size_categories is None else f" matching {size_categories}")
     )
 
+    # Read times of each solver and file format, measured by format_cache.py
+    read_times = load_read_times() if use_fastest_format else {}
+
     reference_solver_version = ""
     if reference_interval > 0:
         reference_solver_version = get_highs_binary_version()
 
+    # Thread-scaling mode: run each solver with each number of threads
+    if thread_counts:
+        num_cpus = len(os.sched_getaffinity(0))
+        if any(t > num_cpus for t in thread_counts):
+            print(
+                f"WARNING: skipping thread counts above the {num_cpus} CPUs available"
+            )
+        thread_counts = [t for t in thread_counts if t <= num_cpus]
+        # Solvers whose threads can't be set would give flat, misleading curves
+        single_threaded = [s for s in solvers if base_solver(s) not in THREADS_OPTIONS]
+        if single_threaded:
+            print(
+                f"WARNING: skipping {single_threaded} in the thread-scaling campaign, "
+                "as their number of threads can't be set"
+            )
+            solvers = [s for s in solvers if s not in single_threaded]
+
     for benchmark in processed_benchmarks:
         # Set timeout from YAML if provided, otherwise use size-category defaults (1h for S/M, 24h for L)
         timeout = benchmark.get("timeout_seconds") or (
             24 * 60 * 60 if benchmark["size_category"] == "L" else 60 * 60
         )
 
-        for solver in solvers:
+        # Seed-variability campaigns repeat only MILPs, see seed_variability.py
+        seeds = [None]
+        if num_seeds and benchmark["class"] == "MILP":
+            seeds = range(num_seeds)
+
+        for solver, threads, seed in itertools.product(
+            solvers, thread_counts or [None], seeds
+        ):
             # TODO a hack to run only the latest version per solver on Ls
             if (
                 benchmark["size_category"] == "L"
@@ -601,14 +820,12 @@ def main(
                 )
                 continue
 
-            # Restrict highs-hipo variants to 2025 and LPs only
-            if solver in [
-                variant.value for variant in HighsVariant
-            ] and (  # For py3.10 compatibility
-                year != "2025" or benchmark["class"] != "LP"
-            ):
+            # Restrict variants to the problem classes and years in the registry
+            variant = get_variant(solver)
+            if variant is not None and not variant.allows(benchmark["class"], year):
                 print(
-                    f"Solver {solver} is only available for LP benchmarks and year 2025."
+                    f"Solver {solver} is only available for problem classes "
+                    f"{variant.problem_classes} and years {variant.years}."
                     f" Current year: {year}, problem class: {benchmark['class']}. Skipping."
                 )
                 continue
@@ -618,22 +835,54 @@ def main(
                 print(f"Solver {solver} is not available. Skipping.")
                 continue
 
+            input_path = benchmark["path"]
+            permutation = seed if permute and seed is not None else None
+            if permutation:
+                input_path = permuted_benchmark(input_path, permutation)
+            if use_fastest_format:
+                input_path = get_fastest_format_path(
+                    input_path, base_solver(solver), read_times
+                )
+
+            # Cache MILPs for the metrics of run_solver.py outside the timed runs
+            solver_args = []
+            if benchmark["class"] == "MILP":
+                try:
+                    solver_args = ["--model-key", ensure_cached(input_path)]
+                except Exception as e:
+                    print(f"WARNING: could not cache {input_path}: {e}")
+
             metrics = {}
             runtimes = []
             memory_usages = []
 
             for i in range(iterations):
                 print(
-                    f"Running solver {solver} (version {solver_version}) on {benchmark['path']} ({i})...",
+                    f"Running solver {solver} (version {solver_version}) on {input_path}"
+                    + ("" if threads is None else f" with {threads} threads")
+                    + ("" if seed is None else f" with seed {seed}")
+                    + f" ({i})...",
                     flush=True,
                 )
 
                 # Record timestamp before running the solver
                 timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
 
-                metrics = benchmark_solver(
-                    benchmark["path"], solver, timeout, solver_version
-                )
+                # Decompress or copy the model to a RAM disk just for this solve
+                with staged(input_path, staging_dir) as staged_path:
+                    metrics = benchmark_solver(
+                        staged_path,
+                        solver,
+                        timeout,
+                        solver_version,
+                        problem_class=benchmark["class"],
+                        solver_args=solver_args,
+                        output_tag=run_tag(threads, seed),
+                        threads=threads,
+                        seed=seed,
+                    )
+                metrics["input_format"] = model_format(staged_path)
+                metrics["permutation"] = permutation
 
                 metrics["size"] = benchmark["size"]
                 metrics["solver"] = solver
@@ -675,9 +924,16 @@ def main(
                 mean_stddev_csv, benchmark["name"], metrics, run_id, timestamp
             )
 
-            results[(benchmark["name"], benchmark["size"], solver, solver_version)] = (
-                metrics
-            )
+            results[
+                (
+                    benchmark["name"],
+                    benchmark["size"],
+                    solver,
+                    solver_version,
+                    threads,
+                    seed,
+                )
+            ] = metrics
 
             # Check if we should run the reference benchmark based on the interval
             if reference_interval > 0:
@@ -722,6 +978,9 @@ def main(
                         flush=True,
                     )
 
+    # Make primal integrals comparable across solvers, see milp_trajectory.py
+    recompute_primal_integrals(results_csv)
+
     return results
 
 
@@ -742,7 +1001,7 @@ if __name__ == "__main__":
         type=str,
         nargs="+",
         default=["highs", "scip", "cbc", "gurobi", "glpk"],
-        help="The list of solvers to run. Solvers not present in the active environment will be skipped. For 2025, highs variants are available: highs-hipo, highs-ipm, highs-hipo-32, highs-hipo-64, highs-hipo-128.",
+        help="The list of solvers to run. Solvers not present in the active environment will be skipped. Solver variants defined in solver_variants.yaml (e.g. highs-hipo, highs-ipm) can also be given.",
     )
     parser.add_argument(
         "--append",
@@ -761,7 +1020,53 @@ if __name__ == "__main__":
         default=None,
         help="Unique identifier for this benchmark run.",
     )
+    parser.add_argument(
+        "--fastest-format",
+        action="store_true",
+        help="Give each solver the file format it reads fastest, according to the "
+        "read times measured with format_cache.py.",
+    )
+    parser.add_argument(
+        "--compress-at-rest",
+        action="store_true",
+        help="Store downloaded benchmarks compressed (zstd if available, else gzip).",
+    )
+    parser.add_argument(
+        "--staging-dir",
+        type=Path,
+        default=None,
+        help="RAM disk (e.g. /dev/shm) to copy each benchmark to just before solving "
+        "it, if it fits.",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Run each solver once per given number of threads (e.g. 1 2 4 8), pinned "
+        "to as many CPUs. Default: the solver's default, unpinned.",
+    )
+    parser.add_argument(
+        "--seeds",
+        type=int,
+        default=None,
+        help="Run each MILP benchmark with this many random seeds (0, 1, ...), to "
+        "measure performance variability. See seed_variability.py.",
+    )
+    parser.add_argument(
+        "--permute",
+        action="store_true",
+        help="With --seeds, run seed k on the k-th random row/column permutation of "
+        "the model.",
+    )
     args = parser.parse_args()
+    if args.permute and not args.seeds:
+        parser.error("--permute requires --seeds")
+    if args.permute and highspy is None:
+        parser.error(
+            "--permute needs highspy to write permuted models, which is not "
+            "installed in this environment"
+        )
 
     main(
         args.benchmark_yaml_path,
@@ -770,6 +1075,12 @@ if __name__ == "__main__":
         reference_interval=args.ref_bench_interval,
         append=args.append,
         run_id=args.run_id,
+        use_fastest_format=args.fastest_format,
+        compress_at_rest=args.compress_at_rest,
+        staging_dir=args.staging_dir,
+        thread_counts=args.threads,
+        num_seeds=args.seeds,
+        permute=args.permute,
     )
     # Print a message indicating completion
     print("Benchmarking complete.")
@@ -0,0 +1,356 @@
+"""Benchmark model generation: framework build time, memory, and file write throughput.
+
+In practice, building a model with a modelling framework and writing it to an LP/MPS
+file can take as long as solving it. This script measures, for linopy's synthetic
+benchmark model at several sizes and for the PyPSA scripts in
+`benchmarks/plain_pypsa/`:
+
+- the time to build the model in memory,
+- the time to write it to each file format, and the resulting file size,
+- the peak resident memory during the build and during each write.
+
+Each measurement runs in a fresh subprocess (this script invoked with `--worker`), so
+that peak memory and import overheads of one measurement don't affect the next.
+Results are appended to `results/model_generation_results.csv`:
+
+    python run_generation_benchmarks.py --linopy-sizes 10 100 500 --formats lp mps
+    python run_generation_benchmarks.py --linopy-sizes --pypsa-scripts all
+
+The PyPSA scripts download their input data and need PyPSA installed, e.g. in the
+environment of `benchmarks/plain_pypsa/Dockerfile`.
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import runpy
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from socket import gethostname
+from time import perf_counter
+from traceback import format_exc
+
+import psutil
+
+GENERATION_RESULTS_CSV = (
+    Path(__file__).parent.parent / "results" / "model_generation_results.csv"
+)
+
+PLAIN_PYPSA_DIR = Path(__file__).parent.parent / "benchmarks" / "plain_pypsa"
+
+DEFAULT_LINOPY_SIZES = [10, 50, 100, 250, 500]
+
+# Formats supported by linopy's Model.to_file
+FORMATS = ["lp", "mps"]
+
+
+class PeakMemory:
+    """Context manager that samples the resident memory of this process in a
+    background thread and records its peak (in MB)."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak_mb = None
+        self._stop = threading.Event()
+
+    def _sample(self):
+        peak = self.process.memory_info().rss
+        while not self._stop.wait(self.interval):
+            peak = max(peak, self.process.memory_info().rss)
+        self.peak_mb = max(peak, self.process.memory_info().rss) / (1024 * 1024)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+class _NetworkCaptured(Exception):
+    def __init__(self, network):
+        self.network = network
+
+
+def build_pypsa_network(script: Path):
+    """Run a plain PyPSA benchmark script up to the point where it optimizes the
+    network, and return the network instead of building the model."""
+    from pypsa.optimization.optimize import OptimizationAccessor
+
+    def capture(accessor, *args, **kwargs):
+        raise _NetworkCaptured(getattr(accessor, "n", None) or accessor._n)
+
+    OptimizationAccessor.__call__ = capture
+    try:
+        runpy.run_path(str(script), run_name="__main__")
+    except _NetworkCaptured as captured:
+        return captured.network
+    raise RuntimeError(f"{script.name} did not optimize a network")
+
+
+def measure_generation(kind: str, target: str, formats: list[str]) -> dict:
+    """Build one model and write it to each of `formats`, measuring time and memory.
+
+    `kind` is "linopy" (with `target` the size of the synthetic benchmark model) or
+    "pypsa" (with `target` the path to a plain PyPSA script).
+    """
+    metrics = {"network_time": None, "writes": {}}
+    if kind == "linopy":
+        import linopy
+        from linopy import examples
+
+        metrics["framework_version"] = f"linopy {linopy.__version__}"
+        # Build a tiny model first, so that lazily imported modules aren't timed
+        examples.benchmark_model(2)
+        with PeakMemory() as memory:
+            start = perf_counter()
+            model = examples.benchmark_model(int(target))
+            metrics["build_time"] = perf_counter() - start
+    elif kind == "pypsa":
+        import pypsa
+
+        metrics["framework_version"] = f"pypsa {pypsa.__version__}"
+        with PeakMemory() as memory:
+            # Includes downloading and preparing the input data of the script
+            start = perf_counter()
+            network = build_pypsa_network(Path(target))
+            metrics["network_time"] = perf_counter() - start
+            start = perf_counter()
+            model = network.optimize.create_model()
+            metrics["build_time"] = perf_counter() - start
+    else:
+        raise ValueError(f"Unknown model generator: {kind}")
+    metrics["build_memory"] = memory.peak_mb
+    metrics["num_variables"] = int(model.nvars)
+    metrics["num_constraints"] = int(model.ncons)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for fmt in formats:
+            path = Path(tmp_dir) / f"model.{fmt}"
+            with PeakMemory() as memory:
+                start = perf_counter()
+                model.to_file(path)
+                write_time = perf_counter() - start
+            metrics["writes"][fmt] = {
+                "write_time": write_time,
+                "file_size": path.stat().st_size / (1024 * 1024),
+                "write_memory": memory.peak_mb,
+            }
+            path.unlink()
+    return metrics
+
+
+def run_worker(kind: str, target: str, formats: list[str], timeout: float) -> dict:
+    """Run `measure_generation` in a fresh Python process."""
+    command = [
+        sys.executable,
+        __file__,
+        "--worker",
+        kind,
+        target,
+        "--formats",
+        *formats,
+    ]
+    try:
+        result = subprocess.run(
+            command,
+            capture_output=True,
+            text=True,
+            check=False,
+            encoding="utf-8",
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        print("TIMEOUT")
+        return {"status": "TO"}
+    if result.returncode != 0:
+        print(
+            f"ERROR generating model. Return code: {result.returncode}\n",
+            f"Stdout:\n{result.stdout}\n",
+            f"Stderr:\n{result.stderr}\n",
+        )
+        return {"status": "ER"}
+    metrics = json.loads(result.stdout.splitlines()[-1])
+    metrics["status"] = "ok"
+    return metrics
+
+
+def generation_records(**kwargs):
+    """One record per file format of a measurement."""
+    metrics = kwargs.get("metrics", {})
+    writes = metrics.get("writes") or {fmt: {} for fmt in kwargs.get("formats", [])}
+    for fmt, write in writes.items():
+        write_time, file_size = write.get("write_time"), write.get("file_size")
+        yield OrderedDict(
+            [
+                ("Generator", kwargs.get("kind")),
+                ("Model", kwargs.get("model")),
+                ("Size", kwargs.get("size")),
+                ("Framework Version", metrics.get("framework_version")),
+                ("Status", metrics.get("status")),
+                ("Num Variables", metrics.get("num_variables")),
+                ("Num Constraints", metrics.get("num_constraints")),
+                ("Network Time (s)", metrics.get("network_time")),
+                ("Build Time (s)", metrics.get("build_time")),
+                ("Build Peak Memory (MB)", metrics.get("build_memory")),
+                ("Format", fmt),
+                ("Write Time (s)", write_time),
+                ("File Size (MB)", file_size),
+                (
+                    "Write Throughput (MB/s)",
+                    file_size / write_time if write_time else None,
+                ),
+                ("Write Peak Memory (MB)", write.get("write_memory")),
+                ("Iteration", kwargs.get("iteration")),
+                ("Hostname", kwargs.get("hostname")),
+                ("Run ID", kwargs.get("run_id")),
+                ("Timestamp", kwargs.get("timestamp")),
+            ]
+        )
+
+
+def write_generation_rows(results_csv: Path, records):
+    results_csv.parent.mkdir(parents=True, exist_ok=True)
+    new_file = not results_csv.exists()
+    with open(results_csv, "a", newline="") as f:
+        writer = csv.writer(f)
+        for record in records:
+            if new_file:
+                writer.writerow(record.keys())
+                new_file = False
+            writer.writerow(record.values())
+
+
+def main(
+    linopy_sizes,
+    pypsa_scripts,
+    formats,
+    iterations=1,
+    timeout=60 * 60,
+    results_csv=GENERATION_RESULTS_CSV,
+    run_id=None,
+):
+    hostname = gethostname()
+    run_id = run_id or f"{time.strftime('%Y%m%d_%H%M%S')}_{hostname}_generation"
+
+    targets = [("linopy", str(size), "benchmark_model", size) for size in linopy_sizes]
+    for script in pypsa_scripts:
+        # Script names are <model>-<size>.py, e.g. pypsa-power+ely-1-1h.py
+        model, _, size = Path(script).stem.partition("-1-")
+        targets.append(("pypsa", str(script), model, f"1-{size}" if size else ""))
+
+    for kind, target, model, size in targets:
+        for i in range(iterations):
+            print(f"Generating {kind} model {model} {size} ({i})...", flush=True)
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+            metrics = run_worker(kind, target, formats, timeout)
+            write_generation_rows(
+                results_csv,
+                generation_records(
+                    kind=kind,
+                    model=model,
+                    size=size,
+                    metrics=metrics,
+                    formats=formats,
+                    iteration=i,
+                    hostname=hostname,
+                    run_id=run_id,
+                    timestamp=timestamp,
+                ),
+            )
+            if metrics["status"] != "ok":
+                break
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark model build time, memory, and LP/MPS write throughput."
+    )
+    parser.add_argument(
+        "--linopy-sizes",
+        type=int,
+        nargs="*",
+        default=DEFAULT_LINOPY_SIZES,
+        help="Sizes of linopy's synthetic benchmark model. Pass no value to skip.",
+    )
+    parser.add_argument(
+        "--pypsa-scripts",
+        type=str,
+        nargs="*",
+        default=[],
+        help="Plain PyPSA benchmark scripts to measure, or 'all' for every script "
+        "in benchmarks/plain_pypsa/.",
+    )
+    parser.add_argument(
+        "--formats",
+        type=str,
+        nargs="+",
+        choices=FORMATS,
+        default=FORMATS,
+        help="File formats to write the models to.",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=1,
+        help="Number of measurements per model.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=60 * 60,
+        help="Timeout of each measurement in seconds.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=GENERATION_RESULTS_CSV,
+        help="Results CSV file to append to.",
+    )
+    parser.add_argument(
+        "--run_id", type=str, default=None, help="Unique identifier for this run."
+    )
+    parser.add_argument(
+        "--worker",
+        type=str,
+        nargs=2,
+        metavar=("KIND", "TARGET"),
+        help=argparse.SUPPRESS,
+    )
+    args = parser.parse_args()
+
+    if args.worker:
+        try:
+            metrics = measure_generation(*args.worker, args.formats)
+        except Exception:
+            print(f"ERROR generating model: {format_exc()}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(metrics))
+        sys.exit(0)
+
+    pypsa_scripts = args.pypsa_scripts
+    if pypsa_scripts == ["all"]:
+        pypsa_scripts = sorted(PLAIN_PYPSA_DIR.glob("*.py"))
+    for script in pypsa_scripts:
+        if not os.path.exists(script):
+            parser.error(f"PyPSA script {script} not found")
+
+    main(
+        args.linopy_sizes,
+        pypsa_scripts,
+        args.formats,
+        iterations=args.iterations,
+        timeout=args.timeout,
+        results_csv=args.output,
+        run_id=args.run_id,
+    )
@@ -1,88 +1,70 @@
-import collections.abc
+import argparse
+import importlib
 import json
 import os
 import subprocess
 import sys
 import time
-from enum import Enum
+from contextlib import contextmanager
+from functools import wraps
 from pathlib import Path
 from time import perf_counter
 from traceback import format_exc
 
+import numpy as np
 import pandas as pd
+import psutil
 from linopy import solvers
 from linopy.solvers import SolverName
-
-
-class HighsVariant(str, Enum):
-    HIPO = "highs-hipo"
-    HIPO_32 = "highs-hipo-32"
-    HIPO_64 = "highs-hipo-64"
-    HIPO_128 = "highs-hipo-128"
-    HIPO_IPM = "highs-ipm"
-
-    # cli args returns a list of command line arguments for the HiGHS binary.
-    def cli_args(self) -> collections.abc.Iterable[str]:
-        args = {
-            "solver": "hipo",
-            "run_crossover": "choose",
-        }
-        if self == HighsVariant.HIPO_IPM:
-            args["solver"] = "ipx"
-
-        return [f"--{k}={v}" for k, v in args.items()]
-
-    # options returns the contents for the HiGHS options file.
-    # passed to the HiGHS binary via --options_file=<file>
-    def options(self) -> str:
-        options = {}
-        match self:
-            case HighsVariant.HIPO_32:
-                options["hipo_block_size"] = 32
-            case HighsVariant.HIPO_64:
-                options["hipo_block_size"] = 64
-            case HighsVariant.HIPO_128:
-                options["hipo_block_size"] = 128
-            case HighsVariant.HIPO:
-                options["hipo_block_size"] = 64
-                options["hipo_metis_no2hop"] = "true"
-        return "\n".join(f"{k} = {v}" for k, v in options.items())
-
-
-# HiGHS is not available in the 2020 environment that we use to run GLPK
-try:
-    import highspy
-except ModuleNotFoundError:
-    highspy = None
-
-
-def get_solver(solver_name):
+from optional_imports import highspy
+from solver_variants import (
+    THREADS_OPTIONS,
+    SolverVariant,
+    get_variant,
+    solver_options,
+)
+
+# Time at which the imports above are done, to measure the startup time of this script
+IMPORTS_DONE = time.time()
+
+
+# Name of the option that sets the random seed of each solver
+SEED_OPTIONS = {
+    "highs": "random_seed",
+    "glpk": "seed",
+    "gurobi": "seed",
+    "scip": "randomization/randomseedshift",
+    "cbc": "randomCbcSeed",
+    "cplex": "randomseed",
+    "knitro": "KN_PARAM_MS_SEED",
+    "xpress": "randomseed",
+}
+
+
+def get_solver(solver_name, threads=None, options=None, seed=None):
+    """The linopy solver with the options of `solver_name` in the solver variant
+    registry (see solver_variants.yaml), overridden by `options`. A `seed` is added
+    to the registry's seed, so that seed 0 gives the default options."""
     solver_name = solver_name.lower()
     solver_enum = SolverName(solver_name)
 
     solver_class = getattr(solvers, solver_enum.name)
 
-    mip_gap = 1e-4  # Tolerance for the relative duality gap for MILPs
-    seed_options = {
-        "highs": {"random_seed": 0, "mip_rel_gap": mip_gap},
-        "glpk": {"seed": 0, "mipgap": mip_gap},
-        "gurobi": {"seed": 0, "MIPGap": mip_gap},
-        "scip": {"randomization/randomseedshift": 0, "limits/gap": mip_gap},
-        "cbc": {
-            "randomCbcSeed": 1,  # 0 indicates time of day
-            "ratioGap": mip_gap,
-        },
-        "cplex": {
-            "randomseed": 0,
-            "mip.tolerances.mipgap": mip_gap,
-        },
-        "knitro": {
-            "KN_PARAM_MS_SEED": 1066,
-        },
-        "xpress": {"miprelgapnotify": mip_gap, "randomseed": 0},
-    }
+    options = {**solver_options(solver_name), **(options or {})}
+    if threads is not None:
+        if solver_name not in THREADS_OPTIONS:
+            # e.g. GLPK, which is single-threaded, see THREADS_OPTIONS
+            print(f"WARNING: cannot set the number of threads of {solver_name}")
+        else:
+            options[THREADS_OPTIONS[solver_name]] = threads
+    if seed is not None:
+        if solver_name not in SEED_OPTIONS:
+            print(f"WARNING: cannot set the random seed of {solver_name}")
+        else:
+            seed_option = SEED_OPTIONS[solver_name]
+            options[seed_option] = options.get(seed_option, 0) + seed
 
-    return solver_class(**seed_options.get(solver_name, {}))
+    return solver_class(**options)
 
 
 def is_mip_problem(solver_model, solver_name):
@@ -153,25 +135,40 @@ def get_duality_gap(solver_model, solver_name: str):
         raise NotImplementedError(f"The solver '{solver_name}' is not supported.")
 
 
-def get_milp_metrics(input_file, solver_result):
-    """Uses HiGHS to read the problem file and compute max integrality violation and
-    duality gap.
+def get_milp_metrics(input_file, solver_result, solver_name, model_key=None):
+    """Compute max integrality violation and duality gap. The integer variables are
+    read from the entry of the model cache with key `model_key`, which
+    run_benchmarks.py creates before the solve, or else from the problem file with
+    HiGHS.
     """
     try:
-        if highspy is not None:
+        integer_vars = None
+        if model_key is not None:
+            # Only read an existing entry: hashing or caching the model here would
+            # add to the time and memory measured for this process
+            from model_cache import INTEGER, cached_model
+
+            model = cached_model(model_key)
+            if model is not None:
+                integer_vars = [
+                    model.col_names[i]
+                    for i in np.flatnonzero(model.integrality == INTEGER)
+                ]
+        if integer_vars is None and highspy is not None:
             h = highspy.Highs()
-            h.readModel(input_file)
-            integer_vars = {
+            h.silent()
+            h.readModel(str(input_file))
+            integer_vars = [
                 h.variableName(i)
                 for i in range(h.numVariables)
                 if h.getColIntegrality(i)[1] == highspy.HighsVarType.kInteger
-            }
-            if integer_vars:
-                duality_gap = get_duality_gap(solver_result.solver_model, solver_name)
-                max_integrality_violation = calculate_integrality_violation(
-                    integer_vars, solver_result.solution.primal
-                )
-                return duality_gap, max_integrality_violation
+            ]
+        if integer_vars:
+            duality_gap = get_duality_gap(solver_result.solver_model, solver_name)
+            max_integrality_violation = calculate_integrality_violation(
+                integer_vars, solver_result.solution.primal
+            )
+            return duality_gap, max_integrality_violation
     except Exception:
         print(
             f"ERROR obtaining milp metrics for {input_file}: {format_exc()}",
@@ -206,7 +203,91 @@ def get_reported_runtime(solver_name, solver_model) -> float | None:
     return None
 
 
-def run_highs_hipo_solver(input_file, solver_version, highs_variant: HighsVariant):
+# Functions of the Python API of each solver that read the model file, and that solve
+# it, as (module, class or None, function names). They are timed to attribute the time
+# spent in linopy's solve_problem. Solvers that linopy runs as executables (GLPK, CBC)
+# have none, and methods of some extension types (e.g. gurobipy.Model) can't be timed.
+PHASE_HOOKS = {
+    "highs": {
+        "read": ("highspy", "Highs", ["readModel"]),
+        "solve": ("highspy", "Highs", ["run"]),
+    },
+    "gurobi": {
+        "read": ("gurobipy", None, ["read"]),
+        "solve": ("gurobipy", "Model", ["optimize"]),
+    },
+    "scip": {
+        "read": ("pyscipopt", "Model", ["readProblem"]),
+        "solve": ("pyscipopt", "Model", ["optimize"]),
+    },
+    "cplex": {
+        "read": ("cplex", "Cplex", ["read"]),
+        "solve": ("cplex", "Cplex", ["solve"]),
+    },
+    "xpress": {
+        "read": ("xpress", "problem", ["read"]),
+        "solve": ("xpress", "problem", ["optimize", "solve"]),
+    },
+}
+
+
+def _timed(function, phase, timestamps):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        # Record the first read (of the model, not of a warm start) and the last solve
+        record = phase != "read" or f"{phase}_start" not in timestamps
+        start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if record:
+                timestamps[f"{phase}_start"] = start
+                timestamps[f"{phase}_end"] = time.time()
+
+    return wrapper
+
+
+@contextmanager
+def timed_phases(solver_name, timestamps: dict):
+    """Context manager that records in `timestamps` the start and end times of the
+    model read and solve calls in the Python API of `solver_name`."""
+    patched = []
+    for phase, (module_name, class_name, functions) in PHASE_HOOKS.get(
+        solver_name, {}
+    ).items():
+        for function in functions:
+            try:
+                owner = importlib.import_module(module_name)
+                if class_name is not None:
+                    owner = getattr(owner, class_name)
+                original = getattr(owner, function)
+                setattr(owner, function, _timed(original, phase, timestamps))
+                patched.append((owner, function, original))
+            except (ImportError, AttributeError, TypeError):
+                continue
+    try:
+        yield
+    finally:
+        for owner, function, original in patched:
+            setattr(owner, function, original)
+
+
+def process_timestamps() -> dict:
+    """Start time of this process and time at which its imports were done."""
+    return {
+        "process_start": psutil.Process().create_time(),
+        "imports_done": IMPORTS_DONE,
+    }
+
+
+def run_highs_hipo_solver(
+    input_file,
+    solver_version,
+    variant: SolverVariant,
+    threads=None,
+    seed=None,
+    output_tag=None,
+):
     """
     Run the HiGHS-HiPO solver directly using the binary with variant-specific arguments
     """
@@ -225,22 +306,24 @@ def run_highs_hipo_solver(input_file, solver_version, highs_variant: HighsVarian
     logs_dir = Path(__file__).parent / "logs"
     logs_dir.mkdir(parents=True, exist_ok=True)
 
-    output_filename = f"{Path(input_file).stem}-{solver_name}-{solver_version}"
+    output_filename = f"{Path(input_file).stem}-{variant.name}-{solver_version}"
+    if output_tag:
+        output_filename += f"-{output_tag}"
     solution_fn = solution_dir / f"{output_filename}.sol"
     log_fn = logs_dir / f"{output_filename}.log"
 
     try:
         with tempfile.NamedTemporaryFile(
             mode="w",
-            prefix=highs_variant.value,
+            prefix=variant.name,
             suffix=".options",
             delete=False,
             delete_on_close=False,
         ) as options_file:
-            options_file.write(highs_variant.options())
+            options_file.write(variant.options_file(threads, seed))
             options_file.flush()
 
-            solver_args = list(highs_variant.cli_args())
+            solver_args = variant.command_line_args()
             solver_args.append(f"--options_file={options_file.name}")
 
         command = [
@@ -366,22 +449,37 @@ def run_highs_hipo_solver(input_file, solver_version, highs_variant: HighsVarian
         #         pass
 
 
-def main(solver_name, input_file, solver_version):
+def main(
+    solver_name,
+    input_file,
+    solver_version,
+    warmstart_fn=None,
+    basis_fn=None,
+    output_tag=None,
+    threads=None,
+    seed=None,
+    model_key=None,
+):
     problem_file = Path(input_file)
+    timestamps = process_timestamps()
 
-    # Handle highs-hipo solver variants separately
-    try:
-        highs_variant = HighsVariant(solver_name.lower())
-        results = run_highs_hipo_solver(input_file, solver_version, highs_variant)
+    # Variants that run the HiGHS binary are handled separately
+    variant = get_variant(solver_name)
+    if variant is not None and variant.interface == "binary":
+        results = run_highs_hipo_solver(
+            input_file, solver_version, variant, threads, seed, output_tag
+        )
+        results["timestamps"] = {**timestamps, "exit": time.time()}
         print(json.dumps(results))
         return
-    except ValueError as e:
-        # re-raise the error if it isn't expected.
-        # we want to continue only if the error is about invalid HighsVariant
-        if "is not a valid HighsVariant" not in str(e):
-            raise e
 
-    solver = get_solver(solver_name)
+    base_solver_name = variant.solver if variant is not None else solver_name.lower()
+    solver = get_solver(
+        base_solver_name,
+        threads,
+        variant.options if variant is not None else None,
+        seed,
+    )
 
     solution_dir = Path(__file__).parent / "solutions"
     solution_dir.mkdir(parents=True, exist_ok=True)
@@ -390,6 +488,8 @@ def main(solver_name, input_file, solver_version):
     logs_dir.mkdir(parents=True, exist_ok=True)
 
     output_filename = f"{Path(input_file).stem}-{solver_name}-{solver_version}"
+    if output_tag:
+        output_filename += f"-{output_tag}"
 
     solution_fn = solution_dir / f"{output_filename}.sol"
     log_fn = logs_dir / f"{output_filename}.log"
@@ -397,20 +497,27 @@ def main(solver_name, input_file, solver_version):
     try:
         # We measure runtime here and not of this entire script because lines like
         # `import linopy` take a long (and varying) amount of time
+        timestamps["solve_problem_start"] = time.time()
         start_time = perf_counter()
-        solver_result = solver.solve_problem(
-            problem_fn=problem_file, solution_fn=solution_fn, log_fn=log_fn
-        )
+        with timed_phases(base_solver_name, timestamps):
+            solver_result = solver.solve_problem(
+                problem_fn=problem_file,
+                solution_fn=solution_fn,
+                log_fn=log_fn,
+                warmstart_fn=Path(warmstart_fn) if warmstart_fn else None,
+                basis_fn=Path(basis_fn) if basis_fn else None,
+            )
         runtime = perf_counter() - start_time
+        timestamps["solve_problem_end"] = time.time()
 
         duality_gap, max_integrality_violation = get_milp_metrics(
-            input_file, solver_result
+            input_file, solver_result, base_solver_name, model_key
         )
 
         results = {
             "runtime": runtime,
             "reported_runtime": get_reported_runtime(
-                solver_name, solver_result.solver_model
+                base_solver_name, solver_result.solver_model
             ),
             "status": solver_result.status.status.value,
             "condition": solver_result.status.termination_condition.value,
@@ -429,15 +536,66 @@ def main(solver_name, input_file, solver_version):
             "duality_gap": None,
             "max_integrality_violation": None,
         }
+    results["timestamps"] = {**timestamps, "exit": time.time()}
     print(json.dumps(results))
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 4:
-        print("Usage: python run_solver.py <solver_name> <input_file> <solver_version>")
-        sys.exit(1)
-
-    solver_name = sys.argv[1]
-    input_file = sys.argv[2]
-    solver_version = sys.argv[3]
-    main(solver_name, input_file, solver_version)
+    parser = argparse.ArgumentParser(
+        description="Solve a benchmark instance and print metrics as JSON."
+    )
+    parser.add_argument("solver_name", type=str, help="Name of the solver to run.")
+    parser.add_argument("input_file", type=str, help="Path to the LP/MPS file.")
+    parser.add_argument("solver_version", type=str, help="Version of the solver.")
+    parser.add_argument(
+        "--warmstart",
+        type=str,
+        default=None,
+        help="Basis or solution file to warm start the solver from.",
+    )
+    parser.add_argument(
+        "--basis-out",
+        type=str,
+        default=None,
+        help="File to write the final basis to, if the solver provides one.",
+    )
+    parser.add_argument(
+        "--output-tag",
+        type=str,
+        default=None,
+        help="Suffix for the names of the solution and log files.",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="Number of threads the solver may use. Default: the solver's default.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Offset added to the solver's random seed. Default: the seed in "
+        "solver_variants.yaml.",
+    )
+    parser.add_argument(
+        "--model-key",
+        type=str,
+        default=None,
+        help="Key of the model in the model cache (see model_cache.py), for the "
+        "MILP metrics. Default: read the problem file.",
+    )
+    args = parser.parse_args()
+
+    solver_name = args.solver_name
+    main(
+        solver_name,
+        args.input_file,
+        args.solver_version,
+        warmstart_fn=args.warmstart,
+        basis_fn=args.basis_out,
+        output_tag=args.output_tag,
+        threads=args.threads,
+        seed=args.seed,
+        model_key=args.model_key,
+    )
@@ -0,0 +1,265 @@
+"""Measure and report the performance variability of MILP solvers across seeds.
+
+The runtime of a MILP solver can change by 2-10x with its random seed or with the
+order of the rows and columns of the model, so a single run per instance cannot tell
+a genuine regression between solver versions from seed luck. `run_benchmarks.py
+--seeds N` repeats every MILP benchmark with N seeds (`Seed` column), and with
+`--permute` also runs seed k on the k-th random row/column permutation of the model
+(`Permutation` column, 0 being the original model). Seed k offsets the seed options
+of solver_variants.yaml by k, so seed 0 reproduces the results of fixed-seed runs.
+
+This script summarizes such runs per instance and solver version, and compares
+consecutive versions of each solver:
+
+    python seed_variability.py --results ../results/benchmark_results.csv
+
+The per-instance statistics are written to `results/seed_variability.csv` and the
+comparisons to `results/seed_version_comparison.csv`. A difference between versions
+is considered significant if a two-sided Mann-Whitney U test on their runtimes over
+the seeds rejects equal distributions at level `ALPHA`. The test needs at least
+`MIN_SEEDS` seeds per version, as fewer seeds leave it too little power. Looser
+rules are unreliable: non-overlapping ranges over 2 seeds per version flag a third
+of the comparisons of identical versions.
+
+Permuted models are written by HiGHS to `runner/permuted_models/`.
+"""
+
+import argparse
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from format_cache import FORMATS, SOLVE_FORMATS, model_format, model_stem
+from instance_store import staged, uncompressed_name
+from model_cache import cache_key, load_model
+from optional_imports import highspy
+
+RESULTS_DIR = Path(__file__).parent.parent / "results"
+
+PERMUTED_DIR = Path(__file__).parent / "permuted_models"
+
+KEYS = ["Benchmark", "Size", "Solver", "Solver Version"]
+
+# Significance level and minimum number of seeds per version of the comparisons
+ALPHA = 0.05
+MIN_SEEDS = 5
+
+
+def permuted_path(
+    model_file: Path, permutation: int, key: str, output_dir: Path = PERMUTED_DIR
+) -> Path:
+    """Path of the permuted copy of `model_file`, whose content hash is `key`."""
+    fmt = model_format(uncompressed_name(model_file)) or "mps"
+    extension = FORMATS[fmt if fmt in SOLVE_FORMATS else fmt.removesuffix(".gz")]
+    return (
+        output_dir / key / f"perm{permutation}" / f"{model_stem(model_file)}{extension}"
+    )
+
+
+def permuted_model(
+    model_file: Path,
+    permutation: int,
+    output_dir: Path = PERMUTED_DIR,
+    key: str | None = None,
+) -> Path:
+    """Return a copy of `model_file` with rows and columns shuffled by a random
+    permutation seeded with `permutation` (0 returns the model itself).
+
+    The copy keeps the stem of the original file, so that solution and log files of
+    solves on it are named as for the original, and is reused if it already exists.
+    Pass the `key` of the model if it is known, e.g. for temporary copies of a model.
+    """
+    model_file = Path(model_file)
+    if permutation == 0:
+        return model_file
+    if highspy is None:
+        raise ModuleNotFoundError("highspy is required to permute model files")
+
+    key = key or cache_key(model_file, output_dir)
+    target = permuted_path(model_file, permutation, key, output_dir)
+    entry_dir = target.parent
+    if target.exists():
+        return target
+
+    model = load_model(model_file, key=key)
+    rng = np.random.default_rng(permutation)
+    rows = rng.permutation(model.num_row)
+    cols = rng.permutation(model.num_col)
+    matrix = model.matrix[rows][:, cols].tocsc()
+
+    lp = highspy.HighsLp()
+    lp.num_col_ = model.num_col
+    lp.num_row_ = model.num_row
+    lp.col_cost_ = model.col_cost[cols]
+    lp.col_lower_ = model.col_lower[cols]
+    lp.col_upper_ = model.col_upper[cols]
+    lp.row_lower_ = model.row_lower[rows]
+    lp.row_upper_ = model.row_upper[rows]
+    lp.offset_ = model.offset
+    lp.sense_ = highspy.ObjSense(model.sense)
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    lp.a_matrix_.num_col_ = model.num_col
+    lp.a_matrix_.num_row_ = model.num_row
+    lp.a_matrix_.start_ = matrix.indptr
+    lp.a_matrix_.index_ = matrix.indices
+    lp.a_matrix_.value_ = matrix.data
+    if model.is_mip:
+        lp.integrality_ = [
+            highspy.HighsVarType(int(t)) for t in model.integrality[cols]
+        ]
+    col_names, row_names = model.col_names, model.row_names
+    lp.col_names_ = [col_names[i] for i in cols]
+    lp.row_names_ = [row_names[i] for i in rows]
+
+    h = highspy.Highs()
+    h.silent()
+    h.passModel(lp)
+    entry_dir.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first, so that concurrent processes never see a
+    # partially written file
+    with tempfile.TemporaryDirectory(dir=entry_dir) as tmp_dir:
+        tmp = Path(tmp_dir) / target.name
+        h.writeModel(str(tmp))
+        os.replace(tmp, target)
+    return target
+
+
+def permuted_benchmark(model_file: Path, permutation: int) -> Path:
+    """`permuted_model` for benchmarks that may be stored compressed at rest. The
+    permuted copy is looked up by the key of the stored file, so that the model is
+    only decompressed to create it."""
+    if permutation == 0:
+        return Path(model_file)
+    key = cache_key(model_file, PERMUTED_DIR)
+    target = permuted_path(model_file, permutation, key)
+    if target.exists():
+        return target
+    with staged(model_file, staging_dir=None) as path:
+        return permuted_model(path, permutation, key=key)
+
+
+def seed_runtimes(results: pd.DataFrame) -> pd.DataFrame:
+    """Runs of seed-variability campaigns, with unsolved runs counted as taking the
+    timeout, so that seeds that fail to solve an instance are penalized."""
+    df = results[results["Seed"].notna()].copy()
+    df["Runtime (s)"] = pd.to_numeric(df["Runtime (s)"], errors="coerce")
+    df["Timeout"] = pd.to_numeric(df["Timeout"], errors="coerce")
+    df["Solved"] = df["Status"] == "ok"
+    df["Runtime (s)"] = df["Runtime (s)"].where(df["Solved"], df["Timeout"])
+    return df
+
+
+def variability_table(results: pd.DataFrame) -> pd.DataFrame:
+    """Statistics of the runtime and objective value over the seeds of each
+    instance and solver version."""
+    df = seed_runtimes(results)
+    df["Objective Value"] = pd.to_numeric(df["Objective Value"], errors="coerce")
+    grouped = df.groupby(KEYS)
+    table = grouped.agg(
+        **{
+            "Seeds": ("Seed", "nunique"),
+            "Solved": ("Solved", "sum"),
+            "Runtime Min (s)": ("Runtime (s)", "min"),
+            "Runtime Median (s)": ("Runtime (s)", "median"),
+            "Runtime Max (s)": ("Runtime (s)", "max"),
+            "Runtime Mean (s)": ("Runtime (s)", "mean"),
+            "Runtime StdDev (s)": ("Runtime (s)", "std"),
+            "Objective Min": ("Objective Value", "min"),
+            "Objective Max": ("Objective Value", "max"),
+        }
+    ).reset_index()
+    table["Runtime CV"] = table["Runtime StdDev (s)"] / table["Runtime Mean (s)"]
+    table["Runtime Max/Min"] = table["Runtime Max (s)"] / table["Runtime Min (s)"]
+    return table
+
+
+def p_value(runtimes_a, runtimes_b) -> float:
+    """P-value of a two-sided Mann-Whitney U test that two sets of runtimes over
+    seeds come from the same distribution, or NaN with fewer than `MIN_SEEDS` seeds
+    on either side."""
+    # SciPy is available in the analysis environment but not the solver ones, which
+    # import this module for `permuted_benchmark`
+    from scipy.stats import mannwhitneyu
+
+    if min(len(runtimes_a), len(runtimes_b)) < MIN_SEEDS:
+        return np.nan
+    return float(mannwhitneyu(runtimes_a, runtimes_b, alternative="two-sided").pvalue)
+
+
+def is_significant(runtimes_a, runtimes_b, alpha: float = ALPHA) -> bool:
+    """Whether two sets of runtimes over seeds differ beyond seed variability."""
+    return bool(p_value(runtimes_a, runtimes_b) < alpha)
+
+
+def version_comparison(results: pd.DataFrame) -> pd.DataFrame:
+    """Compare each solver version to the previous version (by release year) on
+    every instance that both were run on with several seeds."""
+    df = seed_runtimes(results)
+    runtimes = df.groupby(KEYS + ["Solver Release Year"])["Runtime (s)"].apply(list)
+    rows = []
+    for (benchmark, size, solver), group in runtimes.groupby(
+        ["Benchmark", "Size", "Solver"]
+    ):
+        group = group.sort_index(level="Solver Release Year")
+        for (previous_key, previous), (key, current) in zip(
+            group.items(), list(group.items())[1:]
+        ):
+            rows.append(
+                {
+                    "Benchmark": benchmark,
+                    "Size": size,
+                    "Solver": solver,
+                    "Previous Version": previous_key[3],
+                    "Version": key[3],
+                    "Seeds": min(len(previous), len(current)),
+                    "Speedup (median)": np.median(previous) / np.median(current),
+                    "P-value": p_value(previous, current),
+                    "Significant": is_significant(previous, current),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def main(results_csv: Path, output_dir: Path):
+    results = pd.read_csv(results_csv)
+    if "Seed" not in results.columns or results["Seed"].isna().all():
+        raise ValueError(
+            f"No seed-variability results in {results_csv}. "
+            "Run run_benchmarks.py with --seeds first."
+        )
+    table = variability_table(results)
+    comparison = version_comparison(results)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    table.to_csv(output_dir / "seed_variability.csv", index=False)
+    comparison.to_csv(output_dir / "seed_version_comparison.csv", index=False)
+    with pd.option_context("display.width", 120, "display.max_rows", None):
+        print(
+            table[KEYS + ["Seeds", "Solved", "Runtime Median (s)", "Runtime Max/Min"]]
+            .round(2)
+            .to_string(index=False)
+        )
+        if len(comparison):
+            print(comparison.round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report the variability of solver runtimes across seeds."
+    )
+    parser.add_argument(
+        "--results",
+        type=Path,
+        default=RESULTS_DIR / "benchmark_results.csv",
+        help="Results CSV of a seed-variability campaign.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=RESULTS_DIR,
+        help="Directory to write the variability tables to.",
+    )
+    args = parser.parse_args()
+    main(args.results, args.output_dir)
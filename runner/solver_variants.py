@@ -0,0 +1,218 @@
+"""Registry of solver options, solver variants, and parameter sweeps.
+
+The registry is read from `solver_variants.yaml` (and any `solver_variants.*.yaml`
+files next to it, such as the output of the `sweep` command below). It defines:
+
+- the options applied to every run of a solver (random seeds, MIP gap),
+- solver variants: named configurations of a solver, that `run_benchmarks.py` and
+  `run_solver.py` accept wherever a solver name is expected,
+- parameter sweeps: grids of option values around a base variant or solver.
+
+Expanding a sweep writes one variant per combination of values to
+`solver_variants.<sweep>.yaml`, and prints the list of variant names to pass to
+`run_benchmarks.py --solvers` or to the `solver` field of a campaign config:
+
+    python solver_variants.py sweep hipo-tuning
+    python solver_variants.py list
+"""
+
+import argparse
+import itertools
+from dataclasses import asdict, dataclass, field
+from functools import cache
+from pathlib import Path
+
+import yaml
+
+REGISTRY_DIR = Path(__file__).parent
+REGISTRY_YAML = REGISTRY_DIR / "solver_variants.yaml"
+
+INTERFACES = ["binding", "binary"]
+
+# Name of the option that sets the number of threads of each solver. SCIP is left
+# out: its only thread option for a sequential solve, lp/threads, parallelizes the
+# LP solver but not branch and bound, and linopy doesn't run SCIP's concurrent solver
+THREADS_OPTIONS = {
+    "highs": "threads",
+    "gurobi": "Threads",
+    "cbc": "threads",
+    "cplex": "threads",
+    "xpress": "threads",
+    "knitro": "KN_PARAM_NUMTHREADS",
+}
+
+
+def format_value(value) -> str:
+    """Format an option value as expected by solver options files and CLIs."""
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value)
+
+
+@dataclass
+class SolverVariant:
+    name: str
+    solver: str
+    interface: str = "binding"
+    options: dict = field(default_factory=dict)
+    cli_args: dict = field(default_factory=dict)
+    problem_classes: list[str] | None = None
+    years: list[str] | None = None
+
+    def __post_init__(self):
+        if self.interface not in INTERFACES:
+            raise ValueError(
+                f"Variant {self.name} has unknown interface {self.interface}, "
+                f"expected one of {INTERFACES}"
+            )
+        if self.interface == "binary" and self.solver != "highs":
+            raise ValueError(
+                f"Variant {self.name}: only HiGHS can be run with the binary interface"
+            )
+        if self.cli_args and self.interface != "binary":
+            raise ValueError(f"Variant {self.name}: cli_args require interface binary")
+        if self.years is not None:
+            self.years = [str(year) for year in self.years]
+
+    def allows(self, problem_class: str | None = None, year=None) -> bool:
+        """Whether this variant should be run on a benchmark of `problem_class` with
+        the solvers of `year`."""
+        if self.problem_classes is not None and problem_class not in (
+            self.problem_classes
+        ):
+            return False
+        return self.years is None or str(year) in self.years
+
+    def command_line_args(self) -> list[str]:
+        """Command line arguments for the solver binary."""
+        return [f"--{k}={format_value(v)}" for k, v in self.cli_args.items()]
+
+    def options_file(self, threads: int | None = None, seed: int | None = None) -> str:
+        """Contents of a HiGHS options file, passed to the binary via
+        `--options_file=<file>`."""
+        options = {} if threads is None else {"threads": threads}
+        options.update(self.options)
+        if seed is not None:
+            options["random_seed"] = options.get("random_seed", 0) + seed
+        return "\n".join(f"{k} = {format_value(v)}" for k, v in options.items())
+
+    def to_yaml_dict(self) -> dict:
+        info = asdict(self)
+        del info["name"]
+        return {k: v for k, v in info.items() if v not in (None, {}, [])}
+
+
+def registry_files(registry_dir: Path = REGISTRY_DIR) -> list[Path]:
+    return [REGISTRY_YAML] + sorted(registry_dir.glob("solver_variants.*.yaml"))
+
+
+@cache
+def load_registry(registry_dir: Path = REGISTRY_DIR) -> dict:
+    """Merge the registry files into a dict with keys `solver_options`, `variants`
+    (name -> SolverVariant), and `sweeps`."""
+    registry = {"solver_options": {}, "variants": {}, "sweeps": {}}
+    for path in registry_files(registry_dir):
+        with open(path, "r") as f:
+            contents = yaml.safe_load(f) or {}
+        registry["solver_options"].update(contents.get("solver_options") or {})
+        registry["sweeps"].update(contents.get("sweeps") or {})
+        for name, info in (contents.get("variants") or {}).items():
+            if name in registry["variants"]:
+                raise ValueError(f"Variant {name} in {path} is already defined")
+            registry["variants"][name] = SolverVariant(name=name, **info)
+    return registry
+
+
+def solver_options(solver_name: str) -> dict:
+    """The options applied to every run of `solver_name`."""
+    return dict(load_registry()["solver_options"].get(solver_name, {}))
+
+
+def get_variant(name: str) -> SolverVariant | None:
+    """The variant called `name`, or None if `name` is a plain solver."""
+    return load_registry()["variants"].get(name.lower())
+
+
+def base_solver(name: str) -> str:
+    """The underlying solver of a solver or variant name."""
+    variant = get_variant(name)
+    return variant.solver if variant is not None else name.lower()
+
+
+def expand_sweep(sweep_name: str) -> list[SolverVariant]:
+    """One variant per combination of the values in the grid of a sweep, each
+    overriding the options or command line arguments of the sweep's base."""
+    registry = load_registry()
+    if sweep_name not in registry["sweeps"]:
+        raise ValueError(
+            f"Unknown sweep {sweep_name}, expected one of {list(registry['sweeps'])}"
+        )
+    sweep = registry["sweeps"][sweep_name]
+    base = registry["variants"].get(sweep["base"]) or SolverVariant(
+        name=sweep["base"], solver=sweep["base"]
+    )
+
+    grid = sweep["grid"]
+    for key in grid:
+        section, _, option = key.partition(".")
+        if section not in ("options", "cli_args") or not option:
+            raise ValueError(
+                f"Sweep {sweep_name}: grid key {key} must be options.<name> or "
+                "cli_args.<name>"
+            )
+
+    variants = []
+    for values in itertools.product(*grid.values()):
+        variant = SolverVariant(
+            name="-".join([sweep_name] + [format_value(v) for v in values]),
+            solver=base.solver,
+            interface=base.interface,
+            options=dict(base.options),
+            cli_args=dict(base.cli_args),
+            problem_classes=base.problem_classes,
+            years=base.years,
+        )
+        for key, value in zip(grid, values):
+            section, _, option = key.partition(".")
+            getattr(variant, section)[option] = value
+        variants.append(variant)
+    return variants
+
+
+def write_sweep(sweep_name: str, registry_dir: Path = REGISTRY_DIR) -> Path:
+    """Write the variants of a sweep to a registry file, so that they can be run."""
+    variants = expand_sweep(sweep_name)
+    output = registry_dir / f"solver_variants.{sweep_name}.yaml"
+    with open(output, "w") as f:
+        f.write(f"# Generated by `python solver_variants.py sweep {sweep_name}`\n")
+        yaml.safe_dump(
+            {"variants": {v.name: v.to_yaml_dict() for v in variants}},
+            f,
+            sort_keys=False,
+        )
+    return output
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="List solver variants or expand parameter sweeps into variants."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List the variants and sweeps.")
+    sweep_parser = subparsers.add_parser(
+        "sweep", help="Write the variants of a sweep to solver_variants.<sweep>.yaml."
+    )
+    sweep_parser.add_argument("sweep", type=str, help="Name of the sweep to expand.")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        registry = load_registry()
+        for variant in registry["variants"].values():
+            print(f"{variant.name}: {variant.to_yaml_dict()}")
+        for name, sweep in registry["sweeps"].items():
+            print(f"sweep {name}: {sweep}")
+    else:
+        output = write_sweep(args.sweep)
+        names = [variant.name for variant in expand_sweep(args.sweep)]
+        print(f"Wrote {len(names)} variants to {output}. Benchmark them with:")
+        print(" ".join(names))
@@ -0,0 +1,187 @@
+"""Report how solvers scale with the number of threads.
+
+Reads the results of a thread-scaling campaign (`run_benchmarks.py --threads 1 2 4 8`)
+and computes, for every instance and solver, the speedup and parallel efficiency of
+each thread count relative to the smallest thread count measured, and the ratio of
+peak memory. These are summarized per solver and problem class using geometric
+means, which are the appropriate average for ratios:
+
+    python thread_scaling_report.py --plot ../results/thread_scaling.png
+
+The per-instance table is written to `results/thread_scaling.csv` and the summary to
+`results/thread_scaling_summary.csv`.
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+RESULTS_DIR = Path(__file__).parent.parent / "results"
+
+
+def geometric_mean(values: pd.Series) -> float:
+    values = values.dropna()
+    values = values[values > 0]
+    return float(np.exp(np.log(values).mean())) if len(values) else np.nan
+
+
+def load_problem_classes(metadata_yaml: Path) -> dict[str, str]:
+    with open(metadata_yaml, "r") as f:
+        benchmarks = yaml.safe_load(f)["benchmarks"]
+    return {name: info.get("Problem class") for name, info in benchmarks.items()}
+
+
+def scaling_table(results: pd.DataFrame, problem_classes: dict) -> pd.DataFrame:
+    """Speedup, parallel efficiency and memory ratio of each run with a given number
+    of threads, relative to the fewest threads measured (normally 1) for the same
+    instance, solver and version. Repeated runs are aggregated by their median.
+
+    Unsolved runs are kept, with their runtime set to the timeout, so that speedups
+    involving them are bounds (see `Speedup Bound`): a timeout of the base run gives
+    a lower bound, and a timeout with more threads an upper bound. Speedups between
+    two unsolved runs are unknown (NaN)."""
+    keys = ["Benchmark", "Size", "Solver", "Solver Version"]
+    df = results[results["Threads"].notna()].copy()
+    df["Threads"] = df["Threads"].astype(int)
+    df["Solved"] = df["Status"] == "ok"
+    df["Runtime (s)"] = pd.to_numeric(df["Runtime (s)"], errors="coerce")
+    if "Timeout" in df.columns:
+        timeout = pd.to_numeric(df["Timeout"], errors="coerce")
+        df["Runtime (s)"] = df["Runtime (s)"].where(df["Solved"], timeout)
+    df["Memory Usage (MB)"] = pd.to_numeric(df["Memory Usage (MB)"], errors="coerce")
+    df["Memory Usage (MB)"] = df["Memory Usage (MB)"].where(df["Solved"])
+    df = (
+        df.groupby(keys + ["Threads"])
+        .agg(
+            **{
+                "Runtime (s)": ("Runtime (s)", "median"),
+                "Memory Usage (MB)": ("Memory Usage (MB)", "median"),
+                "Solved": ("Solved", "all"),
+            }
+        )
+        .reset_index()
+        .sort_values(keys + ["Threads"])
+    )
+
+    # The run with the fewest threads, whatever its status and missing values
+    base = df[keys].merge(df.drop_duplicates(keys), on=keys, how="left")
+    base.index = df.index
+    df["Base Threads"] = base["Threads"]
+    df["Speedup"] = base["Runtime (s)"] / df["Runtime (s)"]
+    df["Speedup Bound"] = np.select(
+        [
+            base["Solved"] & df["Solved"],
+            ~base["Solved"] & df["Solved"],
+            base["Solved"] & ~df["Solved"],
+        ],
+        ["exact", "lower", "upper"],
+        default="unknown",
+    )
+    df.loc[df["Speedup Bound"] == "unknown", "Speedup"] = np.nan
+    df["Parallel Efficiency"] = df["Speedup"] / (df["Threads"] / df["Base Threads"])
+    df["Memory Ratio"] = df["Memory Usage (MB)"] / base["Memory Usage (MB)"]
+    df["Problem Class"] = df["Benchmark"].map(problem_classes).fillna("unknown")
+    return df
+
+
+def scaling_summary(table: pd.DataFrame) -> pd.DataFrame:
+    """Geometric means of the scaling metrics per solver, problem class, and number
+    of threads. Only instances measured with 1 thread are included, so that all
+    speedups are relative to sequential runs. Bounded speedups are included at their
+    bound, and counted, so that the means are conservative when the sequential run
+    timed out."""
+    table = table[table["Base Threads"] == 1]
+    return (
+        table.groupby(["Solver", "Problem Class", "Threads"])
+        .agg(
+            **{
+                "Instances": ("Speedup", "size"),
+                "Lower Bounds": ("Speedup Bound", lambda b: int((b == "lower").sum())),
+                "Upper Bounds": ("Speedup Bound", lambda b: int((b == "upper").sum())),
+                "Speedup (SGM)": ("Speedup", geometric_mean),
+                "Parallel Efficiency (SGM)": ("Parallel Efficiency", geometric_mean),
+                "Memory Ratio (SGM)": ("Memory Ratio", geometric_mean),
+            }
+        )
+        .reset_index()
+    )
+
+
+def plot_summary(summary: pd.DataFrame, output: Path):
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, 3, figsize=(15, 4.5))
+    metrics = ["Speedup (SGM)", "Parallel Efficiency (SGM)", "Memory Ratio (SGM)"]
+    for (solver, problem_class), group in summary.groupby(["Solver", "Problem Class"]):
+        for ax, metric in zip(axes, metrics):
+            ax.plot(
+                group["Threads"],
+                group[metric],
+                marker="o",
+                label=f"{solver} ({problem_class})",
+            )
+    for ax, metric in zip(axes, metrics):
+        ax.set_xscale("log", base=2)
+        ax.set_xlabel("Threads")
+        ax.set_title(metric)
+    max_threads = summary["Threads"].max()
+    axes[0].plot([1, max_threads], [1, max_threads], "k--", label="Linear speedup")
+    axes[0].set_yscale("log", base=2)
+    axes[0].legend(fontsize="small")
+    fig.tight_layout()
+    fig.savefig(output)
+    print(f"Saved plot to {output}")
+
+
+def main(results_csv: Path, metadata_yaml: Path, output_dir: Path, plot=None):
+    results = pd.read_csv(results_csv)
+    if "Threads" not in results.columns or results["Threads"].isna().all():
+        raise ValueError(
+            f"No thread-scaling results in {results_csv}. "
+            "Run run_benchmarks.py with --threads first."
+        )
+    table = scaling_table(results, load_problem_classes(metadata_yaml))
+    summary = scaling_summary(table)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    table.to_csv(output_dir / "thread_scaling.csv", index=False)
+    summary.to_csv(output_dir / "thread_scaling_summary.csv", index=False)
+    with pd.option_context("display.width", 120, "display.max_rows", None):
+        print(summary.round(2).to_string(index=False))
+    if plot:
+        plot_summary(summary, plot)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report speedup, parallel efficiency and memory vs threads."
+    )
+    parser.add_argument(
+        "--results",
+        type=Path,
+        default=RESULTS_DIR / "benchmark_results.csv",
+        help="Results CSV of a thread-scaling campaign.",
+    )
+    parser.add_argument(
+        "--metadata",
+        type=Path,
+        default=RESULTS_DIR / "metadata.yaml",
+        help="Benchmark metadata, for the problem class of each benchmark.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=RESULTS_DIR,
+        help="Directory to write the scaling tables to.",
+    )
+    parser.add_argument(
+        "--plot",
+        type=Path,
+        default=None,
+        help="Save plots of the scaling curves to this file.",
+    )
+    args = parser.parse_args()
+    main(args.results, args.metadata, args.output_dir, args.plot)
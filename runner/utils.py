@@ -13,6 +13,13 @@ from humanize import naturaldelta
 from IPython.display import display
 from matplotlib.patches import Patch
 
+from benchmarks.catalog import load_catalog
+from runner.analytics import (
+    latest_run_mask,
+    penalized_values,
+    shifted_geometric_mean,
+)
+
 # ---------- Monitor in-progress runs ----------
 
 
@@ -154,10 +161,18 @@ def fetch_all_partial_results(output_dir="../results/partial-results"):
 # ---------- Load results ----------
 
 
-def load_results(folder: str | list[str]):
-    """Loads all CSV files in `folder`. Returns the results and variability dataframes."""
+def load_results(folder: str | list[str], output_csv: str | Path | None = None):
+    """Loads all CSV files in `folder`. Returns the results and variability dataframes.
+
+    If `output_csv` is given, the results without superseded runs are also written to
+    it, along with the reference benchmark runs, so that they can be loaded directly.
+    """
     folders = folder if isinstance(folder, list) else [folder]
     csv_files = [p for f in folders for p in Path(f).glob("*.csv")]
+    if output_csv is not None and Path(output_csv).resolve() in {
+        p.resolve() for p in csv_files
+    }:
+        raise ValueError(f"{output_csv} would be loaded along with the results")
     results = pd.concat([pd.read_csv(p) for p in csv_files]).reset_index(drop=True)
 
     # Remove reference benchmark
@@ -179,43 +194,29 @@ def load_results(folder: str | list[str]):
         f"Found {len(results)} records, {len(results['bench-size'].unique())} benchmark instances"
     )
 
-    # Find the Run IDs and Hostnames for each bench-size instance and drop all but the latest
+    # Keep only the latest run (Run ID, Hostname) of each bench-size instance
     # NOTE: assumes all Run IDs begin with YYYYMMDD-
-    runs_grouped = results.groupby("bench-size")[["Run ID", "Hostname"]]
-    to_drop = set()
-    for bench_size, group in runs_grouped:
-        unique_runs = group[["Run ID", "Hostname"]].drop_duplicates()
-        if len(unique_runs) > 1:
-            sorted_runs = sorted(unique_runs.itertuples(index=False))
-            to_drop.update([(*run, bench_size) for run in sorted_runs[:-1]])
-
-    print("Dropping superceeded results from these runs:", sorted(to_drop))
-    keys = pd.MultiIndex.from_frame(results[["Run ID", "Hostname", "bench-size"]])
-    results = results.loc[~keys.isin(to_drop)].copy()
+    latest = latest_run_mask(results, "bench-size")
+    dropped = results.loc[~latest, ["Run ID", "Hostname", "bench-size"]]
+    to_drop = sorted(dropped.drop_duplicates().itertuples(index=False, name=None))
+    print("Dropping superceeded results from these runs:", to_drop)
+    results = results.loc[latest].copy()
     print(
         f"After dropping: {len(results)} records, {len(results['bench-size'].unique())} benchmark instances"
     )
+    if output_csv is not None:
+        pd.concat(
+            [reference_results, results.drop(columns=["bench-size", "solver-version"])]
+        ).to_csv(output_csv, index=False)
     return results, variability
 
 
 def load_benchmark_metadata(metadata_file: str = "../results/metadata.yaml"):
-    # Create a benchmark instance DF from the metadata.yaml file
-    with open(Path(metadata_file), "r") as f:
-        metadata = yaml.safe_load(f)
-    rows = []
+    # Create a benchmark instance DF from the metadata.yaml file, via the catalog
     ignore_keys = {"Short description", "Realistic motivation", "Sizes", "Name"}
-    for bench_name, bench_data in metadata["benchmarks"].items():
-        common_attrs = {k: v for k, v in bench_data.items() if k not in ignore_keys}
-        for size_data in bench_data.get("Sizes", []):
-            size_attrs = {k: v for k, v in size_data.items() if k not in ignore_keys}
-            row = {
-                "Benchmark": bench_name,
-                "Instance": size_data.get("Name"),
-                **common_attrs,
-                **size_attrs,
-            }
-            rows.append(row)
-    benchmarks_df = pd.DataFrame(rows)
+    benchmarks_df = load_catalog(
+        [Path(metadata_file)], ignore_keys=ignore_keys, categorical=False
+    )
     benchmarks_df.index = benchmarks_df["Benchmark"] + "-" + benchmarks_df["Instance"]
     return benchmarks_df
 
@@ -344,12 +345,6 @@ color_map = {
 }
 
 
-def calculate_sgm(data_points, sh=10):
-    data_points = np.maximum(1, data_points + sh)
-    sgm = np.exp(np.mean(np.log(data_points))) - sh
-    return sgm
-
-
 def is_solved(row):
     # Solved Instances: where Status == 'ok' and Termination Condition == 'optimal'
     # TODO for now, relaxing to Status == 'ok'
@@ -365,11 +360,10 @@ def compute_summary_results(results_extended, category_suffix=""):
         solved_instances = (is_solved(group)).sum()
 
         # Compute SGM using: Runtime if solved, else Timeout
-        data_points = group.apply(
-            lambda row: row["Runtime (s)"] if is_solved(row) else row["Timeout"],
-            axis=1,
+        data_points = penalized_values(
+            group["Runtime (s)"], is_solved(group), group["Timeout"]
         )
-        sgm_runtime = calculate_sgm(data_points.values)
+        sgm_runtime = shifted_geometric_mean(data_points)
 
         full_size = {x[0]: x for x in ["Small", "Medium", "Large"]}[size]
 
@@ -709,10 +703,6 @@ def print_sgm_tables_per_bucket(
         "gurobi": "Gurobi",
     }
 
-    def shifted_geometric_mean(x, shift=1.0):
-        x = np.asarray(x)
-        return np.exp(np.mean(np.log(x + shift))) - shift
-
     df = final_with_size.copy()
     df = df[df["Num. variables"].notna() & (df["Num. variables"] > 0)]
 
@@ -0,0 +1,323 @@
+"""Independently verify the solutions written by the solvers in a benchmark campaign.
+
+For every solution file in `runner/solutions/`, this recomputes the maximum primal
+row (constraint) violation, bound violation and integrality violation, as well as the
+objective value, from the original model. Models, which may be compressed (e.g.
+`.mps.gz`, or stored compressed at rest by `run_benchmarks.py --compress-at-rest`),
+are loaded once through the model cache (see model_cache.py) as SciPy CSR matrices,
+so that later runs skip parsing the LP/MPS file. Row activities are computed over
+blocks of rows so that memory stays bounded on large models. Models are processed in
+parallel.
+
+Usage:
+    python verify_solutions.py [--results ../results/benchmark_results.csv]
+"""
+
+import argparse
+import csv
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from traceback import format_exc
+
+import numpy as np
+from format_cache import model_format, model_stem
+from instance_store import uncompressed_name
+from model_cache import INTEGER, CachedModel, cached_model, ensure_cached
+
+# Number of rows for which the row activities are computed at a time
+DEFAULT_BLOCK_ROWS = 1_000_000
+
+# Suffixes of output names for thread counts and seeds (see `run_tag` in
+# run_benchmarks.py) and warm starts (see warm_start.py)
+OUTPUT_TAG = re.compile(r"-(?:t\d+(?:-seed\d+)?|seed\d+|cold|warm)$")
+
+VERIFICATION_COLUMNS = [
+    "Benchmark",
+    "Size",
+    "Solver",
+    "Solver Version",
+    "Solution File",
+    "Missing Values",
+    "Max Row Violation",
+    "Max Bound Violation",
+    "Max Integrality Violation",
+    "Objective Value",
+    "Reported Objective Value",
+    "Objective Relative Error",
+    "Error",
+]
+
+
+def _parse_float(token: str) -> float | None:
+    try:
+        return float(token)
+    except ValueError:
+        return None
+
+
+def read_solution(solution_file: Path, col_index: dict) -> tuple[np.ndarray, int]:
+    """Read the primal values from a solution file into a vector ordered as the model
+    columns. Returns the vector and the number of columns missing from the file.
+
+    Solvers write solutions in different formats, but all of them have lines with a
+    column name followed (possibly after a status field) by its primal value. Only the
+    first occurrence of each column is used, as e.g. HiGHS lists the columns a second
+    time with their dual values. Missing columns are set to zero, as some solvers
+    (e.g. CBC) only write nonzero values.
+    """
+    indices, values = [], []
+    seen = set()
+    with open(solution_file, "r", errors="replace") as f:
+        for line in f:
+            tokens = line.split()
+            for pos, token in enumerate(tokens):
+                idx = col_index.get(token)
+                if idx is None:
+                    continue
+                if idx not in seen:
+                    for value_token in tokens[pos + 1 :]:
+                        value = _parse_float(value_token)
+                        if value is not None:
+                            seen.add(idx)
+                            indices.append(idx)
+                            values.append(value)
+                            break
+                break
+    x = np.zeros(len(col_index), dtype=np.float64)
+    x[np.asarray(indices, dtype=np.int64)] = values
+    return x, len(col_index) - len(seen)
+
+
+def _max_violation(lower: np.ndarray, activity: np.ndarray, upper: np.ndarray):
+    if activity.size == 0:
+        return 0.0
+    violation = np.maximum(lower - activity, activity - upper)
+    return float(max(violation.max(), 0.0))
+
+
+def verify_solution(
+    model: CachedModel, x: np.ndarray, block_rows=DEFAULT_BLOCK_ROWS
+) -> dict:
+    """Compute the violations and objective value of the primal solution `x`."""
+    matrix = model.matrix
+    max_row_violation = 0.0
+    for start in range(0, matrix.shape[0], block_rows):
+        end = min(start + block_rows, matrix.shape[0])
+        activity = matrix[start:end] @ x
+        max_row_violation = max(
+            max_row_violation,
+            _max_violation(
+                model.row_lower[start:end], activity, model.row_upper[start:end]
+            ),
+        )
+
+    integer = x[model.integrality == INTEGER]
+    return {
+        "max_row_violation": max_row_violation,
+        "max_bound_violation": _max_violation(model.col_lower, x, model.col_upper),
+        "max_integrality_violation": (
+            float(np.abs(integer - np.round(integer)).max()) if integer.size else None
+        ),
+        "objective": float(model.col_cost @ x) + model.offset,
+    }
+
+
+def verify_model_solutions(
+    model_file: Path, solutions: list[dict], block_rows=DEFAULT_BLOCK_ROWS
+) -> list[dict]:
+    """Load `model_file` once and verify all its `solutions`. Errors are recorded in
+    the returned rows rather than raised, so that one bad file doesn't stop a run."""
+    try:
+        model = cached_model(ensure_cached(model_file))
+        col_index = {name: i for i, name in enumerate(model.col_names)}
+    except Exception:
+        error = f"Could not load model {model_file}: {format_exc()}"
+        return [{**s, "Error": error} for s in solutions]
+
+    rows = []
+    for solution in solutions:
+        row = dict(solution)
+        try:
+            x, missing = read_solution(Path(solution["Solution File"]), col_index)
+            metrics = verify_solution(model, x, block_rows)
+            row.update(
+                {
+                    "Missing Values": missing,
+                    "Max Row Violation": metrics["max_row_violation"],
+                    "Max Bound Violation": metrics["max_bound_violation"],
+                    "Max Integrality Violation": metrics["max_integrality_violation"],
+                    "Objective Value": metrics["objective"],
+                }
+            )
+            reported = _parse_float(str(solution.get("Reported Objective Value")))
+            if reported is not None:
+                row["Objective Relative Error"] = abs(
+                    metrics["objective"] - reported
+                ) / max(abs(reported), 1.0)
+        except Exception:
+            row["Error"] = format_exc()
+        rows.append(row)
+    print(f"Verified {len(solutions)} solution(s) of {model_file.name}", flush=True)
+    return rows
+
+
+def _int_or_none(value: str | None) -> int | None:
+    number = _parse_float(value or "")
+    return None if number is None or number != number else int(number)
+
+
+def read_reported_results(results_csv: Path) -> dict:
+    """Map solution file stems `<benchmark>-<size>-<solver>-<version>[-<tag>]` (as
+    written by run_solver.py) to the corresponding row of the results CSV, where the
+    tag is given by the `Threads` and `Seed` columns. Later rows win."""
+    reported = {}
+    if results_csv is None or not results_csv.exists():
+        return reported
+    with open(results_csv, newline="") as f:
+        for row in csv.DictReader(f):
+            parts = [
+                row["Benchmark"],
+                row["Size"],
+                row["Solver"],
+                row["Solver Version"],
+            ]
+            threads = _int_or_none(row.get("Threads"))
+            seed = _int_or_none(row.get("Seed"))
+            if threads is not None:
+                parts.append(f"t{threads}")
+            if seed is not None:
+                parts.append(f"seed{seed}")
+            reported["-".join(parts)] = row
+    return reported
+
+
+def match_solutions_to_models(
+    solutions_dir: Path, benchmarks_dir: Path, results_csv: Path | None
+) -> dict[Path, list[dict]]:
+    """Group the solution files by the model file they are a solution of."""
+    models = {
+        model_stem(uncompressed_name(p)): p
+        for p in benchmarks_dir.iterdir()
+        if p.is_file() and model_format(uncompressed_name(p)) is not None
+    }
+    reported = read_reported_results(results_csv)
+
+    grouped = defaultdict(list)
+    for solution_file in sorted(solutions_dir.glob("*.sol")):
+        stem = solution_file.stem
+        info = {"Solution File": str(solution_file)}
+        if stem in reported:
+            row = reported[stem]
+            model_name = f"{row['Benchmark']}-{row['Size']}"
+            info.update(
+                {
+                    "Benchmark": row["Benchmark"],
+                    "Size": row["Size"],
+                    "Solver": row["Solver"],
+                    "Solver Version": row["Solver Version"],
+                    "Reported Objective Value": row["Objective Value"],
+                }
+            )
+        else:
+            # Not in the results CSV: find the model with the longest matching name
+            candidates = [m for m in models if stem.startswith(m + "-")]
+            if not candidates:
+                print(f"WARNING: no model found for solution {solution_file.name}")
+                continue
+            model_name = max(candidates, key=len)
+            solver_and_version = OUTPUT_TAG.sub("", stem[len(model_name) + 1 :])
+            solver, _, version = solver_and_version.partition("-")
+            info.update({"Solver": solver, "Solver Version": version})
+        if model_name not in models:
+            print(f"WARNING: model file for {solution_file.name} not found")
+            continue
+        info.setdefault("Benchmark", model_name)
+        grouped[models[model_name]].append(info)
+    return grouped
+
+
+def main(
+    solutions_dir: Path,
+    benchmarks_dir: Path,
+    results_csv: Path | None,
+    output_csv: Path,
+    workers: int,
+    block_rows: int,
+):
+    grouped = match_solutions_to_models(solutions_dir, benchmarks_dir, results_csv)
+    print(
+        f"Verifying {sum(len(s) for s in grouped.values())} solutions "
+        f"of {len(grouped)} models using {workers} worker(s)"
+    )
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(verify_model_solutions, model_file, solutions, block_rows)
+            for model_file, solutions in grouped.items()
+        ]
+        for future in as_completed(futures):
+            rows.extend(future.result())
+
+    rows.sort(key=lambda r: r["Solution File"])
+    output_csv.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_csv, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=VERIFICATION_COLUMNS, restval="")
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote verification results to {output_csv}")
+
+
+if __name__ == "__main__":
+    runner_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(
+        description="Verify the feasibility and objective value of solver solutions."
+    )
+    parser.add_argument(
+        "--solutions-dir",
+        type=Path,
+        default=runner_dir / "solutions",
+        help="Directory of solution files written by run_solver.py",
+    )
+    parser.add_argument(
+        "--benchmarks-dir",
+        type=Path,
+        default=runner_dir / "benchmarks",
+        help="Directory of benchmark model files",
+    )
+    parser.add_argument(
+        "--results",
+        type=Path,
+        default=runner_dir.parent / "results" / "benchmark_results.csv",
+        help="Results CSV to read the reported objective values from",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=runner_dir.parent / "results" / "solution_verification.csv",
+        help="Output CSV file",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of models to process in parallel",
+    )
+    parser.add_argument(
+        "--block-rows",
+        type=int,
+        default=DEFAULT_BLOCK_ROWS,
+        help="Number of rows for which row activities are computed at a time",
+    )
+    args = parser.parse_args()
+    main(
+        args.solutions_dir,
+        args.benchmarks_dir,
+        args.results,
+        args.output,
+        args.workers,
+        args.block_rows,
+    )
@@ -0,0 +1,395 @@
+"""Benchmark warm starting along a family of related benchmark instances.
+
+Many workflows solve a sequence of closely related models, e.g. rolling horizons, or
+increasingly fine temporal resolutions of the same network. This script solves an
+ordered family of instances of one benchmark (e.g. `pypsa-de-elec` 50-24h, 50-12h,
+50-3h, 50-1h) with each solver, first cold and then warm started from the previous
+instance, and records both runtimes in `results/warm_start_results.csv`:
+
+    python warm_start.py ../results/metadata.yaml 2025 pypsa-de-elec \
+        --sizes 50-24h 50-12h 50-3h 50-1h --solvers highs gurobi
+
+The warm start is the final basis of the previous solve if both models have the same
+columns and number of rows (e.g. rolling horizons), and otherwise its primal solution,
+mapped to the columns of the next model: columns with the same name are copied, and
+columns indexed by a timestamp (e.g. `Generator-p[2013-01-01T03:00:00,DE0_solar]`)
+take the value of the same variable at the latest earlier timestamp of the previous
+model. Columns with no counterpart start at zero.
+
+Mapping columns between models of different sizes requires descriptive column names,
+i.e. models written by linopy with `explicit_coordinate_names`. Many benchmarks,
+including pypsa-de-elec, only have generic names like `x123`, which say nothing about
+the column across models: such models are only warm started from models of the same
+dimensions, column by column. Gurobi only uses primal solutions as MIP starts, so LPs
+are only warm started with Gurobi from a basis.
+"""
+
+import argparse
+import bisect
+import csv
+import datetime
+import re
+import time
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from socket import gethostname
+
+import numpy as np
+import yaml
+from model_cache import CachedModel, load_model
+from run_benchmarks import (
+    benchmark_solver,
+    get_benchmark_path,
+    get_conda_package_versions,
+)
+from verify_solutions import read_solution
+
+# Solvers whose linopy interface accepts a warm start file
+WARM_START_SOLVERS = {"highs", "gurobi"}
+
+WARM_START_RESULTS_CSV = (
+    Path(__file__).parent.parent / "results" / "warm_start_results.csv"
+)
+
+WARM_START_DIR = Path(__file__).parent / "warm_starts"
+
+# Variable names like `x123`, as written by linopy when names are not exported
+GENERIC_NAME = re.compile(r"[a-z]\d+")
+
+BRACKETED_NAME = re.compile(r"(?P<base>[^\[]+)\[(?P<index>.*)\]")
+
+
+def split_time_index(name: str) -> tuple[str, datetime.datetime] | None:
+    """Split a name like `Generator-p[2013-01-01T03:00,solar]` into the name of
+    the time series (`Generator-p[solar]`) and its timestamp, or return None if the
+    name has no timestamp index."""
+    match = BRACKETED_NAME.fullmatch(name)
+    if match is None:
+        return None
+    components = [c.strip() for c in match["index"].split(",")]
+    for i, component in enumerate(components):
+        try:
+            timestamp = datetime.datetime.fromisoformat(component)
+        except ValueError:
+            continue
+        rest = ",".join(components[:i] + components[i + 1 :])
+        return f"{match['base']}[{rest}]", timestamp
+    return None
+
+
+def has_descriptive_names(names: list[str], sample_size: int = 1000) -> bool:
+    """Whether `names` carry meaning across models, i.e. are not just column labels."""
+    sample = names[:sample_size]
+    return bool(sample) and not all(GENERIC_NAME.fullmatch(n) for n in sample)
+
+
+def map_solution(
+    source_names: list[str], source_values: np.ndarray, target_names: list[str]
+) -> tuple[np.ndarray, int]:
+    """Map a primal solution of one model to the columns of another. Returns the
+    values for the target columns and the number of columns that could be mapped."""
+    source_index = {name: i for i, name in enumerate(source_names)}
+
+    # Time series of the source model: series name -> sorted timestamps and values
+    series = defaultdict(list)
+    for name, value in zip(source_names, source_values):
+        split = split_time_index(name)
+        if split is not None:
+            series[split[0]].append((split[1], value))
+    for points in series.values():
+        points.sort()
+
+    values = np.zeros(len(target_names), dtype=np.float64)
+    mapped = 0
+    for j, name in enumerate(target_names):
+        i = source_index.get(name)
+        if i is not None:
+            values[j] = source_values[i]
+            mapped += 1
+            continue
+        split = split_time_index(name)
+        if split is None or split[0] not in series:
+            continue
+        points = series[split[0]]
+        # Latest source timestamp at or before the target timestamp
+        k = bisect.bisect_right(points, (split[1], np.inf)) - 1
+        values[j] = points[max(k, 0)][1]
+        mapped += 1
+    return values, mapped
+
+
+def write_solution_warm_start(
+    path: Path, solver_name: str, names: list[str], values: np.ndarray
+):
+    """Write primal values in a solution format that `solver_name` can read."""
+    with open(path, "w") as f:
+        if solver_name == "highs":
+            # HiGHS computes the row activities when they are not given
+            f.write("Model status\nUnknown\n\n# Primal solution values\nFeasible\n")
+            f.write(f"Objective 0\n# Columns {len(names)}\n")
+        elif solver_name == "gurobi":
+            f.write("# Warm start mapped from a related model\n")
+        else:
+            raise NotImplementedError(f"Cannot warm start {solver_name}")
+        for name, value in zip(names, values.tolist()):
+            f.write(f"{name} {value!r}\n")
+
+
+def same_structure(source: CachedModel, target: CachedModel) -> bool:
+    """Whether the columns of `source` and `target` correspond one to one. Generic
+    names are the same for any models of the same dimensions, so these are only
+    compared along with the number of rows, the integrality and the objective sense."""
+    return (
+        source.num_row == target.num_row
+        and source.num_col == target.num_col
+        and source.sense == target.sense
+        and np.array_equal(source.integrality, target.integrality)
+        and source.col_names == target.col_names
+    )
+
+
+def prepare_warm_start(
+    source_file: Path,
+    solution_file: Path,
+    basis_file: Path,
+    target_file: Path,
+    solver_name: str,
+    warm_start_file: Path,
+) -> tuple[Path | None, str, float]:
+    """Create the warm start for solving `target_file` after `source_file`.
+
+    Returns the file to warm start from (None if there is nothing to warm start
+    from), the kind of warm start ("basis", "solution" or "none"), and the fraction
+    of columns of the target model that have a value from the source model.
+    """
+    source, target = load_model(source_file), load_model(target_file)
+    structure_matches = same_structure(source, target)
+    if structure_matches and basis_file.exists():
+        return basis_file, "basis", 1.0
+
+    if not solution_file.exists():
+        return None, "none", 0.0
+    if solver_name == "gurobi" and not target.is_mip:
+        print(
+            f"WARNING: Gurobi ignores solution warm starts of LPs, and "
+            f"{source_file.name} has no matching basis for {target_file.name}"
+        )
+        return None, "none", 0.0
+    if not structure_matches and not (
+        has_descriptive_names(source.col_names)
+        and has_descriptive_names(target.col_names)
+    ):
+        print(
+            f"WARNING: cannot map the columns of {source_file.name} to "
+            f"{target_file.name}: the models have different dimensions "
+            f"({source.num_row}x{source.num_col} and {target.num_row}x"
+            f"{target.num_col}) and generic column names"
+        )
+        return None, "none", 0.0
+
+    source_index = {name: i for i, name in enumerate(source.col_names)}
+    x, _ = read_solution(solution_file, source_index)
+    values, mapped = map_solution(source.col_names, x, target.col_names)
+    if mapped == 0:
+        return None, "none", 0.0
+    write_solution_warm_start(warm_start_file, solver_name, target.col_names, values)
+    return warm_start_file, "solution", mapped / target.num_col
+
+
+def warm_start_record(**kwargs):
+    cold, warm = kwargs.get("cold", {}), kwargs.get("warm", {})
+    speedup = None
+    if (
+        cold.get("status") == "ok"
+        and warm.get("status") == "ok"
+        and isinstance(cold.get("runtime"), (int, float))
+        and isinstance(warm.get("runtime"), (int, float))
+        and warm["runtime"] > 0
+    ):
+        speedup = cold["runtime"] / warm["runtime"]
+    return OrderedDict(
+        [
+            ("Benchmark", kwargs.get("benchmark_name")),
+            ("Size", kwargs.get("size")),
+            ("Previous Size", kwargs.get("previous_size")),
+            ("Solver", kwargs.get("solver")),
+            ("Solver Version", kwargs.get("solver_version")),
+            ("Warm Start", kwargs.get("warm_start_kind")),
+            ("Mapped Columns", kwargs.get("mapped_fraction")),
+            ("Cold Status", cold.get("status")),
+            ("Cold Termination Condition", cold.get("condition")),
+            ("Cold Runtime (s)", cold.get("runtime")),
+            ("Cold Objective Value", cold.get("objective")),
+            ("Warm Status", warm.get("status")),
+            ("Warm Termination Condition", warm.get("condition")),
+            ("Warm Runtime (s)", warm.get("runtime")),
+            ("Warm Objective Value", warm.get("objective")),
+            ("Speedup", speedup),
+            ("Timeout", kwargs.get("timeout")),
+            ("Hostname", kwargs.get("hostname")),
+            ("Run ID", kwargs.get("run_id")),
+            ("Timestamp", kwargs.get("timestamp")),
+        ]
+    )
+
+
+def write_warm_start_row(results_csv: Path, record: OrderedDict):
+    new_file = not results_csv.exists()
+    results_csv.parent.mkdir(parents=True, exist_ok=True)
+    with open(results_csv, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(record.keys())
+        writer.writerow(record.values())
+
+
+def main(
+    benchmark_yaml_path,
+    year,
+    benchmark_name,
+    sizes=None,
+    solvers=("highs",),
+    timeout=None,
+    run_id=None,
+):
+    with open(benchmark_yaml_path, "r") as file:
+        yaml_content = yaml.safe_load(file)
+    benchmark_info = yaml_content["benchmarks"][benchmark_name]
+    instances = {instance["Name"]: instance for instance in benchmark_info["Sizes"]}
+    sizes = sizes or list(instances)
+    unknown = [s for s in sizes if s not in instances]
+    if unknown:
+        raise ValueError(f"Unknown sizes of {benchmark_name}: {unknown}")
+
+    benchmarks_folder = Path(__file__).parent / "benchmarks"
+    benchmarks_folder.mkdir(parents=True, exist_ok=True)
+    WARM_START_DIR.mkdir(parents=True, exist_ok=True)
+    solutions_dir = Path(__file__).parent / "solutions"
+
+    versions = get_conda_package_versions(solvers, f"benchmark-{year}")
+    hostname = gethostname()
+    run_id = run_id or f"{time.strftime('%Y%m%d_%H%M%S')}_{hostname}_warm_start"
+
+    paths = {
+        size: get_benchmark_path(benchmark_name, instances[size], benchmarks_folder)
+        for size in sizes
+    }
+
+    for solver in solvers:
+        if solver not in WARM_START_SOLVERS:
+            print(f"Solver {solver} does not support warm starts. Skipping.")
+            continue
+        solver_version = versions.get(solver)
+        if not solver_version:
+            print(f"Solver {solver} is not available. Skipping.")
+            continue
+
+        previous = None
+        for size in sizes:
+            path = paths[size]
+            instance_timeout = timeout or (
+                24 * 60 * 60 if instances[size].get("Size") == "L" else 60 * 60
+            )
+            output_name = f"{path.stem}-{solver}-{solver_version}"
+            basis_file = WARM_START_DIR / f"{output_name}-cold.bas"
+            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+
+            print(f"Solving {path.name} with {solver} (cold)...", flush=True)
+            cold = benchmark_solver(
+                str(path),
+                solver,
+                instance_timeout,
+                solver_version,
+                solver_args=["--basis-out", str(basis_file)],
+                output_tag="cold",
+            )
+
+            warm, kind, mapped = {}, None, None
+            if previous is not None:
+                prev_path, prev_name, prev_size = previous
+                warm_start_file, kind, mapped = prepare_warm_start(
+                    prev_path,
+                    solutions_dir / f"{prev_name}-cold.sol",
+                    WARM_START_DIR / f"{prev_name}-cold.bas",
+                    path,
+                    solver,
+                    WARM_START_DIR / f"{output_name}-warm-start.sol",
+                )
+                if warm_start_file is not None:
+                    print(
+                        f"Solving {path.name} with {solver} "
+                        f"(warm started from a {kind}, {mapped:.0%} mapped)...",
+                        flush=True,
+                    )
+                    warm = benchmark_solver(
+                        str(path),
+                        solver,
+                        instance_timeout,
+                        solver_version,
+                        solver_args=["--warmstart", str(warm_start_file)],
+                        output_tag="warm",
+                    )
+
+            write_warm_start_row(
+                WARM_START_RESULTS_CSV,
+                warm_start_record(
+                    benchmark_name=benchmark_name,
+                    size=size,
+                    previous_size=None if previous is None else previous[2],
+                    solver=solver,
+                    solver_version=solver_version,
+                    warm_start_kind=kind,
+                    mapped_fraction=mapped,
+                    cold=cold,
+                    warm=warm,
+                    timeout=instance_timeout,
+                    hostname=hostname,
+                    run_id=run_id,
+                    timestamp=timestamp,
+                ),
+            )
+            previous = (path, output_name, size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark warm starts along an ordered family of instances."
+    )
+    parser.add_argument(
+        "benchmark_yaml_path", type=str, help="Path to the benchmarks YAML file."
+    )
+    parser.add_argument("year", type=str, help="Year of the solver environment to use.")
+    parser.add_argument("benchmark", type=str, help="Name of the benchmark.")
+    parser.add_argument(
+        "--sizes",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Ordered instance names (sizes) of the family. Default: all, in YAML order.",
+    )
+    parser.add_argument(
+        "--solvers",
+        type=str,
+        nargs="+",
+        default=["highs"],
+        help=f"Solvers to benchmark. Supported: {', '.join(sorted(WARM_START_SOLVERS))}.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Timeout of each solve in seconds. Default: by size category.",
+    )
+    parser.add_argument(
+        "--run_id", type=str, default=None, help="Unique identifier for this run."
+    )
+    args = parser.parse_args()
+    main(
+        args.benchmark_yaml_path,
+        args.year,
+        args.benchmark,
+        sizes=args.sizes,
+        solvers=args.solvers,
+        timeout=args.timeout,
+        run_id=args.run_id,
+    )
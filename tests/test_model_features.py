@@ -0,0 +1,62 @@
+"""Run the CLI of benchmarks/model_features.py on the sample benchmarks.
+
+python -m unittest tests/test_model_features.py
+"""
+
+import csv
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SAMPLES = Path(__file__).parent / "sample_benchmarks"
+
+
+@unittest.skipUnless(
+    importlib.util.find_spec("highspy") and importlib.util.find_spec("scipy"),
+    "model_features.py needs highspy and scipy",
+)
+class ModelFeaturesCliTest(unittest.TestCase):
+    def test_sample_models(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            # Place the samples where download_benchmark_file finds them cached
+            (tmp / "benchmarks").mkdir()
+            metadata = ["benchmarks:", "  sample:", "    Sizes:"]
+            for sample in ["sample_lp.lp", "sample_mip.lp"]:
+                shutil.copy(SAMPLES / sample, tmp / "benchmarks")
+                metadata += [
+                    f"      - Name: {Path(sample).stem}",
+                    f"        URL: https://example.invalid/{sample}",
+                ]
+            (tmp / "metadata.yaml").write_text("\n".join(metadata) + "\n")
+
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    REPO_ROOT / "benchmarks" / "model_features.py",
+                    "--metadata",
+                    tmp / "metadata.yaml",
+                    "--output_folder",
+                    tmp / "benchmarks",
+                    "--output",
+                    tmp / "features.csv",
+                ],
+                env={**os.environ, "MODEL_CACHE_DIR": str(tmp / "model_cache")},
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+            with open(tmp / "features.csv", newline="") as f:
+                rows = {row["Size"]: row for row in csv.DictReader(f)}
+            self.assertEqual(sorted(rows), ["sample_lp", "sample_mip"])
+            self.assertEqual(rows["sample_mip"]["num_nonzeros"], "9")
+
+
+if __name__ == "__main__":
+    unittest.main()
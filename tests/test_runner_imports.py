@@ -0,0 +1,39 @@
+"""Smoke tests of the imports of runner modules that are shared with benchmarks/.
+
+python -m unittest tests/test_runner_imports.py
+"""
+
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def run_import(statement: str, cwd: Path) -> subprocess.CompletedProcess:
+    # A fresh interpreter, so that the sys.path of this process doesn't matter
+    return subprocess.run(
+        [sys.executable, "-c", statement], cwd=cwd, capture_output=True, text=True
+    )
+
+
+class RunnerImportsTest(unittest.TestCase):
+    def test_model_cache_as_package(self):
+        """As imported by categorize_benchmarks.py, infer_stats.py and
+        model_features.py."""
+        result = run_import(
+            "from runner.model_cache import load_model, cached_model", REPO_ROOT
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_model_cache_as_sibling(self):
+        """As imported by the scripts in runner/."""
+        result = run_import(
+            "from model_cache import load_model, cached_model", REPO_ROOT / "runner"
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Tests of validate_urls_exist.py against a local HTTP server.
+
+python -m unittest tests/test_validate_urls_exist.py
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from validate_urls_exist import check_urls  # noqa: E402
+
+ETAG = '"v1"'
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves `/file` (with an ETag), `/no-head` (a file that only supports range
+    GETs), `/empty`, and 404 for any other path."""
+
+    requests = []
+
+    def do_HEAD(self):
+        self.requests.append(("HEAD", self.path))
+        if self.path == "/file":
+            if self.headers.get("If-None-Match") == ETAG:
+                self.send_response(304)
+            else:
+                self.send_response(200)
+                self.send_header("Content-Length", "10")
+            self.send_header("ETag", ETAG)
+        elif self.path == "/no-head":
+            self.send_response(405)
+        elif self.path == "/empty":
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+        else:
+            self.send_response(404)
+        self.end_headers()
+
+    def do_GET(self):
+        self.requests.append(("GET", self.path))
+        if self.path == "/no-head" and self.headers.get("Range") == "bytes=0-0":
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes 0-0/42")
+            self.send_header("Content-Length", "1")
+            self.end_headers()
+            self.wfile.write(b"x")
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ValidateUrlsExistTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        Handler.requests.clear()
+
+    def check(self, paths, cache, max_age_s=3600.0):
+        urls = [self.base + path for path in paths]
+        results = asyncio.run(
+            check_urls(urls, cache, max_age_s=max_age_s, retries=0, backoff_s=0)
+        )
+        return {r.url.removeprefix(self.base): r for r in results}
+
+    def test_statuses(self):
+        cache = {}
+        results = self.check(["/file", "/no-head", "/empty", "/missing"], cache)
+        self.assertTrue(results["/file"].ok)
+        self.assertEqual(results["/file"].content_length, 10)
+        self.assertTrue(results["/no-head"].ok)
+        self.assertEqual(results["/no-head"].content_length, 42)
+        self.assertFalse(results["/empty"].ok)
+        self.assertFalse(results["/missing"].ok)
+        self.assertEqual(results["/missing"].status, 404)
+        self.assertEqual(sorted(cache), [self.base + "/file", self.base + "/no-head"])
+
+    def test_cache(self):
+        cache = {}
+        self.check(["/file"], cache)
+
+        # Fresh entries are not requested again
+        Handler.requests.clear()
+        results = self.check(["/file"], cache)
+        self.assertTrue(results["/file"].cached)
+        self.assertEqual(Handler.requests, [])
+
+        # Stale entries are revalidated with a conditional request
+        results = self.check(["/file"], cache, max_age_s=0)
+        self.assertTrue(results["/file"].ok)
+        self.assertEqual(results["/file"].status, 304)
+        self.assertEqual(results["/file"].content_length, 10)
+
+    def test_stale_entry_of_removed_file(self):
+        url = self.base + "/missing"
+        cache = {url: {"etag": ETAG, "content_length": 10, "last_checked": 0.0}}
+        results = self.check(["/missing"], cache, max_age_s=time.time() + 60)
+        self.assertTrue(results["/missing"].cached)
+
+        results = self.check(["/missing"], cache)
+        self.assertFalse(results["/missing"].ok)
+        self.assertNotIn(url, cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,43 @@
 #!/usr/bin/env python3
+"""Check that the URLs of all benchmark instances exist.
+
+URLs are checked concurrently with asyncio over one aiohttp session, which keeps a
+pool of connections per host, with a bounded number of requests in flight and
+retries with exponential backoff on connection errors, 429 and 5xx responses.
+
+Successful checks are cached in a JSON file (URL -> ETag, Content-Length, time of
+the last check), so that repeated runs only check new URLs and revalidate cached
+ones after `--max-age` hours, with conditional requests (`If-None-Match`) that are
+cheap when the file is unchanged:
+
+    python tests/validate_urls_exist.py results/metadata.yaml --cache .url_cache.json
+"""
+
 from __future__ import annotations
 
+import argparse
+import asyncio
+import json
+import os
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import tempfile
+import time
 from dataclasses import dataclass
-from typing import Any, Iterable
+from pathlib import Path
+from typing import Any, Iterable, Mapping
 
-import requests
+import aiohttp
 import yaml
 
-DEFAULT_WORKERS = 32  # good CI default; adjust if you hit throttling
+DEFAULT_CONCURRENCY = 32  # good CI default; adjust if you hit throttling
+DEFAULT_PER_HOST = 16
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_S = 1.0
+DEFAULT_MAX_AGE_H = 24 * 7
+
+# Statuses that are worth retrying, and those for which HEAD may not be supported
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+HEAD_UNSUPPORTED = {405, 501}
 
 
 @dataclass
@@ -20,6 +48,8 @@ class CheckResult:
     reason: str
     content_length: int | None = None
     content_type: str | None = None
+    etag: str | None = None
+    cached: bool = False
 
 
 def iter_strings(obj: Any) -> Iterable[str]:
@@ -34,70 +64,230 @@ def iter_strings(obj: Any) -> Iterable[str]:
             yield from iter_strings(v)
 
 
-def check_url(url: str, timeout_s: float = 60.0) -> CheckResult:
-    # Create a short-lived session per thread for connection pooling within that thread.
-    # (requests.Session is not guaranteed thread-safe when shared.)
-    session = requests.Session()
-    session.headers.update({"User-Agent": "gcs-url-check/1.0"})
+def load_cache(path: Path | None) -> dict[str, dict]:
+    if path is None or not path.exists():
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Ignoring unreadable cache {path}: {e}", file=sys.stderr)
+        return {}
+
 
+def save_cache(path: Path, cache: dict[str, dict]) -> None:
+    """Write the cache atomically, so that an interrupted run can't corrupt it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
     try:
-        r = session.head(url, allow_redirects=True, timeout=timeout_s)
-    except requests.RequestException as e:
-        return CheckResult(url=url, ok=False, status=None, reason=f"request error: {e}")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
 
-    # Fallback if HEAD is not supported / flaky
-    if r.status_code in (405, 501) or (r.status_code >= 500):
+
+def is_fresh(entry: dict | None, max_age_s: float, now: float) -> bool:
+    return entry is not None and now - entry.get("last_checked", 0) < max_age_s
+
+
+async def _request(
+    session: aiohttp.ClientSession,
+    method: str,
+    url: str,
+    headers: dict[str, str],
+    retries: int,
+    backoff_s: float,
+) -> tuple[int, Mapping[str, str]]:
+    """Status and headers of a request, retried with exponential backoff on
+    connection errors and retryable statuses."""
+    for attempt in range(retries + 1):
         try:
-            r = session.get(
-                url,
-                headers={"Range": "bytes=0-0"},
-                stream=True,
-                allow_redirects=True,
-                timeout=timeout_s,
-            )
-        except requests.RequestException as e:
-            return CheckResult(
-                url=url, ok=False, status=None, reason=f"range-get error: {e}"
-            )
+            async with session.request(
+                method, url, headers=headers, allow_redirects=True
+            ) as r:
+                if r.status not in RETRY_STATUSES or attempt == retries:
+                    return r.status, r.headers.copy()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == retries:
+                raise
+        await asyncio.sleep(backoff_s * 2**attempt)
+    raise AssertionError("unreachable")
 
-    status = r.status_code
-    if status not in (200, 206):
-        return CheckResult(url=url, ok=False, status=status, reason=f"HTTP {status}")
 
-    cl = r.headers.get("Content-Length")
-    ct = r.headers.get("Content-Type")
-    content_length = int(cl) if cl and cl.isdigit() else None
+async def check_url(
+    session: aiohttp.ClientSession,
+    url: str,
+    cached: dict | None = None,
+    retries: int = DEFAULT_RETRIES,
+    backoff_s: float = DEFAULT_BACKOFF_S,
+) -> CheckResult:
+    """Check that `url` exists with a HEAD request, falling back to a 1-byte range
+    GET if HEAD is not supported. If `cached` has an ETag, the request is
+    conditional, and a 304 response confirms the cached entry."""
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
 
-    # Optional sanity check (can remove if you have zero-byte markers you want to allow)
-    if content_length == 0:
+    try:
+        status, r_headers = await _request(
+            session, "HEAD", url, headers, retries, backoff_s
+        )
+        # Fallback if HEAD is not supported / flaky
+        if status in HEAD_UNSUPPORTED or status >= 500:
+            status, r_headers = await _request(
+                session,
+                "GET",
+                url,
+                {**headers, "Range": "bytes=0-0"},
+                retries,
+                backoff_s,
+            )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return CheckResult(
+            url=url, ok=False, status=None, reason=f"request error: {e!r}"
+        )
+
+    if status == 304 and cached:
         return CheckResult(
             url=url,
-            ok=False,
+            ok=True,
             status=status,
-            reason="Content-Length is 0",
-            content_length=0,
-            content_type=ct,
+            reason="Not modified",
+            content_length=cached.get("content_length"),
+            content_type=cached.get("content_type"),
+            etag=cached.get("etag"),
         )
+    if status not in (200, 206):
+        return CheckResult(url=url, ok=False, status=status, reason=f"HTTP {status}")
 
-    return CheckResult(
+    if status == 206:
+        # Content-Range: bytes 0-0/<total>
+        cl = r_headers.get("Content-Range", "").rpartition("/")[2]
+    else:
+        cl = r_headers.get("Content-Length")
+    ct = r_headers.get("Content-Type")
+    content_length = int(cl) if cl and cl.isdigit() else None
+    result = CheckResult(
         url=url,
         ok=True,
         status=status,
         reason="OK",
         content_length=content_length,
         content_type=ct,
+        etag=r_headers.get("ETag"),
     )
 
+    # Optional sanity check (can remove if you have zero-byte markers you want to allow)
+    if content_length == 0:
+        result.ok, result.reason = False, "Content-Length is 0"
+    elif cached and cached.get("content_length") not in (None, content_length):
+        result.reason = f"Changed size (was {cached['content_length']})"
+    return result
+
+
+async def check_urls(
+    urls: Iterable[str],
+    cache: dict[str, dict],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    max_age_s: float = DEFAULT_MAX_AGE_H * 3600,
+    timeout_s: float = 60.0,
+    retries: int = DEFAULT_RETRIES,
+    backoff_s: float = DEFAULT_BACKOFF_S,
+) -> list[CheckResult]:
+    """Check the URLs that have no fresh entry in `cache`, and update `cache` in
+    place with the successful checks."""
+    now = time.time()
+    results = [
+        CheckResult(
+            url=url,
+            ok=True,
+            status=None,
+            reason="Cached",
+            content_length=cache[url].get("content_length"),
+            content_type=cache[url].get("content_type"),
+            etag=cache[url].get("etag"),
+            cached=True,
+        )
+        for url in urls
+        if is_fresh(cache.get(url), max_age_s, now)
+    ]
+    to_check = [url for url in urls if not is_fresh(cache.get(url), max_age_s, now)]
+
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host)
+    async with aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout_s),
+        headers={"User-Agent": "gcs-url-check/1.0"},
+    ) as session:
 
-def main() -> int:
-    if len(sys.argv) < 2:
-        print(f"Usage: {sys.argv[0]} <file.yaml> [max_workers]", file=sys.stderr)
-        return 2
+        async def bounded_check(url: str) -> CheckResult:
+            async with semaphore:
+                return await check_url(session, url, cache.get(url), retries, backoff_s)
 
-    path = sys.argv[1]
-    max_workers = int(sys.argv[2]) if len(sys.argv) >= 3 else DEFAULT_WORKERS
+        checked = await asyncio.gather(*(bounded_check(url) for url in to_check))
 
-    with open(path, "r", encoding="utf-8") as f:
+    for r in checked:
+        if r.ok:
+            cache[r.url] = {
+                "etag": r.etag,
+                "content_length": r.content_length,
+                "content_type": r.content_type,
+                "last_checked": now,
+            }
+        else:
+            cache.pop(r.url, None)
+    return sorted(results + checked, key=lambda r: r.url)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Check that the URLs of a benchmark metadata file exist."
+    )
+    parser.add_argument("metadata", help="Benchmark metadata YAML file.")
+    parser.add_argument(
+        "concurrency",
+        nargs="?",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Maximum number of requests in flight.",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=DEFAULT_PER_HOST,
+        help="Maximum number of connections per host.",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=None,
+        help="JSON file caching successful checks (not cached by default).",
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=DEFAULT_MAX_AGE_H,
+        help="Revalidate cached URLs checked more than this many hours ago.",
+    )
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument(
+        "--backoff",
+        type=float,
+        default=DEFAULT_BACKOFF_S,
+        help="Seconds to wait before the first retry, doubled at each retry.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+
+    with open(args.metadata, "r", encoding="utf-8") as f:
         data = yaml.safe_load(f)
 
     urls = sorted({s["URL"] for _, b in data["benchmarks"].items() for s in b["Sizes"]})
@@ -105,26 +295,42 @@ def main() -> int:
         print("No URLs found in yaml file.")
         return 0
 
-    print(f"Found {len(urls)} URL(s). Checking with {max_workers} worker(s)...")
-
-    results: list[CheckResult] = []
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futures = {ex.submit(check_url, url): url for url in urls}
-        for fut in as_completed(futures):
-            results.append(fut.result())
-
-    # Stable output order for CI readability
-    results.sort(key=lambda r: r.url)
+    cache = load_cache(args.cache)
+    print(
+        f"Found {len(urls)} URL(s). Checking with {args.concurrency} concurrent "
+        f"request(s)..."
+    )
+    try:
+        results = asyncio.run(
+            check_urls(
+                urls,
+                cache,
+                concurrency=args.concurrency,
+                per_host=args.per_host,
+                max_age_s=args.max_age * 3600,
+                timeout_s=args.timeout,
+                retries=args.retries,
+                backoff_s=args.backoff,
+            )
+        )
+    finally:
+        if args.cache is not None:
+            # Drop URLs that are no longer in the metadata
+            save_cache(args.cache, {u: cache[u] for u in urls if u in cache})
 
     failures = [r for r in results if not r.ok]
     for r in results:
-        if r.ok:
+        if r.cached:
+            print(f"✅ {r.url}  (cached, len={r.content_length})")
+        elif r.ok:
             print(
-                f"✅ {r.url}  (status={r.status}, len={r.content_length}, type={r.content_type})"
+                f"✅ {r.url}  (status={r.status}, len={r.content_length}, "
+                f"type={r.content_type}, {r.reason})"
             )
         else:
             print(f"❌ {r.url}  ({r.reason})")
 
+    num_cached = sum(r.cached for r in results)
     if failures:
         print(
             f"\nFAILED: {len(failures)}/{len(urls)} URL(s) did not validate.",
@@ -133,7 +339,7 @@ def main() -> int:
         # Helpful non-zero exit for CI
         return 1
 
-    print(f"\nOK: {len(urls)} URL(s) validated.")
+    print(f"\nOK: {len(urls)} URL(s) validated ({num_cached} from the cache).")
     return 0
 
 
@@ -0,0 +1,301 @@
+"""Export pre-aggregated, sharded JSON of the benchmark results for the website.
+
+The website computes the latest results, SGM tables and scaling series in the browser
+from the full results CSV. This build step computes them once from
+`results/benchmark_results.csv` and `results/metadata.yaml`, and writes small JSON
+shards to `public/data/`, so that each page fetches only what it needs:
+
+- `latest-results`: the results of the latest version of each solver, with the
+  runtime and memory of unsolved runs replaced as in `processBenchmarkResults`,
+- `sgm/<problem class>-<size>-<realism>`: SGM tables of runtime and memory per
+  solver and timeout, for each combination of these filters (`all` for no filter)
+  and each SGM mode of the website,
+- `benchmarks/<benchmark>`: the metadata of a benchmark and the results of all solver
+  versions on it,
+- `scaling`: runtime against model size of the latest version of each solver.
+
+Shards are named after a hash of their content (e.g. `scaling.3f2a9c1b04de.json`),
+so that they can be cached forever, and are precompressed with gzip (and brotli, if
+installed). `manifest.json` maps the name of each shard to its file. Run from
+`website/`:
+
+    python scripts/export_results.py
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import re
+import shutil
+import sys
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+from packaging.version import InvalidVersion, Version
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(ROOT_DIR))
+from runner.analytics import shifted_geometric_mean  # noqa: E402
+
+# Brotli is optional, gzip is always written
+try:
+    import brotli
+except ModuleNotFoundError:
+    brotli = None
+
+RESULTS_CSV = ROOT_DIR / "results" / "benchmark_results.csv"
+METADATA_YAML = ROOT_DIR / "results" / "metadata.yaml"
+OUTPUT_DIR = ROOT_DIR / "website" / "public" / "data"
+
+# Same as HIPO_SOLVERS in src/utils/solvers.ts, which are left out of SGM tables
+HIPO_SOLVERS = ["highs-hipo", "highs-ipx"]
+
+# Same as DEFAULT_X_FACTOR in src/constants/sgm.ts
+X_FACTOR = 5
+
+# Memory of unsolved runs, as in getMaxMemoryUsage in src/utils/results.ts
+MAX_MEMORY_MB = {"L": 62 * 1024}
+DEFAULT_MAX_MEMORY_MB = 7 * 1024
+
+RESULT_COLUMNS = {
+    "Benchmark": "benchmark",
+    "Size": "size",
+    "Solver": "solver",
+    "Solver Version": "solverVersion",
+    "Solver Release Year": "solverReleaseYear",
+    "Status": "status",
+    "Termination Condition": "terminationCondition",
+    "Runtime (s)": "runtime",
+    "Memory Usage (MB)": "memoryUsage",
+    "Objective Value": "objectiveValue",
+    "Max Integrality Violation": "maxIntegralityViolation",
+    "Duality Gap": "dualityGap",
+    "Timeout": "timeout",
+    "Run ID": "runId",
+}
+
+
+def parse_version(version) -> Version:
+    """Version of a solver, with versions that are not PEP 440 sorting first."""
+    try:
+        return Version(str(version))
+    except InvalidVersion:
+        return Version("0")
+
+
+def load_sizes(metadata: dict) -> pd.DataFrame:
+    """One row per benchmark size, with the metadata used by the filters."""
+    rows = []
+    for benchmark, entry in metadata["benchmarks"].items():
+        for size in entry.get("Sizes", []):
+            rows.append(
+                {
+                    "Benchmark": benchmark,
+                    "Size": size["Name"],
+                    "Problem class": entry.get("Problem class"),
+                    "Size category": size.get("Size"),
+                    "Realistic": bool(size.get("Realistic")),
+                    "Num. variables": size.get("Num. variables"),
+                    "Num. constraints": size.get("Num. constraints"),
+                    "Num. nonzeros": size.get("Num. nonzeros"),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def processed_results(results: pd.DataFrame, sizes: pd.DataFrame) -> pd.DataFrame:
+    """Results with the runtime of unsolved runs set to the timeout and their memory
+    to the memory limit of their size category, as on the website."""
+    df = results.merge(sizes, on=["Benchmark", "Size"], how="left")
+    unsolved = df["Status"] != "ok"
+    max_memory = df["Size category"].map(MAX_MEMORY_MB).fillna(DEFAULT_MAX_MEMORY_MB)
+    df["Runtime (s)"] = df["Runtime (s)"].where(~unsolved, df["Timeout"])
+    df["Memory Usage (MB)"] = df["Memory Usage (MB)"].where(~unsolved, max_memory)
+    return df
+
+
+def latest_results(df: pd.DataFrame) -> pd.DataFrame:
+    """Results of the highest version of each solver (over all benchmarks), as
+    getLatestBenchmarkResult."""
+    versions = df[["Solver", "Solver Version"]].drop_duplicates()
+    versions["Parsed"] = versions["Solver Version"].map(parse_version)
+    latest = versions.sort_values("Parsed").groupby("Solver").tail(1)
+    return df.merge(
+        latest[["Solver", "Solver Version"]], on=["Solver", "Solver Version"]
+    )
+
+
+def to_columns(df: pd.DataFrame, columns: dict) -> dict:
+    """A DataFrame as a dict of columns, which is more compact than a list of
+    records. NaN values become null."""
+    df = df[list(columns)].astype(object).where(df[list(columns)].notna(), None)
+    return {name: df[column].tolist() for column, name in columns.items()}
+
+
+def sgm_table(df: pd.DataFrame) -> list[dict]:
+    """SGM of runtime and memory per solver and timeout, in each SGM mode, relative
+    to the best solver (as in ResultsSections.tsx)."""
+    rows = []
+    df = df[~df["Solver"].isin(HIPO_SOLVERS)]
+    for timeout, runs in df.groupby("Timeout"):
+        solved = runs["Status"] == "ok"
+        num_solvers = runs["Solver"].nunique()
+        # Instances solved by every solver
+        solved_by = runs[solved].groupby(["Benchmark", "Size"])["Solver"].nunique()
+        everywhere = solved_by[solved_by == num_solvers].index
+        intersection = solved & pd.MultiIndex.from_frame(
+            runs[["Benchmark", "Size"]]
+        ).isin(everywhere)
+        # Runs of each mode, and the factor by which their values are penalized
+        modes = {
+            "timeout": (runs, 1),
+            "penalty": (runs, np.where(solved, 1, X_FACTOR)),
+            "intersection": (runs[intersection], 1),
+        }
+        for mode, (mode_runs, scale) in modes.items():
+            values = mode_runs.assign(
+                **{
+                    "Runtime (s)": mode_runs["Runtime (s)"] * scale,
+                    "Memory Usage (MB)": mode_runs["Memory Usage (MB)"] * scale,
+                }
+            )
+            table = values.groupby("Solver").agg(
+                runtimeSgm=("Runtime (s)", shifted_geometric_mean),
+                memorySgm=("Memory Usage (MB)", shifted_geometric_mean),
+                solved=("Status", lambda s: int((s == "ok").sum())),
+                total=("Status", "size"),
+            )
+            if table.empty:
+                continue
+            table["runtimeRatio"] = table["runtimeSgm"] / table["runtimeSgm"].min()
+            table["memoryRatio"] = table["memorySgm"] / table["memorySgm"].min()
+            table = table.reset_index().rename(columns={"Solver": "solver"})
+            rows.extend(
+                {"timeout": timeout, "mode": mode, **row}
+                for row in table.to_dict("records")
+            )
+    return rows
+
+
+def sgm_shards(latest: pd.DataFrame) -> dict[str, list]:
+    """SGM tables for every combination of problem class, size category and realism
+    filters."""
+    classes = ["all"] + sorted(latest["Problem class"].dropna().unique())
+    categories = ["all"] + sorted(latest["Size category"].dropna().unique())
+    realism = {"all": None, "realistic": True, "other": False}
+    shards = {}
+    for problem_class, category, realistic in product(classes, categories, realism):
+        mask = pd.Series(True, index=latest.index)
+        if problem_class != "all":
+            mask &= latest["Problem class"] == problem_class
+        if category != "all":
+            mask &= latest["Size category"] == category
+        if realism[realistic] is not None:
+            mask &= latest["Realistic"] == realism[realistic]
+        name = f"sgm/{problem_class}-{category}-{realistic}".lower()
+        shards[name] = sgm_table(latest[mask])
+    return shards
+
+
+def benchmark_shards(df: pd.DataFrame, metadata: dict) -> dict[str, dict]:
+    """The metadata and the results of all solver versions of each benchmark."""
+    shards = {}
+    for benchmark, runs in df.groupby("Benchmark"):
+        shards[f"benchmarks/{_slug(benchmark)}"] = {
+            "metadata": metadata["benchmarks"].get(benchmark),
+            "results": to_columns(runs, RESULT_COLUMNS),
+        }
+    return shards
+
+
+def scaling_shard(latest: pd.DataFrame) -> dict:
+    """Runtime against the model size of each run of the latest solver versions."""
+    columns = {
+        **RESULT_COLUMNS,
+        "Num. variables": "numVariables",
+        "Num. constraints": "numConstraints",
+        "Num. nonzeros": "numNonzeros",
+        "Size category": "sizeCategory",
+    }
+    return to_columns(latest[latest["Num. variables"].notna()], columns)
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", name)
+
+
+def _json_safe(value):
+    """`value` with numpy scalars as Python numbers and NaN and infinities as None,
+    recursively. `json.dumps` writes non-finite floats (including np.float64, a
+    float subclass) as NaN/Infinity, which is not valid JSON, without calling its
+    `default` hook."""
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def write_shard(name: str, content, output_dir: Path) -> str:
+    """Write `content` as compact JSON to a content-hashed file with precompressed
+    copies, and return the path of the file relative to `output_dir`."""
+    data = json.dumps(
+        _json_safe(content), separators=(",", ":"), allow_nan=False
+    ).encode()
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    relative = f"{name}.{digest}.json"
+    path = output_dir / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(data, mtime=0))
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(data))
+    return relative
+
+
+def main(results_csv: Path, metadata_yaml: Path, output_dir: Path):
+    with open(metadata_yaml) as f:
+        metadata = yaml.safe_load(f)
+    results = pd.read_csv(results_csv, dtype={"Solver Version": str})
+    # Reference benchmark runs measure the speed of hosts and are not shown
+    results = results[results["Benchmark"] != "reference-benchmark"]
+    df = processed_results(results, load_sizes(metadata))
+    latest = latest_results(df)
+
+    shards = {
+        "latest-results": to_columns(latest, RESULT_COLUMNS),
+        "scaling": scaling_shard(latest),
+        **sgm_shards(latest),
+        **benchmark_shards(df, metadata),
+    }
+
+    # Shards are generated, so stale ones are removed
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir(parents=True)
+    manifest = {name: write_shard(name, c, output_dir) for name, c in shards.items()}
+    with open(output_dir / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    total = sum(p.stat().st_size for p in output_dir.rglob("*.json"))
+    print(f"Wrote {len(manifest)} shards ({total / 1024:.0f} KB) to {output_dir}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export pre-aggregated JSON shards of the results for the website."
+    )
+    parser.add_argument("--results", type=Path, default=RESULTS_CSV)
+    parser.add_argument("--metadata", type=Path, default=METADATA_YAML)
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    args = parser.parse_args()
+    main(args.results, args.metadata, args.output_dir)